@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark for scripts/fetch_claude_docs.py.
+
+Starts a local stand-in for the docs site (synthetic sitemap, markdown pages
+and changelog, with injected latency, 429s, 5xx errors and redirects), runs
+the fetcher end to end against it in a child process and reports wall time,
+pages/sec, bytes transferred and peak memory per scenario. Results are
+compared with the committed baselines; a scenario that is slower than its
+baseline by more than the tolerance fails the run.
+
+Usage:
+    python benchmarks/fetcher_bench.py                    # run all scenarios, compare
+    python benchmarks/fetcher_bench.py cold throttled     # run some scenarios
+    python benchmarks/fetcher_bench.py --update-baselines # record new baselines
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+FETCHER = REPO_ROOT / 'scripts' / 'fetch_claude_docs.py'
+BASELINES_FILE = Path(__file__).resolve().parent / 'baselines.json'
+
+# Fetcher options shared by every scenario; the rate limit is raised so the
+# benchmark measures the fetcher, not the politeness delay
+FETCHER_ARGS = ["--workers", "8", "--rate", "200"]
+
+SCENARIOS: Dict[str, dict] = {
+    # Full download of a typical-sized mirror
+    "cold": {"pages": 150, "page_size": 8 * 1024, "latency": 0.02},
+    # Second run against unchanged pages: conditional requests answered with 304
+    "warm": {"pages": 150, "page_size": 8 * 1024, "latency": 0.02, "warm": True},
+    # Few, large pages: dominated by transfer, hashing and writing
+    "large-pages": {"pages": 30, "page_size": 256 * 1024, "latency": 0.02},
+    # Every 20th page is rate limited once (Retry-After: 1)
+    "throttled": {"pages": 80, "page_size": 8 * 1024, "latency": 0.02,
+                  "rate_limit_every": 20, "retry_after": 1},
+    # Every 15th page fails once with a 503, every 10th redirects
+    "flaky": {"pages": 80, "page_size": 8 * 1024, "latency": 0.02,
+              "error_every": 15, "redirect_every": 10},
+}
+
+# Lower is better for these, higher for pages_per_second
+LOWER_IS_BETTER = ("wall_seconds", "bytes_sent", "peak_rss_mb")
+DEFAULT_TOLERANCE = 0.3  # allowed slowdown relative to the baseline
+
+
+def synthetic_page(index: int, size: int) -> bytes:
+    """Deterministic markdown page of roughly `size` bytes."""
+    parts = [
+        f"# Page {index}\n\n",
+        f"> Synthetic Claude Code documentation page {index} for benchmarking.\n\n",
+        "## Overview\n\n",
+        "- Installation and configuration\n- Usage examples\n\n",
+        "```bash\nclaude --help\n```\n\n",
+    ]
+    body = ''.join(parts)
+    section = 0
+    while len(body) < size:
+        section += 1
+        body += (f"## Section {section}\n\n"
+                 f"Claude Code page {index}, section {section}: see [settings](/docs/en/page{(index + section) % 7}) "
+                 "for configuration options and **examples** of common usage patterns.\n\n")
+    return body[:size].encode('utf-8')
+
+
+class StandInDocsServer(ThreadingHTTPServer):
+    """Local stand-in for the docs site, with deterministic fault injection."""
+
+    daemon_threads = True
+
+    def __init__(self, scenario: dict):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.scenario = scenario
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.pages = {f"/docs/en/page{i}.md": synthetic_page(i, scenario["page_size"])
+                      for i in range(scenario["pages"])}
+        self.changelog = ''.join(
+            f"## 1.0.{i}\n\n- Claude Code fix number {i}\n- Another change\n\n"
+            for i in range(200, 0, -1)).encode('utf-8')
+        self._lock = threading.Lock()
+        self._attempts: Dict[str, int] = {}
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._attempts.clear()
+            self.stats = {"requests": 0, "bytes_sent": 0, "statuses": {}}
+
+    def count(self, path: str, status: int, sent: int) -> None:
+        with self._lock:
+            self._attempts[path] = self._attempts.get(path, 0) + 1
+            self.stats["requests"] += 1
+            self.stats["bytes_sent"] += sent
+            self.stats["statuses"][str(status)] = self.stats["statuses"].get(str(status), 0) + 1
+
+    def first_attempt(self, path: str) -> bool:
+        with self._lock:
+            return self._attempts.get(path, 0) == 0
+
+    def start(self) -> None:
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, status: int, body: bytes = b'', headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+        self.server.count(self.path, status, len(body))
+
+    def do_GET(self):
+        server = self.server
+        scenario = server.scenario
+        time.sleep(scenario.get("latency", 0))
+
+        if self.path == '/docs/sitemap.xml':
+            urls = ''.join(f"<url><loc>{server.url}/docs/en/page{i}</loc><lastmod>2025-01-01</lastmod></url>"
+                           for i in range(scenario["pages"]))
+            body = ('<?xml version="1.0" encoding="UTF-8"?>'
+                    f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>')
+            self.send(200, body.encode('utf-8'), {'Content-Type': 'application/xml'})
+            return
+
+        if self.path == '/CHANGELOG.md':
+            self.serve_markdown(server.changelog)
+            return
+
+        # Redirected pages are served from /docs/en/moved/
+        path = self.path.replace('/docs/en/moved/', '/docs/en/')
+        if path not in server.pages:
+            self.send(404)
+            return
+        index = int(path[len('/docs/en/page'):-len('.md')])
+        moved = self.path != path
+
+        if not moved and scenario.get("redirect_every") and index % scenario["redirect_every"] == 2:
+            self.send(301, headers={'Location': f"{server.url}/docs/en/moved/page{index}.md"})
+            return
+        if server.first_attempt(self.path):
+            if scenario.get("rate_limit_every") and index % scenario["rate_limit_every"] == 0:
+                self.send(429, headers={'Retry-After': str(scenario.get("retry_after", 1))})
+                return
+            if scenario.get("error_every") and index % scenario["error_every"] == 1:
+                self.send(503)
+                return
+        self.serve_markdown(server.pages[path])
+
+    def serve_markdown(self, body: bytes) -> None:
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send(304, headers={'ETag': etag})
+            return
+        self.send(200, body, {'Content-Type': 'text/markdown; charset=utf-8', 'ETag': etag})
+
+
+def run_fetcher(server: StandInDocsServer, work_dir: Path) -> dict:
+    """Run the fetcher once in a child process; returns wall time, peak RSS and its manifest."""
+    cmd = [
+        sys.executable, str(FETCHER),
+        "--docs-dir", str(work_dir / 'docs'),
+        "--bundle", str(work_dir / 'docs.bundle'),
+        "--metrics-dir", str(work_dir),
+        "--sitemap-url", f"{server.url}/docs/sitemap.xml",
+        "--changelog-url", f"{server.url}/CHANGELOG.md",
+    ] + FETCHER_ARGS
+    log_path = work_dir / 'fetcher.log'
+    with open(log_path, 'wb') as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 gives the resource usage of this child alone
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+    if process.returncode != 0:
+        tail = log_path.read_text(errors='replace').splitlines()[-20:]
+        raise RuntimeError(f"fetcher exited with {process.returncode}:\n" + '\n'.join(tail))
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = usage.ru_maxrss / (1024 * 1024) if sys.platform == 'darwin' else usage.ru_maxrss / 1024
+    manifest = json.loads((work_dir / 'docs' / 'docs_manifest.json').read_text())
+    return {"wall_seconds": wall, "peak_rss_mb": peak_rss, "manifest": manifest}
+
+
+def run_scenario(name: str) -> dict:
+    scenario = SCENARIOS[name]
+    server = StandInDocsServer(scenario)
+    server.start()
+    try:
+        with tempfile.TemporaryDirectory(prefix=f"fetcher-bench-{name}-") as tmp:
+            work_dir = Path(tmp)
+            if scenario.get("warm"):
+                # Populate docs and validators first; only the second run is measured
+                run_fetcher(server, work_dir)
+                server.reset_stats()
+            result = run_fetcher(server, work_dir)
+    finally:
+        server.stop()
+
+    metadata = result["manifest"]["fetch_metadata"]
+    if metadata["pages_failed"]:
+        raise RuntimeError(f"{name}: {metadata['pages_failed']} pages failed: {metadata['failed_pages']}")
+    pages = metadata["total_pages_discovered"]
+    pages_seconds = metadata["pages_wall_clock_seconds"] or result["wall_seconds"]
+    return {
+        "wall_seconds": round(result["wall_seconds"], 3),
+        "pages_per_second": round(pages / pages_seconds, 1),
+        "bytes_sent": server.stats["bytes_sent"],
+        "peak_rss_mb": round(result["peak_rss_mb"], 1),
+        "requests": server.stats["requests"],
+        "statuses": dict(sorted(server.stats["statuses"].items())),
+    }
+
+
+def best_of(runs: List[dict]) -> dict:
+    """Combine repeated runs, keeping the best value of each measurement."""
+    best = dict(runs[0])
+    for run in runs[1:]:
+        for key in LOWER_IS_BETTER:
+            best[key] = min(best[key], run[key])
+        best["pages_per_second"] = max(best["pages_per_second"], run["pages_per_second"])
+    return best
+
+
+def compare(name: str, result: dict, baseline: Optional[dict], tolerance: float) -> List[str]:
+    """Return a description of every measurement that regressed beyond the tolerance."""
+    if not baseline:
+        return []
+    regressions = []
+    for key in LOWER_IS_BETTER:
+        if key in baseline and result[key] > baseline[key] * (1 + tolerance):
+            regressions.append(f"{name}: {key} {result[key]} > baseline {baseline[key]} (+{tolerance:.0%})")
+    if "pages_per_second" in baseline and result["pages_per_second"] < baseline["pages_per_second"] / (1 + tolerance):
+        regressions.append(f"{name}: pages_per_second {result['pages_per_second']} < "
+                           f"baseline {baseline['pages_per_second']} (-{tolerance:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the docs fetcher against a local stand-in server")
+    parser.add_argument('scenarios', nargs='*', metavar='scenario',
+                        help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per scenario, best result kept (default: 1)")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed regression against the baseline (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument('--update-baselines', action='store_true', help="Store the results as the new baselines")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args()
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+    baselines = json.loads(BASELINES_FILE.read_text()) if BASELINES_FILE.exists() else {}
+
+    results = {}
+    regressions = []
+    for name in names:
+        results[name] = best_of([run_scenario(name) for _ in range(max(1, args.repeat))])
+        regressions.extend(compare(name, results[name], baselines.get(name), args.tolerance))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'scenario':<14}{'wall s':>9}{'pages/s':>10}{'bytes':>12}{'peak MB':>10}{'baseline s':>12}")
+        for name, result in results.items():
+            baseline_wall = baselines.get(name, {}).get("wall_seconds", "-")
+            print(f"{name:<14}{result['wall_seconds']:>9.2f}{result['pages_per_second']:>10.1f}"
+                  f"{result['bytes_sent']:>12}{result['peak_rss_mb']:>10.1f}{baseline_wall:>12}")
+
+    if args.update_baselines:
+        for name, result in results.items():
+            baselines[name] = {key: result[key] for key in LOWER_IS_BETTER + ("pages_per_second",)}
+        BASELINES_FILE.write_text(json.dumps(dict(sorted(baselines.items())), indent=2) + '\n')
+        print(f"Baselines written to {BASELINES_FILE}")
+        return
+
+    if regressions:
+        print("\nRegressions:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  - {regression}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
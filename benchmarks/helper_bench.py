@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency benchmark for the /docs helper.
+
+Installs the helper with install.sh into a temporary HOME, from a clone of a
+local bare repository standing in for GitHub, so nothing leaves the machine.
+Each command path is timed in three states: warm (the last sync is within
+the freshness TTL), cold (the TTL has expired and origin has nothing new)
+and pending (origin has a commit the clone doesn't). One extra run per path
+goes through PATH shims that count the external processes it starts. p50/p95
+latency and spawn counts are checked against benchmarks/helper_budgets.json;
+a path over its budget fails the run.
+
+Usage:
+    python benchmarks/helper_bench.py                        # every path and state
+    python benchmarks/helper_bench.py read whats-new         # some paths
+    python benchmarks/helper_bench.py --states warm --runs 20
+    python benchmarks/helper_bench.py --update-budgets       # record new budgets
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BUDGETS_FILE = Path(__file__).resolve().parent / 'helper_budgets.json'
+
+# Helper arguments for each command path, as the /docs command passes them
+PATHS: Dict[str, List[str]] = {
+    "read": ["hooks"],
+    "section": ["hooks#hook-lifecycle"],
+    "resolve": ["hoks"],
+    "search": ["how do sandbox network rules work"],
+    "check": ["-t"],
+    "whats-new": ["what's new"],
+    "hook-check": ["hook-check"],
+}
+STATES = ("warm", "cold", "pending")
+
+# External commands counted by the spawn shims (everything the helper and install.sh run)
+SHIMMED_COMMANDS = (
+    "basename", "cat", "chmod", "column", "cp", "curl", "cut", "date", "dirname", "find", "git", "grep",
+    "head", "jq", "ls", "mkdir", "mv", "nohup", "python3", "rm", "rmdir", "sed", "sleep", "sort", "tail",
+    "tr", "uname", "wc",
+)
+
+DEFAULT_RUNS = 10  # timed runs per path and state
+BUDGET_HEADROOM = 1.5  # --update-budgets allows this multiple of the measured p95...
+BUDGET_SLACK_MS = 20  # ...plus this much, for slower machines
+BACKGROUND_TIMEOUT = 60  # seconds to wait for a background sync started by hook-check
+
+GIT_IDENTITY = {
+    "GIT_AUTHOR_NAME": "helper-bench", "GIT_AUTHOR_EMAIL": "helper-bench@localhost",
+    "GIT_COMMITTER_NAME": "helper-bench", "GIT_COMMITTER_EMAIL": "helper-bench@localhost",
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of the values."""
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+class HelperSandbox:
+    """
+    A temporary HOME with the helper installed from a local stand-in origin.
+
+    The stand-in origin holds the repository's docs, scripts and installer in
+    two commits: `base` and `head`, which touches one page and adds a change
+    journal entry. States are set up by moving the installed clone between them.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.home = root / 'home'
+        self.install_dir = self.home / '.claude-code-docs'
+        self.upstream = root / 'upstream'
+        self.origin = root / 'origin.git'
+        self.shims = root / 'shims'
+        self.spawn_log = root / 'spawns.log'
+        self.env = {
+            "HOME": str(self.home),
+            "PATH": os.environ.get("PATH", "/usr/bin:/bin"),
+            "LANG": os.environ.get("LANG", "C.UTF-8"),
+            "TERM": "dumb",
+            **GIT_IDENTITY,
+        }
+        self.base = ""
+        self.head = ""
+
+    def git(self, cwd: Path, *args: str) -> str:
+        result = subprocess.run(["git", *args], cwd=cwd, env=self.env, check=True,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        return result.stdout.strip()
+
+    def setup(self) -> None:
+        self.home.mkdir(parents=True)
+        self.upstream.mkdir()
+        for name in ("install.sh", "README.md"):
+            shutil.copy2(REPO_ROOT / name, self.upstream / name)
+        ignore = shutil.ignore_patterns('__pycache__', '.*')
+        shutil.copytree(REPO_ROOT / 'scripts', self.upstream / 'scripts', ignore=ignore)
+        shutil.copytree(REPO_ROOT / 'docs', self.upstream / 'docs', ignore=ignore)
+
+        # The indexes and journal are generated by the update workflow in CI; build them here
+        docs_dir = str(self.upstream / 'docs')
+        for script in ('docs_index.py', 'docs_links.py'):
+            subprocess.run([sys.executable, str(self.upstream / 'scripts' / script), '--docs-dir', docs_dir, 'build'],
+                           check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        pages = sorted(path.name for path in (self.upstream / 'docs').glob('*.md'))
+        with open(self.upstream / 'docs' / 'changes.jsonl', 'w', encoding='utf-8') as journal:
+            for day in range(1, 21):
+                changed = {pages[(day * 7) % len(pages)]: {"changed": ["Overview"]}}
+                journal.write(json.dumps({"time": f"2026-01-{day:02d}T00:00:00Z", "added": [],
+                                          "changed": changed, "removed": []}) + '\n')
+
+        self.git(self.upstream, "init", "-q", "-b", "main")
+        self.git(self.upstream, "add", "-A")
+        self.git(self.upstream, "commit", "-q", "-m", "base")
+        self.base = self.git(self.upstream, "rev-parse", "HEAD")
+        self.git(self.root, "clone", "-q", "--bare", str(self.upstream), str(self.origin))
+
+        # Install the way a user does: clone, then run the installer from the clone
+        self.git(self.root, "clone", "-q", str(self.origin), str(self.install_dir))
+        self.run_checked(["bash", "install.sh"], cwd=self.install_dir)
+
+        # The commit that "pending" runs have to pull
+        with open(self.upstream / 'docs' / 'hooks.md', 'a', encoding='utf-8') as page:
+            page.write("\nUpdated upstream.\n")
+        with open(self.upstream / 'docs' / 'changes.jsonl', 'a', encoding='utf-8') as journal:
+            journal.write(json.dumps({"time": "2026-02-01T00:00:00Z", "added": [],
+                                      "changed": {"hooks.md": {"changed": ["Hooks reference"]}},
+                                      "removed": []}) + '\n')
+        self.git(self.upstream, "commit", "-q", "-am", "head")
+        self.head = self.git(self.upstream, "rev-parse", "HEAD")
+        self.git(self.upstream, "push", "-q", str(self.origin), "main")
+        self.git(self.install_dir, "fetch", "-q", "origin", "main")
+
+        self.shims.mkdir()
+        for command in SHIMMED_COMMANDS:
+            real = shutil.which(command, path=self.env["PATH"])
+            if not real:
+                continue
+            shim = self.shims / command
+            shim.write_text(f'#!/bin/sh\necho {command} >> "$HELPER_BENCH_SPAWN_LOG"\nexec {real} "$@"\n')
+            shim.chmod(0o755)
+
+    def run_checked(self, cmd: List[str], cwd: Path, env: Optional[dict] = None) -> None:
+        result = subprocess.run(cmd, cwd=cwd, env=env or self.env,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        if result.returncode != 0:
+            tail = result.stdout.decode('utf-8', 'replace').splitlines()[-20:]
+            raise RuntimeError(f"{' '.join(cmd)} exited with {result.returncode}:\n" + '\n'.join(tail))
+
+    def prepare(self, state: str) -> None:
+        """Put the installation in the given state (not timed)."""
+        shutil.rmtree(self.install_dir / '.sync.lock', ignore_errors=True)
+        target = self.base if state == "pending" else self.head
+        if self.git(self.install_dir, "rev-parse", "HEAD") != target:
+            self.git(self.install_dir, "reset", "-q", "--hard", target)
+        # As if the last fetch saw origin at `target`: the helper's own fetch finds the new commit
+        self.git(self.install_dir, "update-ref", "refs/remotes/origin/main", target)
+
+        sync_state = self.install_dir / '.sync_state'
+        if state == "warm":
+            sync_state.write_text(f"last_sync={int(time.time())}\nchecks=1\nskipped=0\n")
+        else:
+            sync_state.unlink(missing_ok=True)
+
+    def run_helper(self, args: List[str], count_spawns: bool = False) -> float:
+        """Run the helper once; returns its wall time in seconds."""
+        env = dict(self.env)
+        if count_spawns:
+            self.spawn_log.write_text('')
+            env["PATH"] = f"{self.shims}:{env['PATH']}"
+            env["HELPER_BENCH_SPAWN_LOG"] = str(self.spawn_log)
+        helper = self.install_dir / 'claude-docs-helper.sh'
+
+        start = time.perf_counter()
+        # Own session, so a background sync the helper leaves behind can be waited for
+        process = subprocess.Popen([str(helper), *args], cwd=self.home, env=env, start_new_session=True,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        _, stderr = process.communicate()
+        wall = time.perf_counter() - start
+        if process.returncode != 0:
+            raise RuntimeError(f"helper {' '.join(args)!r} exited with {process.returncode}:\n"
+                               + stderr.decode('utf-8', 'replace')[-2000:])
+
+        deadline = time.monotonic() + BACKGROUND_TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                os.killpg(process.pid, 0)
+            except ProcessLookupError:
+                break
+            time.sleep(0.02)
+        else:
+            raise RuntimeError(f"background work of helper {' '.join(args)!r} still running "
+                               f"after {BACKGROUND_TIMEOUT}s")
+        return wall
+
+    def spawn_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for command in self.spawn_log.read_text().split():
+            counts[command] = counts.get(command, 0) + 1
+        return dict(sorted(counts.items()))
+
+
+def measure(sandbox: HelperSandbox, path: str, state: str, runs: int) -> dict:
+    args = PATHS[path]
+    times = []
+    for _ in range(runs):
+        sandbox.prepare(state)
+        times.append(sandbox.run_helper(args))
+    sandbox.prepare(state)
+    sandbox.run_helper(args, count_spawns=True)
+    by_command = sandbox.spawn_counts()
+    return {
+        "p50_ms": round(percentile(times, 50) * 1000, 1),
+        "p95_ms": round(percentile(times, 95) * 1000, 1),
+        "spawns": sum(by_command.values()),
+        "spawns_by_command": by_command,
+    }
+
+
+def check_budget(key: str, result: dict, budget: Optional[dict]) -> List[str]:
+    """Return a description of every budget the result exceeds."""
+    if not budget:
+        return []
+    over = []
+    if "p95_ms" in budget and result["p95_ms"] > budget["p95_ms"]:
+        over.append(f"{key}: p95 {result['p95_ms']} ms > budget {budget['p95_ms']} ms")
+    if "spawns" in budget and result["spawns"] > budget["spawns"]:
+        over.append(f"{key}: {result['spawns']} processes spawned > budget {budget['spawns']} "
+                    f"({', '.join(f'{name} {count}' for name, count in result['spawns_by_command'].items())})")
+    return over
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /docs helper command paths end to end")
+    parser.add_argument('paths', nargs='*', metavar='path',
+                        help=f"Command paths to run (default: all of {', '.join(PATHS)})")
+    parser.add_argument('--states', default=','.join(STATES),
+                        help=f"Comma-separated states to run each path in (default: {','.join(STATES)})")
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS,
+                        help=f"Timed runs per path and state (default: {DEFAULT_RUNS})")
+    parser.add_argument('--update-budgets', action='store_true',
+                        help=f"Store budgets of {BUDGET_HEADROOM}x the measured p95 plus {BUDGET_SLACK_MS} ms")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args()
+
+    paths = args.paths or list(PATHS)
+    states = [state.strip() for state in args.states.split(',') if state.strip()]
+    unknown = [path for path in paths if path not in PATHS] + [state for state in states if state not in STATES]
+    if unknown:
+        parser.error(f"unknown path(s) or state(s): {', '.join(unknown)} "
+                     f"(paths: {', '.join(PATHS)}; states: {', '.join(STATES)})")
+    missing = [command for command in ("git", "jq", "curl") if not shutil.which(command)]
+    if missing:
+        sys.exit(f"helper_bench needs {', '.join(missing)} (install.sh requires git, jq and curl)")
+    budgets = json.loads(BUDGETS_FILE.read_text()) if BUDGETS_FILE.exists() else {}
+
+    results = {}
+    over_budget = []
+    with tempfile.TemporaryDirectory(prefix="helper-bench-") as tmp:
+        # install.sh compares paths as strings, so use the resolved one
+        sandbox = HelperSandbox(Path(tmp).resolve())
+        sandbox.setup()
+        for path in paths:
+            for state in states:
+                key = f"{path}/{state}"
+                results[key] = measure(sandbox, path, state, max(1, args.runs))
+                over_budget.extend(check_budget(key, results[key], budgets.get(key)))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'path':<22}{'p50 ms':>9}{'p95 ms':>9}{'spawns':>8}{'budget ms':>11}")
+        for key, result in results.items():
+            budget_ms = budgets.get(key, {}).get("p95_ms", "-")
+            print(f"{key:<22}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['spawns']:>8}{budget_ms:>11}")
+
+    if args.update_budgets:
+        for key, result in results.items():
+            budgets[key] = {
+                "p95_ms": math.ceil((result["p95_ms"] * BUDGET_HEADROOM + BUDGET_SLACK_MS) / 10) * 10,
+                "spawns": result["spawns"],
+            }
+        BUDGETS_FILE.write_text(json.dumps(dict(sorted(budgets.items())), indent=2) + '\n')
+        print(f"Budgets written to {BUDGETS_FILE}")
+        return
+
+    if over_budget:
+        print("\nOver budget:", file=sys.stderr)
+        for line in over_budget:
+            print(f"  - {line}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
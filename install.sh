@@ -418,9 +418,14 @@ Execute the Claude Code Docs helper script at ~/.claude-code-docs/claude-docs-he
 Usage:
 - /docs - List all available documentation topics
 - /docs <topic> - Read specific documentation with link to official docs
+- /docs <topic>#<heading> - Read only one section of a document (e.g. hooks#PreToolUse)
+- /docs <topic> --outline - Show the heading outline of a document
+- /docs <topic> --links - Show the pages a document links to and the pages linking to it
+- /docs changelog <version> - Show one Claude Code release (or "last <N>" for the latest N)
 - /docs -t - Check sync status without reading a doc
 - /docs -t <topic> - Check freshness then read documentation
-- /docs whats new - Show recent documentation changes (or "what's new")
+- /docs --verify - Check the local docs against the manifest's hashes (--verify --repair re-fetches broken pages)
+- /docs whats new - Show recent documentation changes (or "what's new"; "what's new 30" for the last 30 days)
 
 Examples of expected output:
 
@@ -435,17 +440,16 @@ When reading a doc:
 When showing what's new:
 📚 Recent documentation updates:
 
-• 5 hours ago:
-  📎 https://github.com/ericbuess/claude-code-docs/commit/eacd8e1
+• 2025-07-29 18:00 UTC:
   📄 data-usage: https://docs.anthropic.com/en/docs/claude-code/data-usage
-     ➕ Added: Privacy safeguards
+      + Privacy safeguards
   📄 security: https://docs.anthropic.com/en/docs/claude-code/security
-     ✨ Data flow and dependencies section moved here
+      ~ Data flow and dependencies
 
 📎 Full changelog: https://github.com/ericbuess/claude-code-docs/commits/main/docs
 📚 COMMUNITY MIRROR - NOT AFFILIATED WITH ANTHROPIC
 
-Every request checks for the latest documentation from GitHub (takes ~0.4s).
+Requests check GitHub for the latest documentation (~0.4s) at most once every 15 minutes; /docs -t always checks.
 The helper script handles all functionality including auto-updates.
 
 Execute: ~/.claude-code-docs/claude-docs-helper.sh "$ARGUMENTS"
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Packed single-file bundle of the Claude Code documentation mirror.
+
+Layout:
+    magic (4 bytes) | version (u16) | header length (u32) | header JSON | page blobs
+
+The header maps each filename to [offset, length, sha256, compressed size], with
+offsets relative to the first blob. Every page is zlib-compressed on its own, so
+a reader can memory-map the bundle and inflate only the page it needs. The
+sha256 is the manifest hash of the uncompressed page and is checked on read.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "docs_manifest.json"
+BUNDLE_MAGIC = b'CCDB'
+BUNDLE_VERSION = 1
+BUNDLE_PREAMBLE = struct.Struct('>4sHI')  # magic, version, header length
+COMPRESSION_LEVEL = 9
+
+
+class DocsBundle:
+    """Read-only, memory-mapped view of a docs bundle."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        magic, version, header_length = BUNDLE_PREAMBLE.unpack_from(self._map, 0)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a version {BUNDLE_VERSION} docs bundle")
+
+        header_start = BUNDLE_PREAMBLE.size
+        self.header = json.loads(self._map[header_start:header_start + header_length])
+        self.entries: Dict[str, list] = self.header["entries"]
+        self._data_start = header_start + header_length
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def names(self) -> List[str]:
+        return sorted(self.entries)
+
+    def raw(self, filename: str) -> bytes:
+        """Return the compressed blob for a page without inflating it."""
+        offset, _, _, compressed_size = self.entries[filename]
+        start = self._data_start + offset
+        return self._map[start:start + compressed_size]
+
+    def read(self, filename: str) -> bytes:
+        """Inflate a single page and verify it against its recorded hash."""
+        _, length, content_hash, _ = self.entries[filename]
+        data = zlib.decompress(self.raw(filename))
+        if len(data) != length or hashlib.sha256(data).hexdigest() != content_hash:
+            raise ValueError(f"Integrity check failed for {filename} in {self.path}")
+        return data
+
+
+def write_bundle(docs_dir: Path, files: Dict[str, dict], bundle_path: Path) -> Dict[str, int]:
+    """
+    Pack the manifest's files into a bundle, replacing any existing one atomically.
+
+    Blobs of pages whose hash matches the previous bundle are copied over without
+    recompressing. Returns counts of compressed and reused pages.
+    """
+    previous: Optional[DocsBundle] = None
+    if bundle_path.exists():
+        try:
+            previous = DocsBundle(bundle_path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable bundle {bundle_path}: {e}")
+
+    blobs = []
+    entries = {}
+    offset = 0
+    compressed = 0
+    reused = 0
+    try:
+        for filename in sorted(files):
+            page_path = docs_dir / filename
+            if not filename.endswith('.md') or not page_path.exists():
+                continue
+            content_hash = files[filename].get("hash", "")
+            old_entry = previous.entries.get(filename) if previous else None
+            if old_entry and old_entry[2] == content_hash:
+                blob = previous.raw(filename)
+                length = old_entry[1]
+                reused += 1
+            else:
+                data = page_path.read_bytes()
+                blob = zlib.compress(data, COMPRESSION_LEVEL)
+                length = len(data)
+                content_hash = hashlib.sha256(data).hexdigest()
+                compressed += 1
+            entries[filename] = [offset, length, content_hash, len(blob)]
+            blobs.append(blob)
+            offset += len(blob)
+    finally:
+        if previous:
+            previous.close()
+
+    header = json.dumps({
+        "created": datetime.now().isoformat(),
+        "entries": entries,
+    }, separators=(',', ':')).encode('utf-8')
+
+    bundle_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = bundle_path.with_name(bundle_path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(BUNDLE_PREAMBLE.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, bundle_path)
+
+    return {"compressed": compressed, "reused": reused, "bytes": bundle_path.stat().st_size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or read a packed docs bundle")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    pack_parser = subparsers.add_parser('pack', help="Pack docs/ into a bundle")
+    pack_parser.add_argument('bundle', type=Path)
+    pack_parser.add_argument('--docs-dir', type=Path, default=Path(__file__).parent.parent / 'docs')
+
+    list_parser = subparsers.add_parser('list', help="List pages in a bundle")
+    list_parser.add_argument('bundle', type=Path)
+
+    cat_parser = subparsers.add_parser('cat', help="Print one page from a bundle")
+    cat_parser.add_argument('bundle', type=Path)
+    cat_parser.add_argument('filename')
+
+    extract_parser = subparsers.add_parser('extract', help="Unpack every page into a directory")
+    extract_parser.add_argument('bundle', type=Path)
+    extract_parser.add_argument('dest', type=Path)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    if args.command == 'pack':
+        manifest = json.loads((args.docs_dir / MANIFEST_FILE).read_text())
+        stats = write_bundle(args.docs_dir, manifest.get("files", {}), args.bundle)
+        logger.info(f"Wrote {args.bundle}: {stats['compressed']} compressed, "
+                    f"{stats['reused']} reused, {stats['bytes']} bytes")
+        return
+
+    with DocsBundle(args.bundle) as bundle:
+        if args.command == 'list':
+            for filename in bundle.names():
+                _, length, _, compressed_size = bundle.entries[filename]
+                print(f"{filename}\t{length}\t{compressed_size}")
+        elif args.command == 'cat':
+            filename = args.filename if args.filename.endswith('.md') else args.filename + '.md'
+            if filename not in bundle.entries:
+                logger.error(f"{filename} is not in the bundle")
+                sys.exit(1)
+            sys.stdout.buffer.write(bundle.read(filename))
+        elif args.command == 'extract':
+            args.dest.mkdir(parents=True, exist_ok=True)
+            for filename in bundle.names():
+                (args.dest / filename).write_bytes(bundle.read(filename))
+            logger.info(f"Extracted {len(bundle.entries)} pages to {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
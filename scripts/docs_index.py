@@ -0,0 +1,660 @@
+#!/usr/bin/env python3
+"""
+Local search, section and topic indexes for the Claude Code documentation mirror.
+
+Built by fetch_claude_docs.py next to docs_manifest.json and queried by the
+/docs helper. Uses only the standard library so it runs on any client.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import sys
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "docs_manifest.json"
+SEARCH_INDEX_FILE = "search_index.json"
+SEARCH_INDEX_VERSION = 1
+SECTIONS_INDEX_FILE = "sections_index.json"
+SECTIONS_INDEX_VERSION = 2
+CHANGELOG_FILE = "changelog.md"
+CHANGELOG_INDEX_FILE = "changelog_index.json"
+CHANGELOG_INDEX_VERSION = 1
+TOPICS_INDEX_FILE = "topics_index.json"
+TOPICS_INDEX_VERSION = 1
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+CODE_FENCES = ('```', '~~~')
+SLUG_STRIP_PATTERN = re.compile(r'[^a-z0-9 _-]')
+# Release headings: "## 1.2.3" / "## [v1.2.3]" in CHANGELOG.md, <Update label="1.2.3"> on the docs site
+RELEASE_PATTERN = re.compile(
+    rb'^(?:#{1,3}[ \t]+\[?v?(?P<heading>\d+\.\d+[\w.+-]*)\]?|<Update[ \t]+label="v?(?P<label>\d+\.\d+[^"]*)")',
+    re.MULTILINE)
+
+# Words too common to help ranking
+STOPWORDS = {
+    'a', 'about', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'does', 'explain',
+    'find', 'for', 'from', 'how', 'i', 'if', 'in', 'is', 'it', 'me', 'of', 'on', 'or', 'search',
+    'show', 'tell', 'that', 'the', 'this', 'to', 'what', 'when', 'with', 'you', 'your',
+}
+
+# Topic resolution: a query names a page when its best term scores TOPIC_MATCH_SCORE or more
+# (trigram Dice coefficient) and leads the next page by TOPIC_MATCH_MARGIN; pages scoring at
+# least TOPIC_MIN_SCORE are offered as a shortlist otherwise
+TOPIC_MATCH_SCORE = 0.6
+TOPIC_MATCH_MARGIN = 0.15
+TOPIC_MIN_SCORE = 0.3
+TOPIC_SHORTLIST = 5
+# Nearly every title mentions the product, so it says nothing about which page is meant
+TOPIC_STOPWORDS = STOPWORDS | {'claude', 'code'}
+# Names people reach for that appear in neither the filename, the title nor the URL
+TOPIC_ALIASES = {
+    "amazon-bedrock.md": ["bedrock", "aws"],
+    "changelog.md": ["release notes", "releases", "versions"],
+    "cli-reference.md": ["cli", "flags", "command line"],
+    "costs.md": ["pricing", "tokens"],
+    "env-vars.md": ["env", "environment"],
+    "google-vertex-ai.md": ["vertex", "gcp"],
+    "mcp.md": ["model context protocol", "mcp servers"],
+    "memory.md": ["claude md", "claudemd"],
+    "overview.md": ["claude", "introduction", "intro"],
+    "permissions.md": ["allow", "deny", "allowed tools"],
+    "settings.md": ["config", "configuration", "settings json"],
+    "sub-agents.md": ["subagents", "agents"],
+    "troubleshooting.md": ["problems", "issues"],
+}
+
+
+def write_index(index_path: Path, index: dict) -> None:
+    """Write an index as compact JSON, atomically: a helper reading it meanwhile sees the old or the new one."""
+    tmp_path = index_path.with_name(f".{index_path.name}.tmp")
+    encode = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+    # Written entry by entry (same bytes as json.dumps), so a large index is never also
+    # held in memory as one string and its encoding
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for i, (key, value) in enumerate(index.items()):
+            f.write(('{' if i == 0 else ',') + encode(key) + ':')
+            if isinstance(value, dict):
+                for j, (name, entry) in enumerate(value.items()):
+                    f.write(('{' if j == 0 else ',') + encode(name) + ':' + encode(entry))
+                f.write('}' if value else '{}')
+            else:
+                f.write(encode(value))
+        f.write('}' if index else '{}')
+    os.replace(tmp_path, index_path)
+
+
+def is_code_fence(line: str) -> bool:
+    """Whether a line opens or closes a fenced code block (``` or ~~~)."""
+    return line.lstrip().startswith(CODE_FENCES)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search terms, dropping stopwords and single characters."""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def line_start(text: str, position: int) -> int:
+    return text.rfind('\n', 0, position) + 1
+
+
+def code_block_spans(text: str) -> List[Tuple[int, int]]:
+    """(start, end) of every fenced code block, fence lines included; an unclosed block runs to the end."""
+    fences = set()
+    for marker in CODE_FENCES:
+        position = text.find(marker)
+        while position >= 0:
+            start = line_start(text, position)
+            if is_code_fence(text[start:position + len(marker)]):
+                fences.add(start)
+            position = text.find(marker, position + len(marker))
+    fences = sorted(fences)
+
+    spans = []
+    for opening, closing in zip(fences[::2], fences[1::2] + [None]):
+        if closing is None:
+            spans.append((opening, len(text)))
+        else:
+            line_end = text.find('\n', closing)
+            spans.append((opening, len(text) if line_end < 0 else line_end + 1))
+    return spans
+
+
+def iter_headings(text: str) -> Iterator[Tuple[int, re.Match]]:
+    """
+    Yield (offset, match) for every markdown heading outside fenced code blocks, in order.
+
+    Only lines starting with '#' are looked at, found with str.find rather than
+    by walking every line of the page.
+    """
+    spans = code_block_spans(text)
+    span_starts = [start for start, _ in spans]
+    starts = [0] if text.startswith('#') else []
+    position = text.find('\n#')
+    while position >= 0:
+        starts.append(position + 1)
+        position = text.find('\n#', position + 1)
+    for start in starts:
+        block = bisect_right(span_starts, start) - 1
+        if block >= 0 and start < spans[block][1]:
+            continue
+        end = text.find('\n', start)
+        match = HEADING_PATTERN.match(text[start:end] if end >= 0 else text[start:])
+        if match:
+            yield start, match
+
+
+def extract_headings(text: str) -> List[str]:
+    """Return markdown heading texts in document order, skipping fenced code blocks."""
+    return [match.group(2) for _, match in iter_headings(text)]
+
+
+def slugify(heading: str) -> str:
+    """Anchor-style slug for a heading; the helper applies the same rules to queries."""
+    return SLUG_STRIP_PATTERN.sub('', heading.lower()).strip().replace(' ', '-')
+
+
+def extract_sections(data: bytes) -> List[list]:
+    """
+    Locate every markdown heading in a document, skipping fenced code blocks.
+
+    Returns [[level, title, slug, byte offset, byte length, own hash]] in document
+    order. A section runs until the next heading of the same or a higher level, so
+    it includes its subsections; the hash covers only its own text (up to the next
+    heading of any level), so editing a subsection doesn't mark its parent changed.
+    """
+    # surrogateescape keeps invalid bytes one character each, so byte offsets can be recovered
+    text = data.decode('utf-8', errors='surrogateescape')
+    headings = []
+    offset = 0
+    last = 0
+    for start, match in iter_headings(text):
+        offset += len(text[last:start].encode('utf-8', errors='surrogateescape'))
+        last = start
+        title = match.group(2).encode('utf-8', errors='surrogateescape').decode('utf-8', errors='replace')
+        headings.append([len(match.group(1)), title, slugify(title), offset])
+
+    sections = []
+    for i, (level, title, slug, start) in enumerate(headings):
+        end = len(data)
+        for next_level, _, _, next_start in headings[i + 1:]:
+            if next_level <= level:
+                end = next_start
+                break
+        own_end = headings[i + 1][3] if i + 1 < len(headings) else len(data)
+        own_hash = hashlib.sha256(data[start:own_end]).hexdigest()[:16]
+        sections.append([level, title, slug, start, end - start, own_hash])
+    return sections
+
+
+def load_sections_index(docs_dir: Path) -> Dict[str, dict]:
+    """Return the sections index's per-file entries, or {} if missing or from an older format."""
+    index_path = docs_dir / SECTIONS_INDEX_FILE
+    if not index_path.exists():
+        return {}
+    try:
+        index = json.loads(index_path.read_text(encoding='utf-8'))
+        if index.get("version") == SECTIONS_INDEX_VERSION:
+            return index["files"]
+    except Exception as e:
+        logger.warning(f"Failed to load sections index: {e}")
+    return {}
+
+
+def update_sections_index(docs_dir: Path, files: Dict[str, dict],
+                          old_files: Optional[Dict[str, dict]] = None) -> Dict[str, int]:
+    """
+    Record the heading table of every document for seek-based section reads.
+
+    Tables are only recomputed for files whose manifest hash changed.
+    `old_files` are the index's entries if the caller has already loaded them.
+    Returns counts of reindexed, reused and removed files.
+    """
+    index_path = docs_dir / SECTIONS_INDEX_FILE
+    if old_files is None:
+        old_files = load_sections_index(docs_dir)
+
+    new_files = {}
+    reindexed = 0
+    for filename in sorted(files):
+        content_hash = files[filename].get("hash", "")
+        if not filename.endswith('.md') or not (docs_dir / filename).exists():
+            continue
+        old_entry = old_files.get(filename)
+        if old_entry and old_entry["hash"] == content_hash:
+            new_files[filename] = old_entry
+            continue
+        sections = extract_sections((docs_dir / filename).read_bytes())
+        new_files[filename] = {"hash": content_hash, "sections": sections}
+        reindexed += 1
+
+    write_index(index_path, {"version": SECTIONS_INDEX_VERSION, "files": new_files})
+    reused = len(new_files) - reindexed
+    return {"reindexed": reindexed, "reused": reused, "removed": len(set(old_files) - set(new_files))}
+
+
+def extract_releases(data: bytes) -> List[list]:
+    """
+    Split a changelog into its release sections.
+
+    Returns [[version, byte offset, byte length, sha256]] in document order
+    (newest first). A section runs until the next release heading.
+    """
+    starts = [(match.start(), (match.group('heading') or match.group('label')).decode('utf-8'))
+              for match in RELEASE_PATTERN.finditer(data)]
+    releases = []
+    for i, (start, version) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(data)
+        section_hash = hashlib.sha256(data[start:end]).hexdigest()
+        releases.append([version, start, end - start, section_hash])
+    return releases
+
+
+def update_changelog_index(docs_dir: Path, files: Dict[str, dict]) -> Optional[Dict[str, list]]:
+    """
+    Index the changelog by release, so single releases can be read by seeking.
+
+    The changelog is only re-split when its manifest hash changed. Returns the
+    release count and the versions added, changed (section hash differs) and
+    removed since the previous index, or None when there is no changelog.
+    """
+    entry = files.get(CHANGELOG_FILE)
+    changelog_path = docs_dir / CHANGELOG_FILE
+    if not entry or not changelog_path.exists():
+        return None
+
+    index_path = docs_dir / CHANGELOG_INDEX_FILE
+    old_releases = []
+    if index_path.exists():
+        try:
+            old_index = json.loads(index_path.read_text(encoding='utf-8'))
+            if old_index.get("version") == CHANGELOG_INDEX_VERSION:
+                if old_index["hash"] == entry.get("hash"):
+                    return {"releases": len(old_index["releases"]), "added": [], "changed": [], "removed": []}
+                old_releases = old_index["releases"]
+        except Exception as e:
+            logger.warning(f"Failed to load changelog index: {e}")
+
+    releases = extract_releases(changelog_path.read_bytes())
+    old_hashes = {}
+    for version, _, _, section_hash in old_releases:
+        old_hashes.setdefault(version, section_hash)
+    new_hashes = {}
+    for version, _, _, section_hash in releases:
+        new_hashes.setdefault(version, section_hash)
+
+    write_index(index_path, {
+        "version": CHANGELOG_INDEX_VERSION,
+        "file": CHANGELOG_FILE,
+        "hash": entry.get("hash", ""),
+        "releases": releases,
+    })
+
+    return {
+        "releases": len(releases),
+        "added": [version for version in new_hashes if version not in old_hashes],
+        "changed": [version for version in new_hashes
+                    if version in old_hashes and old_hashes[version] != new_hashes[version]],
+        "removed": [version for version in old_hashes if version not in new_hashes],
+    }
+
+
+def load_search_index(docs_dir: Path) -> Optional[dict]:
+    """Load the search index, or None if it is missing or from an older format."""
+    index_path = docs_dir / SEARCH_INDEX_FILE
+    if not index_path.exists():
+        return None
+    try:
+        index = json.loads(index_path.read_text(encoding='utf-8'))
+    except Exception as e:
+        logger.warning(f"Failed to load search index: {e}")
+        return None
+    if index.get("version") != SEARCH_INDEX_VERSION:
+        return None
+    return index
+
+
+def update_search_index(docs_dir: Path, files: Dict[str, dict]) -> Dict[str, int]:
+    """
+    Bring the search index in line with the manifest's `files` entries.
+
+    Only files whose manifest hash differs from the one recorded in the index are
+    re-tokenized; postings for everything else are carried over as they are.
+    Returns counts of reindexed, reused and removed files.
+    """
+    index = load_search_index(docs_dir) or {"docs": [], "postings": {}}
+    old_docs = index["docs"]
+
+    wanted = {
+        filename: entry.get("hash", "")
+        for filename, entry in files.items()
+        if filename.endswith('.md') and (docs_dir / filename).exists()
+    }
+
+    # Keep documents whose content hash hasn't moved, remembering their old ids
+    kept = {doc["file"]: old_id for old_id, doc in enumerate(old_docs)
+            if wanted.get(doc["file"]) == doc["hash"]}
+
+    docs = []
+    doc_ids = {}
+    for filename in sorted(wanted):
+        doc_ids[filename] = len(docs)
+        if filename in kept:
+            docs.append(old_docs[kept[filename]])
+        else:
+            docs.append({"file": filename, "hash": wanted[filename]})
+
+    # Remap postings of kept documents to their new ids, dropping everything else
+    remap = {old_id: doc_ids[filename] for filename, old_id in kept.items()}
+    postings: Dict[str, List[int]] = {}
+    for term, flat in index["postings"].items():
+        carried = []
+        for i in range(0, len(flat), 2):
+            new_id = remap.get(flat[i])
+            if new_id is not None:
+                carried.extend((new_id, flat[i + 1]))
+        if carried:
+            postings[term] = carried
+
+    # Tokenize new and changed documents
+    reindexed = 0
+    for filename in sorted(wanted):
+        if filename in kept:
+            continue
+        doc_id = doc_ids[filename]
+        text = (docs_dir / filename).read_text(encoding='utf-8')
+        terms = tokenize(text)
+        headings = extract_headings(text)
+        docs[doc_id].update({
+            "length": len(terms),
+            "title": headings[0] if headings else filename[:-3],
+            "headings": headings,
+        })
+        counts: Dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        for term, tf in counts.items():
+            postings.setdefault(term, []).extend((doc_id, tf))
+        reindexed += 1
+
+    # Keep postings sorted by doc id so the file is stable across runs
+    for term, flat in postings.items():
+        pairs = sorted(zip(flat[::2], flat[1::2]))
+        postings[term] = [value for pair in pairs for value in pair]
+
+    total_length = sum(doc["length"] for doc in docs)
+    new_index = {
+        "version": SEARCH_INDEX_VERSION,
+        "doc_count": len(docs),
+        "avg_length": total_length / len(docs) if docs else 0,
+        "docs": docs,
+        "postings": dict(sorted(postings.items())),
+    }
+    write_index(docs_dir / SEARCH_INDEX_FILE, new_index)
+
+    return {"reindexed": reindexed, "reused": len(kept), "removed": len(old_docs) - len(kept)}
+
+
+def search(index: dict, query: str, limit: int = 10) -> List[Tuple[str, float, str, List[str]]]:
+    """
+    Rank documents against a free-text query with BM25.
+
+    Returns [(filename, score, title, matching headings)] best match first.
+    """
+    terms = set(tokenize(query))
+    docs = index["docs"]
+    n = index["doc_count"]
+    avg_length = index["avg_length"] or 1
+
+    scores: Dict[int, float] = {}
+    for term in terms:
+        flat = index["postings"].get(term)
+        if not flat:
+            continue
+        df = len(flat) // 2
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for i in range(0, len(flat), 2):
+            doc_id, tf = flat[i], flat[i + 1]
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * docs[doc_id]["length"] / avg_length)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], docs[item[0]]["file"]))[:limit]
+    results = []
+    for doc_id, score in ranked:
+        doc = docs[doc_id]
+        headings = [h for h in doc["headings"] if terms & set(tokenize(h))]
+        results.append((doc["file"], score, doc["title"], headings))
+    return results
+
+
+def normalize_topic(text: str) -> str:
+    """Lowercase a name, title or query and reduce it to its significant words."""
+    words = TOKEN_PATTERN.findall(text.lower().replace("'", '').replace('\u2019', ''))
+    significant = [word for word in words if word not in TOPIC_STOPWORDS]
+    return ' '.join(significant or words)
+
+
+def trigrams(term: str) -> List[str]:
+    """Distinct character trigrams of a normalized term, padded so word edges count."""
+    padded = f" {term} "
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+def topic_terms(filename: str, entry: dict, title: str) -> Dict[str, int]:
+    """
+    Names a page answers to, each with its rank: 0 for the filename, 1 for an
+    alias, 2 for a URL path segment and 3 for the title.
+    """
+    names = [(filename[:-3], 0)]
+    names.extend((alias, 1) for alias in TOPIC_ALIASES.get(filename, []))
+    names.append((filename[:-3].split('__')[-1], 2))
+    path = urlparse(entry.get("original_url", "")).path.strip('/').split('/')
+    if len(path) > 2 and path[0] == 'docs':
+        names.extend((segment, 2) for segment in path[2:])
+    names.append((title, 3))
+    terms: Dict[str, int] = {}
+    for name, rank in names:
+        term = normalize_topic(name)
+        if term and term not in terms:
+            terms[term] = rank
+    return terms
+
+
+def load_topics_index(docs_dir: Path) -> Optional[dict]:
+    """Load the topics index, or None if it is missing or from an older format."""
+    index_path = docs_dir / TOPICS_INDEX_FILE
+    if not index_path.exists():
+        return None
+    try:
+        index = json.loads(index_path.read_text(encoding='utf-8'))
+    except Exception as e:
+        logger.warning(f"Failed to load topics index: {e}")
+        return None
+    if index.get("version") != TOPICS_INDEX_VERSION:
+        return None
+    return index
+
+
+def update_topics_index(docs_dir: Path, files: Dict[str, dict]) -> Dict[str, int]:
+    """
+    Build the topic resolution table behind typo-tolerant /docs lookups.
+
+    Every page is listed under its filename, URL path segments, aliases and
+    title; `exact` maps each normalized term to its pages and `trigrams` maps
+    each trigram to the terms containing it. Titles are only re-read for files
+    whose manifest hash changed. Returns counts of reindexed, reused and
+    removed files and of terms.
+    """
+    old_index = load_topics_index(docs_dir)
+    old_files = old_index["files"] if old_index else {}
+
+    new_files = {}
+    reindexed = 0
+    for filename in sorted(files):
+        content_hash = files[filename].get("hash", "")
+        if not filename.endswith('.md') or '/' in filename or not (docs_dir / filename).exists():
+            continue
+        old_entry = old_files.get(filename)
+        if old_entry and old_entry["hash"] == content_hash:
+            new_files[filename] = old_entry
+            continue
+        first = next(iter_headings((docs_dir / filename).read_text(encoding='utf-8', errors='replace')), None)
+        new_files[filename] = {"hash": content_hash, "title": first[1].group(2) if first else filename[:-3]}
+        reindexed += 1
+
+    # A page's own filename outranks another page's alias, URL segment or title for the same term
+    ranked: Dict[str, List[Tuple[int, str]]] = {}
+    for filename, entry in new_files.items():
+        for term, rank in topic_terms(filename, files[filename], entry["title"]).items():
+            ranked.setdefault(term, []).append((rank, filename))
+    terms = sorted(ranked)
+    postings: Dict[str, List[int]] = {}
+    for term_id, term in enumerate(terms):
+        for trigram in trigrams(term):
+            postings.setdefault(trigram, []).append(term_id)
+
+    index = {
+        "version": TOPICS_INDEX_VERSION,
+        "match_score": TOPIC_MATCH_SCORE,
+        "match_margin": TOPIC_MATCH_MARGIN,
+        "min_score": TOPIC_MIN_SCORE,
+        "stopwords": sorted(TOPIC_STOPWORDS),
+        "files": new_files,
+        # [term, pages best first, trigram count]
+        "terms": [[term, [filename for _, filename in sorted(ranked[term])], len(trigrams(term))]
+                  for term in terms],
+        "exact": {term: term_id for term_id, term in enumerate(terms)},
+        "trigrams": dict(sorted(postings.items())),
+    }
+    write_index(docs_dir / TOPICS_INDEX_FILE, index)
+
+    return {"reindexed": reindexed, "reused": len(new_files) - reindexed,
+            "removed": len(set(old_files) - set(new_files)), "terms": len(terms)}
+
+
+def resolve_topic(index: dict, query: str) -> Tuple[Optional[str], List[Tuple[str, float, str]]]:
+    """
+    Resolve a topic as typed to a page.
+
+    Returns (page, shortlist): the page when a term matches exactly or clearly
+    better than any other term, and [(filename, score, title)] of the closest
+    pages best first. A term's pages are in rank order, so the page a term
+    names outranks pages that merely mention it.
+    """
+    term = normalize_topic(query)
+    terms = index["terms"]
+    if term in index["exact"]:
+        pages = terms[index["exact"][term]][1]
+        return pages[0], [(page, 1.0, index["files"][page]["title"]) for page in pages[:TOPIC_SHORTLIST]]
+
+    query_trigrams = trigrams(term)
+    shared: Dict[int, int] = {}
+    for trigram in query_trigrams:
+        for term_id in index["trigrams"].get(trigram, []):
+            shared[term_id] = shared.get(term_id, 0) + 1
+    term_scores = sorted(((2 * count / (len(query_trigrams) + terms[term_id][2]), term_id)
+                          for term_id, count in shared.items()), key=lambda item: (-item[0], item[1]))
+    best: Dict[str, Tuple[float, int]] = {}
+    for score, term_id in term_scores:
+        for position, page in enumerate(terms[term_id][1]):
+            if page not in best or (score, -position) > (best[page][0], -best[page][1]):
+                best[page] = (score, position)
+
+    ranked = sorted(best, key=lambda page: (-best[page][0], best[page][1], page))
+    shortlist = [(page, round(best[page][0], 3), index["files"][page]["title"])
+                 for page in ranked[:TOPIC_SHORTLIST] if best[page][0] >= index["min_score"]]
+    if not term_scores or term_scores[0][0] < index["match_score"]:
+        return None, shortlist
+    page = terms[term_scores[0][1]][1][0]
+    runner_up = next((score for score, term_id in term_scores if terms[term_id][1][0] != page), 0.0)
+    if term_scores[0][0] - runner_up >= index["match_margin"]:
+        return page, shortlist
+    return None, shortlist
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the local docs search index")
+    parser.add_argument('--docs-dir', type=Path, default=Path(__file__).parent.parent / 'docs',
+                        help="Directory holding the docs and docs_manifest.json")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('build', help="Update the search, sections, changelog and topics indexes from docs_manifest.json")
+
+    search_parser = subparsers.add_parser('search', help="Search the docs (BM25 ranked)")
+    search_parser.add_argument('query', nargs='+')
+    search_parser.add_argument('--limit', type=int, default=5)
+    search_parser.add_argument('--json', action='store_true', help="Print results as JSON")
+
+    resolve_parser = subparsers.add_parser('resolve', help="Resolve a possibly misspelled topic to a page")
+    resolve_parser.add_argument('query', nargs='+')
+    resolve_parser.add_argument('--json', action='store_true', help="Print the result as JSON")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    if args.command == 'build':
+        manifest = json.loads((args.docs_dir / MANIFEST_FILE).read_text())
+        stats = update_search_index(args.docs_dir, manifest.get("files", {}))
+        logger.info(f"Search index updated: {stats['reindexed']} reindexed, "
+                    f"{stats['reused']} reused, {stats['removed']} removed")
+        stats = update_sections_index(args.docs_dir, manifest.get("files", {}))
+        logger.info(f"Sections index updated: {stats['reindexed']} reindexed, "
+                    f"{stats['reused']} reused, {stats['removed']} removed")
+        releases = update_changelog_index(args.docs_dir, manifest.get("files", {}))
+        if releases:
+            logger.info(f"Changelog index updated: {releases['releases']} releases, "
+                        f"{len(releases['added'])} added, {len(releases['changed'])} changed")
+        stats = update_topics_index(args.docs_dir, manifest.get("files", {}))
+        logger.info(f"Topics index updated: {stats['reindexed']} reindexed, "
+                    f"{stats['reused']} reused, {stats['removed']} removed, {stats['terms']} terms")
+        return
+
+    if args.command == 'resolve':
+        index = load_topics_index(args.docs_dir)
+        if index is None:
+            logger.error("Topics index not found - run: docs_index.py build")
+            sys.exit(1)
+        page, shortlist = resolve_topic(index, ' '.join(args.query))
+        if args.json:
+            print(json.dumps({"page": page, "shortlist": [{"file": f, "score": s, "title": t}
+                                                          for f, s, t in shortlist]}, indent=2))
+            return
+        if page:
+            print(page[:-3])
+            return
+        for filename, score, title in shortlist:
+            print(f"  • {filename[:-3]} - {title} ({score:.2f})")
+        sys.exit(1)
+
+    index = load_search_index(args.docs_dir)
+    if index is None:
+        logger.error("Search index not found - run: docs_index.py build")
+        sys.exit(1)
+
+    results = search(index, ' '.join(args.query), args.limit)
+    if args.json:
+        print(json.dumps([{"file": f, "score": round(s, 3), "title": t, "headings": h}
+                          for f, s, t, h in results], indent=2))
+        return
+    for filename, score, title, headings in results:
+        print(f"  • {filename[:-3]} - {title}")
+        for heading in headings[:3]:
+            print(f"      § {heading}")
+
+
+if __name__ == "__main__":
+    main()
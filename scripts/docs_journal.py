@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Change journal for the Claude Code documentation mirror.
+
+Each fetcher run that changes anything appends one JSON line to
+docs/changes.jsonl: when it ran, which files were added or removed, and for
+changed files which headings were added, edited or removed (changelog entries
+list the releases instead). The /docs helper answers "what's new" by reading
+this one file. Once the journal outgrows JOURNAL_MAX_BYTES, runs older than
+the newest JOURNAL_KEEP_RUNS are merged into one entry per day.
+"""
+
+import argparse
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE = "changes.jsonl"
+JOURNAL_MAX_BYTES = 512 * 1024  # compact once the journal grows past this
+JOURNAL_KEEP_RUNS = 200  # newest runs kept verbatim by compaction (~25 days at 3-hourly runs)
+MAX_HEADINGS = 10  # headings listed per file and kind of change
+
+
+def heading_changes(old_sections: List[list], new_sections: List[list]) -> Dict[str, List[str]]:
+    """
+    Compare two heading tables from the sections index.
+
+    Headings are matched by slug (numbered when a slug repeats) and compared by
+    the hash of their own text. Returns {"added", "changed", "removed"} titles.
+    """
+    def keyed(sections: List[list]) -> Dict[str, list]:
+        table = {}
+        seen: Dict[str, int] = {}
+        for section in sections:
+            slug = section[2]
+            seen[slug] = seen.get(slug, 0) + 1
+            table[slug if seen[slug] == 1 else f"{slug}#{seen[slug]}"] = section
+        return table
+
+    old_table = keyed(old_sections)
+    new_table = keyed(new_sections)
+    return {
+        "added": [section[1] for key, section in new_table.items() if key not in old_table][:MAX_HEADINGS],
+        "changed": [section[1] for key, section in new_table.items()
+                    if key in old_table and old_table[key][5:] != section[5:]][:MAX_HEADINGS],
+        "removed": [section[1] for key, section in old_table.items() if key not in new_table][:MAX_HEADINGS],
+    }
+
+
+def build_entry(old_files: Dict[str, dict], new_files: Dict[str, dict],
+                old_sections: Dict[str, dict], new_sections: Dict[str, dict],
+                release_changes: Optional[Dict[str, list]] = None) -> Optional[dict]:
+    """
+    Describe what changed between two manifests, or None if nothing did.
+
+    `old_sections`/`new_sections` are the sections index entries from before and
+    after the run; `release_changes` is the changelog index diff.
+    """
+    added = sorted(name for name in new_files if name not in old_files)
+    removed = sorted(name for name in old_files if name not in new_files)
+    changed = {}
+    for name in sorted(new_files):
+        if name not in old_files or old_files[name].get("hash") == new_files[name].get("hash"):
+            continue
+        if release_changes is not None and name == "changelog.md":
+            releases = release_changes["added"] + release_changes["changed"]
+            if releases:
+                changed[name] = {"releases": releases[:MAX_HEADINGS]}
+            continue
+        old_entry = old_sections.get(name)
+        new_entry = new_sections.get(name)
+        if old_entry and new_entry:
+            changes = heading_changes(old_entry["sections"], new_entry["sections"])
+            changed[name] = {kind: titles for kind, titles in changes.items() if titles}
+        else:
+            changed[name] = {}
+
+    if not (added or removed or changed):
+        return None
+    return {
+        "time": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+    }
+
+
+def read_journal(docs_dir: Path) -> List[dict]:
+    journal_path = docs_dir / JOURNAL_FILE
+    if not journal_path.exists():
+        return []
+    entries = []
+    for line in journal_path.read_text(encoding='utf-8').splitlines():
+        if line.strip():
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                logger.warning(f"Skipping unreadable journal line: {line[:80]}")
+    return entries
+
+
+def merge_entries(entries: List[dict], time: str) -> dict:
+    """Fold several journal entries into one, unioning files and headings."""
+    merged = {"time": time, "runs": 0, "added": [], "changed": {}, "removed": []}
+    for entry in entries:
+        merged["runs"] += entry.get("runs", 1)
+        for key in ("added", "removed"):
+            merged[key].extend(name for name in entry[key] if name not in merged[key])
+        for name, details in entry["changed"].items():
+            target = merged["changed"].setdefault(name, {})
+            for kind, titles in details.items():
+                bucket = target.setdefault(kind, [])
+                bucket.extend(title for title in titles if title not in bucket)
+                del bucket[MAX_HEADINGS:]
+    return merged
+
+
+def compact_journal(docs_dir: Path, max_bytes: int = JOURNAL_MAX_BYTES,
+                    keep_runs: int = JOURNAL_KEEP_RUNS) -> bool:
+    """
+    Bound the journal's size: merge older runs into one entry per day, then drop
+    the oldest days if it is still too large. Returns True if it was rewritten.
+    """
+    journal_path = docs_dir / JOURNAL_FILE
+    if not journal_path.exists() or journal_path.stat().st_size <= max_bytes:
+        return False
+
+    entries = read_journal(docs_dir)
+    recent = entries[-keep_runs:]
+    by_day: Dict[str, List[dict]] = {}
+    for entry in entries[:-keep_runs] if len(entries) > keep_runs else []:
+        by_day.setdefault(entry["time"][:10], []).append(entry)
+    compacted = [merge_entries(day_entries, f"{day}T00:00:00Z") for day, day_entries in sorted(by_day.items())]
+
+    lines = [json.dumps(entry, separators=(',', ':'), ensure_ascii=False) for entry in compacted + recent]
+    while len(lines) > 1 and sum(len(line.encode('utf-8')) + 1 for line in lines) > max_bytes:
+        lines.pop(0)
+
+    tmp_path = journal_path.with_name(f".{JOURNAL_FILE}.tmp")
+    tmp_path.write_text(''.join(line + '\n' for line in lines), encoding='utf-8')
+    os.replace(tmp_path, journal_path)
+    logger.info(f"Compacted change journal: {len(entries)} entries -> {len(lines)}")
+    return True
+
+
+def append_journal(docs_dir: Path, entry: dict) -> None:
+    """Append one run's entry, compacting the journal if it grew past its bound."""
+    with open(docs_dir / JOURNAL_FILE, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, separators=(',', ':'), ensure_ascii=False) + '\n')
+    compact_journal(docs_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the documentation change journal")
+    parser.add_argument('--docs-dir', type=Path, default=Path(__file__).parent.parent / 'docs')
+    parser.add_argument('--days', type=int, help="Only show changes from the last N days")
+    parser.add_argument('--json', action='store_true', help="Print the entries as JSON")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    entries = read_journal(args.docs_dir)
+    if args.days is not None:
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=args.days)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        entries = [entry for entry in entries if entry["time"] >= cutoff]
+
+    if args.json:
+        print(json.dumps(entries, indent=2, ensure_ascii=False))
+        return
+    for entry in reversed(entries):
+        print(f"• {entry['time']}" + (f" ({entry['runs']} runs)" if entry.get("runs") else ""))
+        for name in entry["added"]:
+            print(f"  ➕ {name[:-3]}")
+        for name, details in entry["changed"].items():
+            print(f"  📄 {name[:-3]}")
+            for kind, titles in details.items():
+                for title in titles:
+                    print(f"      {kind}: {title}")
+        for name in entry["removed"]:
+            print(f"  ➖ {name[:-3]}")
+
+
+if __name__ == "__main__":
+    main()
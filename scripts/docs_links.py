@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Link graph of the Claude Code documentation mirror.
+
+The fetcher extracts every link from each page and resolves it to a local
+filename through the manifest, whose original_url for each page records the
+filename url_to_safe_filename() gave it. docs/links_index.json keeps each
+page's raw links (only re-read when the page's hash changes), its outbound
+links, its backlinks and a short list of related pages, so the /docs helper
+can answer "related" and "backlinks" with a single lookup.
+
+The mirrored pages keep their original links, because their hashes and
+section offsets must match what was fetched. `export` writes a copy of the
+mirror with the links rewritten to the local files.
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import os
+import re
+import sys
+from bisect import bisect_right
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlparse
+
+from docs_index import code_block_spans, line_start, write_index
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "docs_manifest.json"
+LINKS_INDEX_FILE = "links_index.json"
+LINKS_INDEX_VERSION = 1
+MAX_RELATED = 8  # related pages kept per page
+
+# Hosts the docs have been served from; links to any of them point into the mirror
+DOCS_HOSTS = {"code.claude.com", "docs.claude.com", "docs.anthropic.com"}
+# Legacy docs.anthropic.com paths: /en/docs/claude-code/hooks -> /docs/en/hooks
+LEGACY_PATH_PATTERN = re.compile(r'^/([a-z]{2}(?:-[A-Za-z0-9]{2,4})?)/docs/claude-code/(.+)$')
+
+# Inline links [text](target "title") and href="target". They are matched against the whole
+# page, so none of them may run past the end of a line, and each starts with a literal for re
+# to scan for (\bhref=... would be tried at every position)
+LINK_PATTERNS = [
+    re.compile(r'\]\([ \t]*<?(?P<target>[^)\s>]+)>?(?:[ \t]+"[^"\n]*")?[ \t]*\)'),
+    re.compile(r'href(?<=\bhref)=["\'](?P<target>[^"\'\n]+)["\']'),
+]
+# Reference definitions [id]: target; iter_links checks they start their line (up to 3 spaces in)
+REFERENCE_PATTERN = re.compile(r'\[[^\]\n]+\]:[ \t]*<?(?P<target>[^\s>]+)>?')
+# Scheme and host of a link target, read without parsing it as a URL
+TARGET_SCHEME_PATTERN = re.compile(r'^([A-Za-z][A-Za-z0-9+.-]*):')
+TARGET_HOST_PATTERN = re.compile(r'^(?:https?:)?//([^/?#]*)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def link_key(url: str) -> Optional[str]:
+    """
+    Normalize an absolute URL into the key pages are looked up by.
+
+    Docs hosts collapse into one, and legacy paths, `.md`/`.html` suffixes and
+    trailing slashes are dropped, so every spelling of a page gives the same key.
+    Returns None for non-HTTP links.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.netloc:
+        return None
+    path = parsed.path.rstrip('/')
+    for suffix in ('.md', '.html'):
+        if path.endswith(suffix):
+            path = path[:-len(suffix)]
+    if parsed.netloc in DOCS_HOSTS:
+        legacy = LEGACY_PATH_PATTERN.match(path)
+        if legacy:
+            path = f"/docs/{legacy.group(1)}/{legacy.group(2)}"
+        return f"docs:{path}"
+    return f"{parsed.netloc}:{path}"
+
+
+def page_keys(files: Dict[str, dict], base_url: Optional[str] = None) -> Dict[str, str]:
+    """Map link keys to the filenames of the pages the manifest lists."""
+    keys = {}
+    for filename, entry in sorted(files.items()):
+        url = entry.get("original_url")
+        key = link_key(url) if url else None
+        if key:
+            keys.setdefault(key, filename)
+            # Pages fetched from a stand-in or a new host still answer to docs links
+            if base_url and url.startswith(base_url):
+                keys.setdefault(f"docs:{urlparse(url).path.rstrip('/')}", filename)
+    return keys
+
+
+def starts_line(text: str, position: int, max_indent: int = 3) -> bool:
+    """Whether only up to `max_indent` spaces or tabs precede `position` on its line."""
+    indent = text[line_start(text, position):position]
+    return len(indent) <= max_indent and not indent.strip(' \t')
+
+
+def iter_links(text: str):
+    """Yield (start, end, target) for every link outside fenced code blocks, in page order."""
+    spans = code_block_spans(text)
+    span_starts = [start for start, _ in spans]
+    found = [[(match.start('target'), match.end('target'), match.group('target'))
+              for match in pattern.finditer(text)] for pattern in LINK_PATTERNS]
+    found.append([(match.start('target'), match.end('target'), match.group('target'))
+                  for match in REFERENCE_PATTERN.finditer(text)
+                  if starts_line(text, match.start())])
+    for start, end, target in heapq.merge(*found):
+        block = bisect_right(span_starts, start) - 1
+        if block < 0 or start >= spans[block][1]:
+            yield start, end, target
+
+
+def may_link_to_page(target: str, page_host: str) -> bool:
+    """
+    Whether a link target can point at a mirrored page, decided before resolving it.
+
+    Fragment-only links point back into the page itself, links with another
+    scheme (mailto:, tel:, ...) and absolute links to hosts other than the docs
+    hosts and the page's own can't resolve to a page either.
+    """
+    if target.startswith('#'):
+        return False
+    scheme = TARGET_SCHEME_PATTERN.match(target)
+    if scheme and scheme.group(1).lower() not in ('http', 'https'):
+        return False
+    host = TARGET_HOST_PATTERN.match(target)
+    return not host or host.group(1).lower() in DOCS_HOSTS or host.group(1).lower() == page_host
+
+
+def resolve_targets(text: str, page_url: str):
+    """
+    Yield (start, end, link key, fragment) for the page's links that may point
+    at a mirrored page. Each distinct target is resolved once per page.
+    """
+    page_host = urlparse(page_url).netloc.lower()
+    resolved: Dict[str, Tuple[Optional[str], str]] = {}
+    for start, end, target in iter_links(text):
+        if target not in resolved:
+            if may_link_to_page(target, page_host):
+                url, fragment = urldefrag(urljoin(page_url, target))
+                resolved[target] = (link_key(url), fragment)
+            else:
+                resolved[target] = (None, '')
+        key, fragment = resolved[target]
+        if key:
+            yield start, end, key, fragment
+
+
+def extract_links(text: str, page_url: str) -> Dict[str, int]:
+    """Return {link key: occurrences} for the page's links, resolved against its URL."""
+    links: Dict[str, int] = {}
+    for _, _, key, _ in resolve_targets(text, page_url):
+        links[key] = links.get(key, 0) + 1
+    return links
+
+
+def load_links_index(docs_dir: Path) -> Dict[str, dict]:
+    """Return the links index's per-file entries, or {} if missing or from an older format."""
+    index_path = docs_dir / LINKS_INDEX_FILE
+    if not index_path.exists():
+        return {}
+    try:
+        index = json.loads(index_path.read_text(encoding='utf-8'))
+        if index.get("version") == LINKS_INDEX_VERSION:
+            return index["files"]
+    except Exception as e:
+        logger.warning(f"Failed to load links index: {e}")
+    return {}
+
+
+def update_links_index(docs_dir: Path, files: Dict[str, dict], base_url: Optional[str] = None) -> Dict[str, int]:
+    """
+    Bring the link graph in line with the manifest's `files` entries.
+
+    Links are only re-extracted from files whose manifest hash changed; every
+    link is then resolved again, so links to pages added or removed since are
+    picked up. Returns counts of reindexed, reused and removed files and of
+    resolved links.
+    """
+    old_files = load_links_index(docs_dir)
+    keys = page_keys(files, base_url)
+
+    raw = {}
+    reindexed = 0
+    for filename in sorted(files):
+        entry = files[filename]
+        if not filename.endswith('.md') or not (docs_dir / filename).exists():
+            continue
+        old_entry = old_files.get(filename)
+        if old_entry and old_entry["hash"] == entry.get("hash", ""):
+            raw[filename] = old_entry["links"]
+            continue
+        text = (docs_dir / filename).read_text(encoding='utf-8', errors='replace')
+        raw[filename] = extract_links(text, entry.get("original_url", ""))
+        reindexed += 1
+
+    outbound: Dict[str, Dict[str, int]] = {}
+    inbound: Dict[str, Dict[str, int]] = {}
+    for filename, links in raw.items():
+        targets: Dict[str, int] = {}
+        for key, count in links.items():
+            target = keys.get(key)
+            if target and target != filename and target in raw:
+                targets[target] = targets.get(target, 0) + count
+        outbound[filename] = targets
+        for target, count in targets.items():
+            inbound.setdefault(target, {})[filename] = count
+
+    new_files = {}
+    resolved = 0
+    for filename in raw:
+        weights: Dict[str, int] = {}
+        for other, count in list(outbound[filename].items()) + list(inbound.get(filename, {}).items()):
+            weights[other] = weights.get(other, 0) + count
+        related = sorted(weights, key=lambda other: (-weights[other], other))[:MAX_RELATED]
+        new_files[filename] = {
+            "hash": files[filename].get("hash", ""),
+            "links": raw[filename],
+            "outbound": sorted(outbound[filename].items()),
+            "related": related,
+        }
+        resolved += sum(outbound[filename].values())
+
+    index = {
+        "version": LINKS_INDEX_VERSION,
+        "files": new_files,
+        "inbound": {target: sorted(sources.items()) for target, sources in sorted(inbound.items())},
+    }
+    write_index(docs_dir / LINKS_INDEX_FILE, index)
+
+    return {"reindexed": reindexed, "reused": len(raw) - reindexed,
+            "removed": len(set(old_files) - set(raw)), "links": resolved}
+
+
+def rewrite_links(text: str, page_url: str, keys: Dict[str, str]) -> Tuple[str, int]:
+    """Point links to mirrored pages at the local files. Returns (text, links rewritten)."""
+    parts = []
+    last = 0
+    rewritten = 0
+    for start, end, key, fragment in resolve_targets(text, page_url):
+        filename = keys.get(key)
+        if not filename:
+            continue
+        parts.append(text[last:start])
+        parts.append(filename + (f"#{fragment}" if fragment else ""))
+        last = end
+        rewritten += 1
+    parts.append(text[last:])
+    return ''.join(parts), rewritten
+
+
+def export_local_copy(docs_dir: Path, files: Dict[str, dict], dest: Path,
+                      base_url: Optional[str] = None) -> Dict[str, int]:
+    """
+    Write a copy of the mirrored pages to `dest` with their links rewritten to
+    the local files. Files whose output is unchanged are left alone.
+    Returns counts of written and unchanged files and of rewritten links.
+    """
+    keys = page_keys(files, base_url)
+    dest.mkdir(parents=True, exist_ok=True)
+    written = 0
+    unchanged = 0
+    links = 0
+    for filename in sorted(files):
+        path = docs_dir / filename
+        if not filename.endswith('.md') or '/' in filename or not path.exists():
+            continue
+        text, rewritten = rewrite_links(path.read_text(encoding='utf-8', errors='replace'),
+                                        files[filename].get("original_url", ""), keys)
+        links += rewritten
+        data = text.encode('utf-8')
+        out_path = dest / filename
+        if out_path.exists() and out_path.read_bytes() == data:
+            unchanged += 1
+            continue
+        tmp_path = out_path.with_name(f".{filename}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, out_path)
+        written += 1
+    return {"written": written, "unchanged": unchanged, "links": links}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the docs link graph")
+    parser.add_argument('--docs-dir', type=Path, default=Path(__file__).parent.parent / 'docs',
+                        help="Directory holding the docs and docs_manifest.json")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('build', help="Update links_index.json from docs_manifest.json")
+    for command, help_text in (('related', "List pages related to a topic"),
+                               ('links', "List a topic's outbound links and backlinks")):
+        topic_parser = subparsers.add_parser(command, help=help_text)
+        topic_parser.add_argument('topic')
+        topic_parser.add_argument('--json', action='store_true', help="Print the result as JSON")
+    export_parser = subparsers.add_parser('export', help="Copy the docs with links rewritten to local files")
+    export_parser.add_argument('dest', type=Path)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    if args.command in ('build', 'export'):
+        manifest = json.loads((args.docs_dir / MANIFEST_FILE).read_text())
+        files = manifest.get("files", {})
+        base_url = manifest.get("fetch_metadata", {}).get("base_url")
+        if args.command == 'build':
+            stats = update_links_index(args.docs_dir, files, base_url)
+            logger.info(f"Links index updated: {stats['reindexed']} reindexed, {stats['reused']} reused, "
+                        f"{stats['removed']} removed, {stats['links']} links")
+        else:
+            stats = export_local_copy(args.docs_dir, files, args.dest, base_url)
+            logger.info(f"Exported to {args.dest}: {stats['written']} written, {stats['unchanged']} unchanged, "
+                        f"{stats['links']} links rewritten")
+        return
+
+    index_path = args.docs_dir / LINKS_INDEX_FILE
+    if not load_links_index(args.docs_dir):
+        logger.error("Links index not found - run: docs_links.py build")
+        sys.exit(1)
+    index = json.loads(index_path.read_text(encoding='utf-8'))
+    filename = args.topic if args.topic.endswith('.md') else args.topic + '.md'
+    entry = index["files"].get(filename)
+    if entry is None:
+        logger.error(f"{filename} is not in the links index")
+        sys.exit(1)
+
+    if args.command == 'related':
+        if args.json:
+            print(json.dumps(entry["related"]))
+            return
+        for name in entry["related"]:
+            print(f"  • {name[:-3]}")
+        return
+
+    result = {"outbound": entry["outbound"], "inbound": index["inbound"].get(filename, [])}
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print("Links to:")
+    for name, count in result["outbound"]:
+        print(f"  • {name[:-3]}" + (f" ({count}x)" if count > 1 else ""))
+    print("Linked from:")
+    for name, count in result["inbound"]:
+        print(f"  • {name[:-3]}" + (f" ({count}x)" if count > 1 else ""))
+
+
+if __name__ == "__main__":
+    main()
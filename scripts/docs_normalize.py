@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Normalization of fetched documentation before it is hashed and saved.
+
+A page only counts as changed when its normalized text does, so volatile
+bytes (line endings, trailing whitespace, build stamps, cache-busting query
+strings) don't rewrite files or produce commits. The fetcher normalizes every
+response; docs_verify.py applies the same steps to upstream copies when
+repairing files, so they can be checked against the manifest's hashes. Uses
+only the standard library.
+"""
+
+import re
+from typing import Iterable
+
+# Line endings become LF, trailing whitespace goes (a markdown hard break keeps two spaces),
+# and these (pattern, replacement, markers) are applied; the fetcher's --volatile-pattern adds
+# removals. A pattern is only run on pages containing one of its markers, substrings every
+# match includes (None: always run). Single bytes are the cheapest to look for
+VOLATILE_PATTERNS = [
+    # Build stamps left in comments, e.g. <!-- generated 2025-01-01T00:00:00Z -->
+    (re.compile(rb'<!--\s*(?:generated|build|built|rendered)\b[^>]*-->[ \t]*\n?', re.IGNORECASE), b'',
+     (b'<',)),
+    # Cache-busting query strings on assets: logo.svg?v=3f2a1c -> logo.svg
+    (re.compile(rb'(\.(?:png|jpe?g|gif|svg|webp|css|js))\?(?:v|ver|version|hash|t)=[\w.-]+'), rb'\1',
+     (b'?',)),
+]
+TRAILING_WHITESPACE_PATTERN = re.compile(rb'[ \t]+$', re.MULTILINE)
+
+# Put in front of the changelog from the Claude Code repository, so it reads as one of the docs
+CHANGELOG_HEADER = b"""# Claude Code Changelog
+
+> **Source**: https://github.com/anthropics/claude-code/blob/main/CHANGELOG.md
+> 
+> This is the official Claude Code release changelog, automatically fetched from the Claude Code repository. For documentation, see other topics via `/docs`.
+
+---
+
+"""
+
+
+def normalize_content(content: bytes, volatile_patterns: Iterable[tuple] = VOLATILE_PATTERNS) -> bytes:
+    """
+    Canonicalize fetched markdown so bytes that don't change its meaning don't change its hash.
+
+    Line endings become LF, volatile patterns are replaced, trailing whitespace
+    is dropped (two or more spaces after text, a markdown hard line break, become
+    exactly two) and the file ends in a single newline. Each pass only runs when
+    a substring test finds something for it to do; almost every page is clean
+    already, and is then returned as is (the same object).
+    """
+    if b'\r' in content:
+        content = content.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    for pattern, replacement, markers in volatile_patterns:
+        if markers is None or any(marker in content for marker in markers):
+            content = pattern.sub(replacement, content)
+
+    def trailing(match: re.Match) -> bytes:
+        hard_break = (match.group().startswith(b'  ') and b'\t' not in match.group()
+                      and match.start() > 0 and match.string[match.start() - 1:match.start()] != b'\n')
+        return b'  ' if hard_break else b''
+
+    if b' \n' in content or b'\t' in content and b'\t\n' in content:
+        content = TRAILING_WHITESPACE_PATTERN.sub(trailing, content)
+    elif content.endswith((b' ', b'\t')):
+        # Only the last line has any, so only it is rewritten
+        head, newline, last = content.rpartition(b'\n')
+        content = head + newline + TRAILING_WHITESPACE_PATTERN.sub(trailing, last)
+    if content.endswith(b'\n') and not content.endswith(b'\n\n') or not content.strip():
+        return content
+    return content.rstrip(b'\n') + b'\n'
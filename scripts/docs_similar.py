@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Content similarity between the pages of the Claude Code documentation mirror.
+
+Builds docs/similar_index.json from a TF-IDF matrix over the pages (sublinear
+term frequency, smoothed IDF, cosine similarity). The term counts come from
+the search index, so no page is re-read here, and only the rows and columns
+of pages whose hash changed are recomputed; every other pair keeps the score
+stored on the last run. The index holds each page's closest pages, which the
+/docs helper prints as "see also" with a single jq lookup, and each page's
+heaviest term weights, so `query` ranks pages against a question without
+opening any of them.
+
+Building needs NumPy, imported only when some page has to be recomputed;
+without it the index is left as it is (docs_sync.py downloads the published
+one instead). Reading and querying the index use only the standard library.
+"""
+
+import argparse
+import json
+import logging
+import math
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from docs_index import load_search_index, tokenize, write_index
+
+logger = logging.getLogger(__name__)
+
+SIMILAR_INDEX_FILE = "similar_index.json"
+SIMILAR_INDEX_VERSION = 1
+SEE_ALSO = 5  # pages the helper suggests
+# Neighbours kept per page: the slack lets an unchanged page lose a few to edits elsewhere
+# without recomputing its row
+CANDIDATES = 2 * SEE_ALSO
+MIN_SIMILARITY = 0.1  # cosine below this isn't worth suggesting
+QUERY_TERMS = 64  # heaviest terms kept per page for query ranking
+# Recompute the whole matrix (and refresh every IDF) when more than this share of pages changed
+REBUILD_FRACTION = 0.25
+
+
+def load_similar_index(docs_dir: Path) -> Optional[dict]:
+    """Load the similarity index, or None if it is missing or from an older format."""
+    index_path = docs_dir / SIMILAR_INDEX_FILE
+    if not index_path.exists():
+        return None
+    try:
+        index = json.loads(index_path.read_text(encoding='utf-8'))
+    except Exception as e:
+        logger.warning(f"Failed to load similarity index: {e}")
+        return None
+    if index.get("version") != SIMILAR_INDEX_VERSION:
+        return None
+    return index
+
+
+def tfidf_weights(search_index: dict) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray", List[str], "np.ndarray"]:
+    """
+    L2-normalised TF-IDF weights of every (page, term) pair in the search index.
+
+    Returns (rows, cols, weights, terms, df): the matrix in coordinate form,
+    rows being search index doc ids and cols indexes into the sorted terms.
+    """
+    import numpy as np
+
+    postings = search_index["postings"]
+    terms = sorted(postings)
+    lengths = np.fromiter((len(postings[term]) // 2 for term in terms), dtype=np.int64, count=len(terms))
+    flat = np.fromiter((value for term in terms for value in postings[term]), dtype=np.int64,
+                       count=int(lengths.sum()) * 2).reshape(-1, 2)
+    rows, tfs = flat[:, 0], flat[:, 1].astype(np.float64)
+    cols = np.repeat(np.arange(len(terms)), lengths)
+
+    n = search_index["doc_count"]
+    idf = np.log((1 + n) / (1 + lengths)) + 1
+    weights = (1 + np.log(tfs)) * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n))
+    weights /= norms[rows]
+    return rows, cols, weights, terms, lengths
+
+
+def shared_term_matrix(rows: "np.ndarray", cols: "np.ndarray", weights: "np.ndarray",
+                       df: "np.ndarray", n: int) -> "np.ndarray":
+    """
+    Dense page x term matrix over the terms found in two or more pages.
+
+    A term only one page uses adds nothing to any cosine, and dropping those
+    leaves a matrix small enough to multiply densely.
+    """
+    import numpy as np
+
+    shared = df >= 2
+    column = np.full(len(df), -1)
+    column[shared] = np.arange(int(shared.sum()))
+    keep = shared[cols]
+    matrix = np.zeros((n, int(shared.sum())), dtype=np.float32)
+    matrix[rows[keep], column[cols[keep]]] = weights[keep]
+    return matrix
+
+
+def top_terms(rows: "np.ndarray", cols: "np.ndarray", weights: "np.ndarray",
+              terms: List[str], n: int, doc_ids: List[int]) -> Dict[int, Dict[str, float]]:
+    """{doc id: {term: weight}} for the QUERY_TERMS heaviest terms of each given page."""
+    import numpy as np
+
+    order = np.lexsort((-weights, rows))
+    starts = np.searchsorted(rows[order], np.arange(n + 1))
+    result = {}
+    for doc_id in doc_ids:
+        picked = order[starts[doc_id]:min(starts[doc_id + 1], starts[doc_id] + QUERY_TERMS)]
+        result[doc_id] = {terms[col]: round(float(weight), 4) for col, weight in zip(cols[picked], weights[picked])}
+    return result
+
+
+def best_matches(scores: "np.ndarray", names: List[str], own_id: int) -> List[list]:
+    """The CANDIDATES highest [name, score] pairs of a row of cosines, leaving out the page itself."""
+    import numpy as np
+
+    scores = scores.copy()
+    scores[own_id] = 0
+    picked = np.argsort(-scores, kind='stable')[:CANDIDATES]
+    return [[names[doc_id], round(float(scores[doc_id]), 4)] for doc_id in picked
+            if scores[doc_id] >= MIN_SIMILARITY]
+
+
+def update_similar_index(docs_dir: Path, full: bool = False) -> Optional[Dict[str, int]]:
+    """
+    Bring the similarity index in line with the search index (update that first).
+
+    Pages whose hash differs from the one recorded here get their row of the
+    similarity matrix recomputed, and their scores against every other page
+    are merged into those pages' neighbour lists. An unchanged page is only
+    recomputed when edits elsewhere pushed its full neighbour list short.
+    Returns counts of recomputed, reused and removed pages (and whether the
+    whole matrix was rebuilt), or None if NumPy or the search index is missing.
+    """
+    search_index = load_search_index(docs_dir)
+    if search_index is None:
+        logger.warning("No search index - similarity index left as it is")
+        return None
+
+    docs = search_index["docs"]
+    names = [doc["file"] for doc in docs]
+    ids = {name: doc_id for doc_id, name in enumerate(names)}
+    old_files = {} if full else (load_similar_index(docs_dir) or {}).get("files", {})
+
+    stale = {doc["file"] for doc in docs if old_files.get(doc["file"], {}).get("hash") != doc["hash"]}
+    removed = [name for name in old_files if name not in ids]
+    dropped = stale | set(removed)
+    full = full or not old_files or len(dropped) > REBUILD_FRACTION * max(len(docs), 1)
+    if not full and not dropped:
+        return {"recomputed": 0, "reused": len(names), "removed": 0, "full": False}
+    try:
+        import numpy as np
+    except ImportError:
+        logger.info("NumPy not installed - similarity index left as it is")
+        return None
+
+    new_files = {}
+    recompute = set(names) if full else set(stale)
+    if not full:
+        for name in names:
+            if name in recompute or name not in old_files:
+                recompute.add(name)
+                continue
+            old = old_files[name]["similar"]
+            kept = [pair for pair in old if pair[0] not in dropped]
+            if len(old) == CANDIDATES and len(kept) < SEE_ALSO:
+                # Neighbours beyond the stored list may belong in it now
+                recompute.add(name)
+            else:
+                new_files[name] = dict(old_files[name], similar=kept)
+
+    if docs:
+        rows, cols, weights, terms, df = tfidf_weights(search_index)
+        matrix = shared_term_matrix(rows, cols, weights, df, len(docs))
+        recompute_ids = sorted(ids[name] for name in recompute)
+        scores = matrix[recompute_ids] @ matrix.T
+        weights_by_doc = top_terms(rows, cols, weights, terms, len(docs), recompute_ids)
+        for row, doc_id in enumerate(recompute_ids):
+            new_files[names[doc_id]] = {
+                "hash": docs[doc_id]["hash"],
+                "similar": best_matches(scores[row], names, doc_id),
+                "terms": weights_by_doc[doc_id],
+            }
+        if not full:
+            # Fold the fresh scores into the neighbour lists of the pages reused as they were
+            for name, entry in new_files.items():
+                if name in recompute:
+                    continue
+                column = scores[:, ids[name]]
+                fresh = [[names[doc_id], round(float(score), 4)]
+                         for doc_id, score in zip(recompute_ids, column)
+                         if score >= MIN_SIMILARITY and doc_id != ids[name]]
+                fresh_names = {pair[0] for pair in fresh}
+                merged = [pair for pair in entry["similar"] if pair[0] not in fresh_names] + fresh
+                entry["similar"] = sorted(merged, key=lambda pair: (-pair[1], pair[0]))[:CANDIDATES]
+        idf = np.log((1 + len(docs)) / (1 + df)) + 1
+        term_ids = {term: col for col, term in enumerate(terms)}
+    else:
+        idf, term_ids = [], {}
+
+    # IDF of every term a page keeps, for weighting query terms
+    kept_terms = sorted({term for entry in new_files.values() for term in entry["terms"]})
+    new_index = {
+        "version": SIMILAR_INDEX_VERSION,
+        "doc_count": len(docs),
+        "idf": {term: round(float(idf[term_ids[term]]), 4) for term in kept_terms if term in term_ids},
+        "files": dict(sorted(new_files.items())),
+    }
+    write_index(docs_dir / SIMILAR_INDEX_FILE, new_index)
+
+    return {
+        "recomputed": len(recompute),
+        "reused": len(names) - len(recompute),
+        "removed": len(removed),
+        "full": full,
+    }
+
+
+def similar_pages(index: dict, filename: str, limit: int = SEE_ALSO) -> List[Tuple[str, float]]:
+    """The pages closest in content to a page, best first."""
+    return [(name, score) for name, score in index["files"].get(filename, {}).get("similar", [])[:limit]]
+
+
+def query(index: dict, text: str, limit: int = 10) -> List[Tuple[str, float]]:
+    """
+    Rank pages against a free-text question by the cosine of their stored term weights.
+
+    Returns [(filename, score)] best match first.
+    """
+    idf = index["idf"]
+    terms = {term: idf[term] for term in set(tokenize(text)) if term in idf}
+    if not terms:
+        return []
+    norm = math.sqrt(sum(weight ** 2 for weight in terms.values()))
+    scores = {}
+    for filename, entry in index["files"].items():
+        score = sum(weight * entry["terms"].get(term, 0) for term, weight in terms.items())
+        if score > 0:
+            scores[filename] = score / norm
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the docs similarity index")
+    parser.add_argument('--docs-dir', type=Path, default=Path(__file__).parent.parent / 'docs',
+                        help="Directory holding the docs and docs_manifest.json")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Update the similarity index from the search index (needs NumPy)")
+    build_parser.add_argument('--full', action='store_true', help="Recompute every page, not just the changed ones")
+
+    similar_parser = subparsers.add_parser('similar', help="Pages closest in content to a topic")
+    similar_parser.add_argument('topic')
+    similar_parser.add_argument('--limit', type=int, default=SEE_ALSO)
+    similar_parser.add_argument('--json', action='store_true', help="Print results as JSON")
+
+    query_parser = subparsers.add_parser('query', help="Rank pages against a question")
+    query_parser.add_argument('query', nargs='+')
+    query_parser.add_argument('--limit', type=int, default=5)
+    query_parser.add_argument('--json', action='store_true', help="Print results as JSON")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    if args.command == 'build':
+        stats = update_similar_index(args.docs_dir, args.full)
+        if stats is None:
+            sys.exit(1)
+        logger.info(f"Similarity index updated: {stats['recomputed']} recomputed, "
+                    f"{stats['reused']} reused, {stats['removed']} removed")
+        return
+
+    index = load_similar_index(args.docs_dir)
+    if index is None:
+        logger.error("Similarity index not found - run: docs_similar.py build")
+        sys.exit(1)
+
+    if args.command == 'similar':
+        filename = args.topic if args.topic.endswith('.md') else f"{args.topic}.md"
+        results = similar_pages(index, filename, args.limit)
+    else:
+        results = query(index, ' '.join(args.query), args.limit)
+
+    if args.json:
+        print(json.dumps([{"file": filename, "score": score} for filename, score in results], indent=2))
+        return
+    if not results:
+        sys.exit(1)
+    for filename, score in results:
+        print(f"  • {filename[:-3]} ({score:.2f})")
+
+
+if __name__ == "__main__":
+    main()
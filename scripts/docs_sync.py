@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Manifest-driven delta sync for the Claude Code documentation mirror.
+
+Downloads the published docs_manifest.json, compares its hashes with the local
+manifest and fetches only the files that changed. Every download is verified
+against its SHA-256 before being swapped into place with os.replace, and the
+manifest is replaced last. When many files changed (a first sync, or one
+after a long gap) they are taken from the published docs bundle in a single
+download instead, each still checked against the manifest's hash. Uses only
+the standard library, so clients don't need a git checkout.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from docs_bundle import DocsBundle
+from docs_index import update_changelog_index, update_search_index, update_sections_index, update_topics_index
+from docs_journal import JOURNAL_FILE
+from docs_links import update_links_index
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "docs_manifest.json"
+DEFAULT_BASE_URL = "https://raw.githubusercontent.com/ericbuess/claude-code-docs/main/docs/"
+# Rolling release the update workflow refreshes with every published change
+DEFAULT_BUNDLE_URL = "https://github.com/ericbuess/claude-code-docs/releases/download/docs-bundle/docs.bundle"
+BUNDLE_MIN_FILES = 20  # files to download before the whole bundle is the cheaper fetch
+MAX_WORKERS = 8  # concurrent downloads
+REQUEST_TIMEOUT = 30  # seconds
+TMP_SUFFIX = ".sync-tmp"
+
+HEADERS = {
+    'User-Agent': 'Claude-Code-Docs-Sync/1.0',
+    'Cache-Control': 'no-cache',
+}
+
+# Remote manifests are untrusted input: only plain markdown filenames may be written
+SAFE_FILENAME_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]*\.md$')
+
+
+class SyncError(Exception):
+    """Raised when the remote manifest can't be fetched or read."""
+
+
+def http_get(url: str) -> bytes:
+    request = urllib.request.Request(url, headers=HEADERS)
+    with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+        return response.read()
+
+
+def load_local_manifest(docs_dir: Path) -> dict:
+    manifest_path = docs_dir / MANIFEST_FILE
+    if manifest_path.exists():
+        try:
+            manifest = json.loads(manifest_path.read_text())
+            manifest.setdefault("files", {})
+            return manifest
+        except Exception as e:
+            logger.warning(f"Failed to load local manifest: {e}")
+    return {"files": {}}
+
+
+def plan_sync(docs_dir: Path, local_files: Dict[str, dict],
+              remote_files: Dict[str, dict]) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Work out which files to download and which to delete.
+
+    Returns tuple of (files to download, files to remove, files accepted), all
+    sorted. Accepted files are the remote manifest's entries with a safe
+    filename, whether they need downloading or not; the rest are never written.
+    """
+    download = []
+    accepted = []
+    for filename, entry in remote_files.items():
+        if not SAFE_FILENAME_PATTERN.match(filename):
+            logger.warning(f"Skipping unsafe filename in remote manifest: {filename!r}")
+            continue
+        accepted.append(filename)
+        local_entry = local_files.get(filename)
+        if (not local_entry
+                or local_entry.get("hash") != entry.get("hash")
+                or not (docs_dir / filename).exists()):
+            download.append(filename)
+
+    remove = [filename for filename in local_files
+              if filename not in remote_files and SAFE_FILENAME_PATTERN.match(filename)]
+    return sorted(download), sorted(remove), sorted(accepted)
+
+
+def stage_file(docs_dir: Path, base_url: str, filename: str, expected_hash: str) -> Path:
+    """Download one file next to its destination and verify its hash."""
+    data = http_get(base_url + quote(filename))
+    actual_hash = hashlib.sha256(data).hexdigest()
+    if actual_hash != expected_hash:
+        raise ValueError(f"hash mismatch (expected {expected_hash[:12]}, got {actual_hash[:12]})")
+    tmp_path = docs_dir / f".{filename}{TMP_SUFFIX}"
+    tmp_path.write_bytes(data)
+    return tmp_path
+
+
+def stage_from_bundle(docs_dir: Path, bundle_url: str, remote_files: Dict[str, dict],
+                      filenames: List[str]) -> Dict[str, Path]:
+    """
+    Stage files out of the published bundle, in one download.
+
+    Only pages whose bundle entry carries the remote manifest's hash are taken
+    (reading one checks it against its content); the bundle may be a run
+    behind or ahead of the manifest, and the caller downloads whatever is left
+    one by one. Returns {filename: staged path}.
+    """
+    bundle_path = docs_dir / f".docs.bundle{TMP_SUFFIX}"
+    staged = {}
+    try:
+        bundle_path.write_bytes(http_get(bundle_url))
+        with DocsBundle(bundle_path) as bundle:
+            for filename in filenames:
+                bundle_entry = bundle.entries.get(filename)
+                if bundle_entry is None or bundle_entry[2] != remote_files[filename].get("hash"):
+                    continue
+                tmp_path = docs_dir / f".{filename}{TMP_SUFFIX}"
+                tmp_path.write_bytes(bundle.read(filename))
+                staged[filename] = tmp_path
+    except Exception as e:
+        logger.warning(f"Failed to use the docs bundle, downloading files one by one: {e}")
+    finally:
+        bundle_path.unlink(missing_ok=True)
+    return staged
+
+
+def sync(docs_dir: Path, base_url: Optional[str] = None, workers: int = MAX_WORKERS,
+         bundle_url: Optional[str] = None) -> Dict[str, list]:
+    """
+    Bring docs_dir in line with the published manifest.
+
+    With BUNDLE_MIN_FILES or more to download, files come from the bundle at
+    `bundle_url` (by default the published one, when syncing from the default
+    base URL; "" turns it off). Files that fail to download or verify keep
+    their previous version (and previous manifest entry), so the next sync
+    retries them. Returns lists of updated, removed and failed filenames, and
+    of the updated ones taken from the bundle.
+    """
+    docs_dir.mkdir(parents=True, exist_ok=True)
+    local = load_local_manifest(docs_dir)
+    base_url = base_url or local.get("base_url") or DEFAULT_BASE_URL
+    if not base_url.endswith('/'):
+        base_url += '/'
+    if bundle_url is None:
+        # A mirror elsewhere doesn't publish the same bundle
+        bundle_url = DEFAULT_BUNDLE_URL if base_url == DEFAULT_BASE_URL else ""
+
+    try:
+        remote = json.loads(http_get(base_url + MANIFEST_FILE))
+        remote_files = remote["files"]
+    except (urllib.error.URLError, OSError) as e:
+        raise SyncError(f"Could not fetch remote manifest: {e}")
+    except (ValueError, KeyError) as e:
+        raise SyncError(f"Remote manifest is invalid: {e}")
+
+    local_files = local["files"]
+    download, remove, accepted = plan_sync(docs_dir, local_files, remote_files)
+
+    def fetch(filename: str):
+        try:
+            return filename, stage_file(docs_dir, base_url, filename, remote_files[filename].get("hash", "")), None
+        except Exception as e:
+            return filename, None, e
+
+    bundled = {}
+    if bundle_url and len(download) >= BUNDLE_MIN_FILES:
+        bundled = stage_from_bundle(docs_dir, bundle_url, remote_files, download)
+    staged = sorted(bundled.items())
+    failed = []
+    singles = [filename for filename in download if filename not in bundled]
+    if singles:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(singles)))) as executor:
+            for filename, tmp_path, error in executor.map(fetch, singles):
+                if error is not None:
+                    logger.warning(f"Failed to sync {filename}: {error}")
+                    failed.append(filename)
+                else:
+                    staged.append((filename, tmp_path))
+
+    # Swap verified files into place, then drop files the remote no longer lists
+    for filename, tmp_path in staged:
+        os.replace(tmp_path, docs_dir / filename)
+    for filename in remove:
+        (docs_dir / filename).unlink(missing_ok=True)
+
+    # Only files plan_sync accepted are listed, and failed files keep their old entry (or
+    # none), so the manifest matches what is on disk
+    new_manifest = dict(remote)
+    new_manifest["files"] = {filename: remote_files[filename] for filename in accepted}
+    # Only the default locale is synced; don't claim the other locales' files are here
+    new_manifest.pop("locales", None)
+    for filename in failed:
+        if filename in local_files:
+            new_manifest["files"][filename] = local_files[filename]
+        else:
+            new_manifest["files"].pop(filename, None)
+
+    manifest_path = docs_dir / MANIFEST_FILE
+    tmp_manifest = docs_dir / f".{MANIFEST_FILE}{TMP_SUFFIX}"
+    tmp_manifest.write_text(json.dumps(new_manifest, indent=2))
+    os.replace(tmp_manifest, manifest_path)
+
+    # The change journal can't be rebuilt locally, so take the published one as is
+    if staged or remove or not (docs_dir / JOURNAL_FILE).exists():
+        try:
+            journal = http_get(base_url + JOURNAL_FILE)
+            tmp_journal = docs_dir / f".{JOURNAL_FILE}{TMP_SUFFIX}"
+            tmp_journal.write_bytes(journal)
+            os.replace(tmp_journal, docs_dir / JOURNAL_FILE)
+        except Exception as e:
+            logger.warning(f"Failed to sync change journal: {e}")
+
+    # Keep the local indexes in step (only changed files are re-read)
+    if staged or remove:
+        try:
+            update_search_index(docs_dir, new_manifest["files"])
+            update_sections_index(docs_dir, new_manifest["files"])
+            update_changelog_index(docs_dir, new_manifest["files"])
+            update_topics_index(docs_dir, new_manifest["files"])
+            update_links_index(docs_dir, new_manifest["files"],
+                               new_manifest.get("fetch_metadata", {}).get("base_url"))
+        except Exception as e:
+            logger.warning(f"Failed to update local indexes: {e}")
+        # Imported here, like NumPy inside it, so syncs with nothing to update never load it
+        from docs_similar import SIMILAR_INDEX_FILE, update_similar_index
+        similar_index = None
+        try:
+            similar_index = update_similar_index(docs_dir)
+        except Exception as e:
+            logger.warning(f"Failed to update similarity index: {e}")
+        if similar_index is None:
+            # Without NumPy, take the published one (built from the same pages)
+            try:
+                data = http_get(base_url + SIMILAR_INDEX_FILE)
+                tmp_index = docs_dir / f".{SIMILAR_INDEX_FILE}{TMP_SUFFIX}"
+                tmp_index.write_bytes(data)
+                os.replace(tmp_index, docs_dir / SIMILAR_INDEX_FILE)
+            except Exception as e:
+                logger.warning(f"Failed to sync similarity index: {e}")
+
+    return {
+        "updated": sorted(filename for filename, _ in staged),
+        "removed": remove,
+        "failed": failed,
+        "bundled": sorted(bundled),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync the docs mirror over HTTP using the manifest")
+    parser.add_argument('--docs-dir', type=Path, default=Path(__file__).parent.parent / 'docs')
+    parser.add_argument('--base-url', help="Override the base URL from the local manifest")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS,
+                        help=f"Concurrent downloads (default: {MAX_WORKERS})")
+    parser.add_argument('--bundle-url', help="Docs bundle to take many changed files from "
+                        "(default: the published one when syncing from the default base URL)")
+    parser.add_argument('--no-bundle', action='store_true', help="Always download changed files one by one")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+
+    try:
+        result = sync(args.docs_dir, args.base_url, args.workers, "" if args.no_bundle else args.bundle_url)
+    except SyncError as e:
+        logger.error(str(e))
+        sys.exit(2)
+
+    changed = len(result["updated"]) + len(result["removed"])
+    if changed:
+        print(f"🔄 Updated {len(result['updated'])} document(s), removed {len(result['removed'])}"
+              + (f" ({len(result['bundled'])} from the docs bundle)" if result["bundled"] else ""))
+    if result["failed"]:
+        print(f"⚠️  {len(result['failed'])} document(s) failed to download or verify and were left unchanged")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Integrity check for the Claude Code documentation mirror.
+
+Compares the docs on disk with the SHA-256 hashes in docs_manifest.json and
+reports missing, extra and corrupted files. Hashes are cached by each file's
+(size, mtime_ns, inode), so a warm check only stats the files; files whose
+stat changed are rehashed on a thread pool (hashlib releases the GIL, so a
+cold cache is hashed on every core). `--repair` re-fetches just the missing
+and corrupted pages from their original_md_url, falling back to the
+published mirror when upstream has moved on since the manifest was written.
+Uses only the standard library.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from docs_index import CHANGELOG_FILE
+from docs_normalize import CHANGELOG_HEADER, normalize_content
+from docs_sync import DEFAULT_BASE_URL, http_get
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "docs_manifest.json"
+VERIFY_CACHE_FILE = ".verify_cache.json"  # kept next to docs/, not in it
+VERIFY_CACHE_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_WORKERS = os.cpu_count() or 4
+
+# The manifest may come from the network: only plain markdown names, optionally in a locale directory
+SAFE_PATH_PATTERN = re.compile(r'^(?:[a-z]{2}(?:-[A-Za-z0-9]{2,4})?/)?[A-Za-z0-9][A-Za-z0-9._-]*\.md$')
+
+
+def manifest_entries(manifest: dict) -> Dict[str, dict]:
+    """Every file the manifest lists, the default locale's and each other locale's."""
+    entries = dict(manifest.get("files", {}))
+    for namespace in manifest.get("locales", {}).values():
+        entries.update(namespace.get("files", {}))
+    return entries
+
+
+def file_signature(stat: os.stat_result) -> List[int]:
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_cache(cache_path: Path) -> Dict[str, list]:
+    """Return {filename: [size, mtime_ns, inode, hash]}, or {} if missing or from an older format."""
+    try:
+        cache = json.loads(cache_path.read_text())
+        if cache.get("version") == VERIFY_CACHE_VERSION:
+            return cache["files"]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable verify cache: {e}")
+    return {}
+
+
+def save_cache(cache_path: Path, files: Dict[str, list]) -> None:
+    tmp_path = cache_path.with_name(f".{cache_path.name}.tmp")
+    tmp_path.write_text(json.dumps({"version": VERIFY_CACHE_VERSION, "files": files},
+                                   separators=(',', ':')))
+    os.replace(tmp_path, cache_path)
+
+
+def current_hashes(docs_dir: Path, filenames: List[str], cache_path: Path,
+                   workers: int = HASH_WORKERS) -> Tuple[Dict[str, Optional[str]], int]:
+    """
+    Hash the files, reusing cached hashes for files whose stat is unchanged.
+
+    Returns tuple of ({filename: hash, or None if the file is missing}, files hashed).
+    """
+    cache = load_cache(cache_path)
+    hashes: Dict[str, Optional[str]] = {}
+    signatures = {}
+    stale = []
+    for filename in filenames:
+        try:
+            signature = file_signature((docs_dir / filename).stat())
+        except FileNotFoundError:
+            hashes[filename] = None
+            continue
+        signatures[filename] = signature
+        cached = cache.get(filename)
+        if cached and cached[:3] == signature:
+            hashes[filename] = cached[3]
+        else:
+            stale.append(filename)
+
+    if stale:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(stale)))) as executor:
+            for filename, digest in zip(stale, executor.map(lambda name: hash_file(docs_dir / name), stale)):
+                hashes[filename] = digest
+
+    new_cache = {filename: signatures[filename] + [digest]
+                 for filename, digest in hashes.items() if digest is not None}
+    if new_cache != cache:
+        try:
+            save_cache(cache_path, new_cache)
+        except OSError as e:
+            logger.warning(f"Failed to save verify cache: {e}")
+    return hashes, len(stale)
+
+
+def find_extra_files(docs_dir: Path, manifest: dict, listed: Dict[str, dict]) -> List[str]:
+    """Markdown files in docs_dir (and the manifest's locale directories) the manifest doesn't list."""
+    found = [path.name for path in docs_dir.glob('*.md')]
+    for locale in manifest.get("locales", {}):
+        found += [f"{locale}/{path.name}" for path in (docs_dir / locale).glob('*.md')]
+    return sorted(filename for filename in found if filename not in listed)
+
+
+def verify(docs_dir: Path, cache_path: Optional[Path] = None, workers: int = HASH_WORKERS) -> Dict[str, list]:
+    """
+    Check docs_dir against its manifest.
+
+    Returns lists of missing, extra and corrupted filenames, plus counts of
+    files checked, hashed and taken from the cache.
+    """
+    manifest = json.loads((docs_dir / MANIFEST_FILE).read_text())
+    listed = {filename: entry for filename, entry in manifest_entries(manifest).items()
+              if SAFE_PATH_PATTERN.match(filename)}
+    cache_path = cache_path or docs_dir.parent / VERIFY_CACHE_FILE
+    hashes, hashed = current_hashes(docs_dir, sorted(listed), cache_path, workers)
+    missing = sorted(filename for filename, digest in hashes.items() if digest is None)
+    return {
+        "missing": missing,
+        "corrupt": sorted(filename for filename, digest in hashes.items()
+                          if digest is not None and digest != listed[filename].get("hash")),
+        "extra": find_extra_files(docs_dir, manifest, listed),
+        "checked": len(listed),
+        "hashed": hashed,
+        "cached": len(listed) - len(missing) - hashed,
+    }
+
+
+def repair(docs_dir: Path, filenames: List[str], mirror_url: Optional[str] = None) -> Dict[str, list]:
+    """
+    Re-fetch the given files and write those whose content matches the manifest hash.
+
+    Each file is fetched from its original_md_url (original_raw_url for the
+    changelog); if that no longer matches the manifest, from the published
+    mirror. Upstream copies are normalized the way the fetcher saves them
+    (the changelog gets its header first) before they are compared, since the
+    manifest hash is that of the normalized file; manifests written before
+    normalization are matched against the bytes as received. Returns lists of
+    repaired and failed filenames.
+    """
+    manifest = json.loads((docs_dir / MANIFEST_FILE).read_text())
+    entries = manifest_entries(manifest)
+    mirror_url = mirror_url or manifest.get("base_url") or DEFAULT_BASE_URL
+    if not mirror_url.endswith('/'):
+        mirror_url += '/'
+
+    def fetch(filename: str) -> Tuple[str, Optional[Exception]]:
+        entry = entries[filename]
+        urls = [(url, True) for url in (entry.get("original_md_url"), entry.get("original_raw_url")) if url]
+        urls.append((mirror_url + quote(filename), False))
+        errors = []
+        for url, upstream in urls:
+            try:
+                data = http_get(url)
+            except Exception as e:
+                errors.append(f"{url}: {e}")
+                continue
+            if upstream:
+                received = (CHANGELOG_HEADER if filename == CHANGELOG_FILE else b'') + data
+                candidates = [normalize_content(received), received]
+            else:
+                candidates = [data]
+            data = next((candidate for candidate in candidates
+                         if hashlib.sha256(candidate).hexdigest() == entry.get("hash")), None)
+            if data is None:
+                errors.append(f"{url}: doesn't match the manifest hash")
+                continue
+            path = docs_dir / filename
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            return filename, None
+        return filename, ValueError('; '.join(errors))
+
+    repaired = []
+    failed = []
+    targets = [filename for filename in filenames if filename in entries and SAFE_PATH_PATTERN.match(filename)]
+    if targets:
+        with ThreadPoolExecutor(max_workers=min(8, len(targets))) as executor:
+            for filename, error in executor.map(fetch, targets):
+                if error is None:
+                    repaired.append(filename)
+                else:
+                    logger.warning(f"Failed to repair {filename}: {error}")
+                    failed.append(filename)
+    return {"repaired": repaired, "failed": failed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the docs against the manifest's hashes")
+    parser.add_argument('--docs-dir', type=Path, default=Path(__file__).parent.parent / 'docs')
+    parser.add_argument('--cache', type=Path, help=f"Hash cache (default: {VERIFY_CACHE_FILE} next to the docs)")
+    parser.add_argument('--repair', action='store_true', help="Re-fetch missing and corrupted pages")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+
+    if not (args.docs_dir / MANIFEST_FILE).exists():
+        logger.error(f"No {MANIFEST_FILE} in {args.docs_dir}")
+        sys.exit(2)
+    report = verify(args.docs_dir, args.cache)
+    broken = report["missing"] + report["corrupt"]
+    if args.repair and broken:
+        report.update(repair(args.docs_dir, broken))
+        # Re-check so the cache and the report reflect the repaired files
+        report.update(verify(args.docs_dir, args.cache))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, label in (("missing", "Missing"), ("corrupt", "Corrupted"), ("extra", "Not in manifest")):
+            if report[key]:
+                print(f"⚠️  {label}: {', '.join(report[key])}")
+        if report.get("repaired"):
+            print(f"🔧 Repaired: {', '.join(report['repaired'])}")
+        if not (report["missing"] or report["corrupt"]):
+            print(f"✅ All {report['checked']} documents match the manifest "
+                  f"({report['hashed']} hashed, {report['cached']} unchanged since the last check)")
+    sys.exit(1 if report["missing"] or report["corrupt"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,33 @@ Improved Claude Code documentation fetcher with better robustness.
 
 import requests
 import time
+import codecs
 from pathlib import Path
-from typing import List, Tuple, Set, Optional
+from typing import List, Tuple, Set, Optional, Dict, Iterable
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 import sys
-import xml.etree.ElementTree as ET
+import xml.parsers.expat
+import zlib
 from urllib.parse import urlparse
 import json
 import hashlib
 import os
 import re
-import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from docs_bundle import write_bundle
+from docs_index import (CHANGELOG_FILE, load_sections_index, update_changelog_index, update_search_index,
+                        update_sections_index)
+from docs_journal import append_journal, build_entry, read_journal
+from docs_links import export_local_copy
+from docs_normalize import CHANGELOG_HEADER, VOLATILE_PATTERNS, normalize_content
+from docs_verify import repair, verify
+from fetch_retry import HostCircuitBreaker, RetryLater, RetryScheduler
+from fetch_schedule import CHANGELOG_MAX_POLL_INTERVAL, MAX_POLL_INTERVAL, is_due, journal_history, next_due, next_poll
+from fetch_telemetry import FetchTelemetry, new_request_record
 
 # Configure logging
 logging.basicConfig(
@@ -36,6 +51,20 @@ SITEMAP_URLS = [
 ]
 MANIFEST_FILE = "docs_manifest.json"
 
+# Raw changelog from the Claude Code repository
+CHANGELOG_URL = "https://raw.githubusercontent.com/anthropics/claude-code/main/CHANGELOG.md"
+MAX_LISTED_RELEASES = 20  # release versions listed per category in fetch_metadata
+
+# Locales: the default locale is stored flat in docs/, others in docs/<locale>/
+DEFAULT_LOCALE = "en"
+LOCALE_PATTERN = re.compile(r'^[a-z]{2}(?:-[A-Za-z0-9]{2,4})?$')
+# /docs/<locale>/... (code.claude.com) or /<locale>/docs/claude-code/... (legacy docs.anthropic.com)
+LOCALE_PATH_PATTERN = re.compile(r'^/(?:docs/([a-z]{2}(?:-[A-Za-z0-9]{2,4})?)/|([a-z]{2}(?:-[A-Za-z0-9]{2,4})?)/docs/claude-code/)')
+
+# Sitemap parsing configuration
+SITEMAP_CHUNK_SIZE = 64 * 1024  # bytes fed to the XML parser at a time
+MAX_SITEMAP_DEPTH = 3  # how many levels of nested sitemap indexes to follow
+
 # Base URL will be discovered from sitemap
 # No longer using global variable
 
@@ -47,11 +76,101 @@ HEADERS = {
     'Expires': '0'
 }
 
-# Retry configuration
+# Page download configuration
+STREAM_CHUNK_SIZE = 64 * 1024  # bytes read from the socket at a time
+MAX_PAGE_BYTES = 5 * 1024 * 1024  # refuse larger responses instead of buffering them
+VALIDATION_HEAD_BYTES = 64 * 1024  # prefix decoded to check for markdown structure
+DOC_PATTERN = re.compile(rb'installation|usage|example|api|configuration|claude|code', re.IGNORECASE)
+
+MAX_LISTED_SUPPRESSED = 20  # suppressed updates listed by name in fetch_metadata
+
+# Retry configuration (failed attempts are deferred, not slept on; see fetch_retry.py)
 MAX_RETRIES = 3
 RETRY_DELAY = 2  # initial delay in seconds
 MAX_RETRY_DELAY = 30  # maximum delay in seconds
-RATE_LIMIT_DELAY = 0.5  # seconds between requests
+MAX_RETRY_WAIT = 300  # retries due later than this after the first pass are left for the next run
+CHANGELOG_TASK = "changelog"  # retry queue key of the changelog
+
+# Packed bundle of all pages, published alongside the docs (not committed)
+DEFAULT_BUNDLE_PATH = Path(__file__).parent.parent / 'dist' / 'docs.bundle'
+
+# Per-request telemetry reports (JSON and Prometheus textfile, not committed)
+DEFAULT_METRICS_DIR = Path(__file__).parent.parent / 'dist'
+
+# Sharded runs: partial manifests written by --shard and read by --merge-shards (not committed)
+DEFAULT_SHARD_DIR = Path(__file__).parent.parent / 'dist' / 'shards'
+
+# Incremental refresh configuration
+FULL_SWEEP_EVERY = 8  # force a full refetch every N incremental runs (8 x 3h = daily)
+
+# Concurrency and rate limiting configuration
+DEFAULT_WORKERS = 8  # worker threads for page fetches (1 = serial)
+RATE_LIMIT_PER_SECOND = 4.0  # sustained requests per second, per host
+RATE_LIMIT_BURST = 4  # requests allowed back-to-back before throttling
+
+
+class HostRateLimiter:
+    """
+    Token-bucket rate limiter shared by all workers, with one bucket per host.
+
+    A 429 from any worker pauses the whole host until its Retry-After expires,
+    so the other workers stop sending requests instead of piling on.
+    """
+
+    def __init__(self, rate: float = RATE_LIMIT_PER_SECOND, burst: int = RATE_LIMIT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, dict] = {}
+
+    def _bucket(self, host: str) -> dict:
+        if host not in self._buckets:
+            self._buckets[host] = {
+                "tokens": float(self.burst),
+                "updated": time.monotonic(),
+                "paused_until": 0.0,
+            }
+        return self._buckets[host]
+
+    def acquire(self, url: str) -> float:
+        """Block until a request to the URL's host is allowed. Returns the seconds waited."""
+        host = urlparse(url).netloc
+        waited = 0.0
+        while True:
+            with self._lock:
+                bucket = self._bucket(host)
+                now = time.monotonic()
+                if now < bucket["paused_until"]:
+                    wait = bucket["paused_until"] - now
+                else:
+                    elapsed = now - bucket["updated"]
+                    bucket["tokens"] = min(self.burst, bucket["tokens"] + elapsed * self.rate)
+                    bucket["updated"] = now
+                    if bucket["tokens"] >= 1:
+                        bucket["tokens"] -= 1
+                        return waited
+                    wait = (1 - bucket["tokens"]) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def paused_for(self, url: str) -> float:
+        """Seconds left in the URL's host pause (0 if it isn't paused)."""
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            return max(0.0, bucket["paused_until"] - time.monotonic()) if bucket else 0.0
+
+    def pause(self, url: str, seconds: float) -> None:
+        """Stop all requests to the URL's host for the given number of seconds."""
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self._bucket(host)
+            resume_at = time.monotonic() + seconds
+            if resume_at > bucket["paused_until"]:
+                bucket["paused_until"] = resume_at
+                # Start from an empty bucket after the pause so we don't burst into a 429 again
+                bucket["updated"] = resume_at
+                bucket["tokens"] = 0.0
 
 
 def load_manifest(docs_dir: Path) -> dict:
@@ -92,11 +211,52 @@ def save_manifest(docs_dir: Path, manifest: dict) -> None:
     manifest["github_repository"] = github_repo
     manifest["github_ref"] = github_ref
     manifest["description"] = "Claude Code documentation manifest. Keys are filenames, append to base_url for full URL."
-    manifest_path.write_text(json.dumps(manifest, indent=2))
+    write_file_atomic(manifest_path, json.dumps(manifest, indent=2).encode('utf-8'))
+
+
+def write_file_atomic(path: Path, data: bytes) -> None:
+    """Write to a temporary file next to `path` and rename it into place, so readers never see a torn file."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def page_locale(url_path: str) -> str:
+    """Locale of a documentation page path, e.g. "ja" for /docs/ja/hooks (DEFAULT_LOCALE if none)."""
+    match = LOCALE_PATH_PATTERN.match(url_path)
+    return (match.group(1) or match.group(2)) if match else DEFAULT_LOCALE
+
+
+def localized_path(url_path: str, locale: str) -> str:
+    """The same page path in another locale: /docs/ja/hooks -> /docs/en/hooks."""
+    match = LOCALE_PATH_PATTERN.match(url_path)
+    if not match:
+        return url_path
+    group = 1 if match.group(1) else 2
+    return url_path[:match.start(group)] + locale + url_path[match.end(group):]
+
+
+def manifest_files(manifest: dict, locale: str = DEFAULT_LOCALE) -> Dict[str, dict]:
+    """The manifest's files for a locale: the top-level "files" for DEFAULT_LOCALE, else its namespace."""
+    if locale == DEFAULT_LOCALE:
+        return manifest.get("files", {})
+    return manifest.get("locales", {}).get(locale, {}).get("files", {})
 
 
 def url_to_safe_filename(url_path: str) -> str:
-    """Convert a URL path to a safe filename that preserves hierarchy only when needed."""
+    """
+    Convert a URL path to a safe filename that preserves hierarchy only when needed.
+    Pages in other locales than DEFAULT_LOCALE go in a directory named after
+    the locale: /docs/ja/hooks -> ja/hooks.md.
+    """
+    locale = page_locale(url_path)
+    if locale != DEFAULT_LOCALE:
+        return f"{locale}/{url_to_safe_filename(localized_path(url_path, DEFAULT_LOCALE))}"
+    
     # Remove any known prefix patterns (support both old and new structures)
     # Old: /en/docs/claude-code/hooks -> hooks
     # New: /docs/en/hooks -> hooks
@@ -123,50 +283,154 @@ def url_to_safe_filename(url_path: str) -> str:
     return safe_name
 
 
-def discover_sitemap_and_base_url(session: requests.Session) -> Tuple[str, str]:
+def parse_sitemap_stream(chunks: Iterable[bytes]) -> Tuple[str, List[Tuple[str, Optional[str]]]]:
+    """
+    Incrementally parse a sitemap or sitemap index from a stream of byte chunks.
+    
+    Only <loc>/<lastmod> text is kept, so memory stays flat however large the
+    sitemap is. Namespaced and plain tags are handled in the same pass. DTDs and
+    entity declarations are rejected outright to prevent XXE and entity expansion.
+    
+    Returns:
+        Tuple of (root tag, [(loc, lastmod)]) - root tag is "urlset" or "sitemapindex",
+        lastmod is None when the entry has none
+    """
+    # namespace_separator makes expat report "{uri} {local}" names; we only look at the local part
+    parser = xml.parsers.expat.ParserCreate(namespace_separator=' ')
+    state = {"root": None, "field": None, "loc": None, "lastmod": None}
+    text: List[str] = []
+    entries: List[Tuple[str, Optional[str]]] = []
+    
+    def start_element(name, attrs):
+        tag = name.rsplit(' ', 1)[-1]
+        if state["root"] is None:
+            state["root"] = tag
+        elif tag in ('url', 'sitemap'):
+            state["loc"] = state["lastmod"] = None
+        elif tag in ('loc', 'lastmod'):
+            state["field"] = tag
+            text.clear()
+    
+    def end_element(name):
+        tag = name.rsplit(' ', 1)[-1]
+        if tag == state["field"]:
+            state[tag] = ''.join(text).strip() or None
+            state["field"] = None
+        elif tag in ('url', 'sitemap') and state["loc"]:
+            entries.append((state["loc"], state["lastmod"]))
+    
+    def character_data(data):
+        if state["field"]:
+            text.append(data)
+    
+    def forbid(*args):
+        raise ValueError("Sitemap contains a DTD or entity declaration, refusing to parse")
+    
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.CharacterDataHandler = character_data
+    parser.StartDoctypeDeclHandler = forbid
+    parser.EntityDeclHandler = forbid
+    parser.ExternalEntityRefHandler = forbid
+    
+    for chunk in chunks:
+        parser.Parse(chunk, False)
+    parser.Parse(b'', True)
+    
+    return state["root"] or "", entries
+
+
+def fetch_sitemap(session: requests.Session, sitemap_url: str,
+                  limiter: Optional[HostRateLimiter] = None,
+                  telemetry: Optional[FetchTelemetry] = None) -> Tuple[str, List[Tuple[str, Optional[str]]]]:
+    """Download one sitemap and parse it while it streams in."""
+    record = start_request(telemetry, "sitemap", sitemap_url, sitemap_url)
+    try:
+        if limiter:
+            record["throttle_seconds"] += limiter.acquire(sitemap_url)
+        request_start = time.monotonic()
+        with session.get(sitemap_url, headers=HEADERS, timeout=30, stream=True) as response:
+            record["status"] = response.status_code
+            response.raise_for_status()
+            
+            def counted(chunks: Iterable[bytes]) -> Iterable[bytes]:
+                for chunk in chunks:
+                    record["bytes"] += len(chunk)
+                    yield chunk
+            
+            chunks = counted(response.iter_content(chunk_size=SITEMAP_CHUNK_SIZE))
+            if sitemap_url.endswith('.gz'):
+                # Gzipped sitemap files (as opposed to gzip transfer encoding, which requests handles)
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                chunks = (decompressor.decompress(chunk) for chunk in chunks)
+            # Streaming and parsing overlap, so latency covers both
+            result = parse_sitemap_stream(chunks)
+            record["latency_seconds"] = time.monotonic() - request_start
+            return result
+    except Exception as e:
+        record["error"] = str(e)
+        raise
+    finally:
+        finish_request(record)
+
+
+def read_sitemap(session: requests.Session, sitemap_url: str, limiter: Optional[HostRateLimiter] = None,
+                 workers: int = DEFAULT_WORKERS, depth: int = 0,
+                 seen: Optional[Set[str]] = None,
+                 telemetry: Optional[FetchTelemetry] = None) -> List[Tuple[str, Optional[str]]]:
+    """
+    Read a sitemap, following sitemap indexes into their child sitemaps concurrently.
+    
+    Returns the [(loc, lastmod)] page entries in document order, children in index order.
+    """
+    seen = set() if seen is None else seen
+    seen.add(sitemap_url)
+    
+    root_tag, entries = fetch_sitemap(session, sitemap_url, limiter, telemetry)
+    if root_tag != 'sitemapindex':
+        return entries
+    
+    children = [loc for loc, _ in entries if loc not in seen]
+    seen.update(children)
+    if depth >= MAX_SITEMAP_DEPTH:
+        logger.warning(f"Not following {len(children)} nested sitemaps in {sitemap_url}: too deep")
+        return []
+    
+    logger.info(f"Sitemap index {sitemap_url} lists {len(children)} child sitemaps")
+    
+    def read_child(child_url: str) -> List[Tuple[str, Optional[str]]]:
+        try:
+            return read_sitemap(session, child_url, limiter, workers, depth + 1, seen, telemetry)
+        except Exception as e:
+            logger.warning(f"Failed to read child sitemap {child_url}: {e}")
+            return []
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(children) or 1))) as executor:
+        # map() keeps children in index order so discovery is deterministic
+        return [entry for child_entries in executor.map(read_child, children) for entry in child_entries]
+
+
+def discover_sitemap_and_base_url(session: requests.Session, limiter: Optional[HostRateLimiter] = None,
+                                  workers: int = DEFAULT_WORKERS,
+                                  telemetry: Optional[FetchTelemetry] = None,
+                                  sitemap_urls: Optional[List[str]] = None) -> Tuple[str, str, List[Tuple[str, Optional[str]]]]:
     """
-    Discover the sitemap URL and extract the base URL from it.
+    Find a working sitemap and read it in a single pass.
+    Candidates are tried in order, `sitemap_urls` if given, else SITEMAP_URLS.
     
     Returns:
-        Tuple of (sitemap_url, base_url)
+        Tuple of (sitemap_url, base_url, [(loc, lastmod)] page entries)
     """
-    for sitemap_url in SITEMAP_URLS:
+    for sitemap_url in sitemap_urls or SITEMAP_URLS:
         try:
             logger.info(f"Trying sitemap: {sitemap_url}")
-            response = session.get(sitemap_url, headers=HEADERS, timeout=30)
-            if response.status_code == 200:
+            entries = read_sitemap(session, sitemap_url, limiter, workers, telemetry=telemetry)
+            if entries:
                 # Extract base URL from the first URL in sitemap
-                # Parse XML safely to prevent XXE attacks
-                try:
-                    # Try with security parameters (Python 3.8+)
-                    parser = ET.XMLParser(forbid_dtd=True, forbid_entities=True, forbid_external=True)
-                    root = ET.fromstring(response.content, parser=parser)
-                except TypeError:
-                    # Fallback for older Python versions
-                    logger.warning("XMLParser security parameters not available, using default parser")
-                    root = ET.fromstring(response.content)
-                
-                # Try with namespace first
-                namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-                first_url = None
-                for url_elem in root.findall('.//ns:url', namespace):
-                    loc_elem = url_elem.find('ns:loc', namespace)
-                    if loc_elem is not None and loc_elem.text:
-                        first_url = loc_elem.text
-                        break
-                
-                # If no URLs found, try without namespace
-                if not first_url:
-                    for loc_elem in root.findall('.//loc'):
-                        if loc_elem.text:
-                            first_url = loc_elem.text
-                            break
-                
-                if first_url:
-                    parsed = urlparse(first_url)
-                    base_url = f"{parsed.scheme}://{parsed.netloc}"
-                    logger.info(f"Found sitemap at {sitemap_url}, base URL: {base_url}")
-                    return sitemap_url, base_url
+                parsed = urlparse(entries[0][0])
+                base_url = f"{parsed.scheme}://{parsed.netloc}"
+                logger.info(f"Found sitemap at {sitemap_url}, base URL: {base_url}")
+                return sitemap_url, base_url, entries
         except Exception as e:
             logger.warning(f"Failed to fetch {sitemap_url}: {e}")
             continue
@@ -174,126 +438,92 @@ def discover_sitemap_and_base_url(session: requests.Session) -> Tuple[str, str]:
     raise Exception("Could not find a valid sitemap")
 
 
-def discover_claude_code_pages(session: requests.Session, sitemap_url: str) -> List[str]:
+def discover_claude_code_pages(sitemap_entries: List[Tuple[str, Optional[str]]],
+                               locales: Iterable[str] = (DEFAULT_LOCALE,)) -> Tuple[List[str], Dict[str, str]]:
     """
-    Dynamically discover all Claude Code documentation pages from the sitemap.
+    Pick the Claude Code documentation pages out of the sitemap entries.
     Now with better pattern matching flexibility.
+    All requested locales are picked out of the same sitemap pass.
+    
+    Returns:
+        Tuple of (page paths, {page path: sitemap lastmod}) - pages without a
+        <lastmod> are absent from the second mapping
     """
     logger.info("Discovering documentation pages from sitemap...")
     
-    try:
-        response = session.get(sitemap_url, headers=HEADERS, timeout=30)
-        response.raise_for_status()
-        
-        # Parse XML sitemap safely
-        try:
-            # Try with security parameters (Python 3.8+)
-            parser = ET.XMLParser(forbid_dtd=True, forbid_entities=True, forbid_external=True)
-            root = ET.fromstring(response.content, parser=parser)
-        except TypeError:
-            # Fallback for older Python versions
-            logger.warning("XMLParser security parameters not available, using default parser")
-            root = ET.fromstring(response.content)
-        
-        # Extract all URLs from sitemap
-        urls = []
-        
-        # Try with namespace first
-        namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-        for url_elem in root.findall('.//ns:url', namespace):
-            loc_elem = url_elem.find('ns:loc', namespace)
-            if loc_elem is not None and loc_elem.text:
-                urls.append(loc_elem.text)
-        
-        # If no URLs found, try without namespace
-        if not urls:
-            for loc_elem in root.findall('.//loc'):
-                if loc_elem.text:
-                    urls.append(loc_elem.text)
-        
-        logger.info(f"Found {len(urls)} total URLs in sitemap")
-        
-        # Filter for ENGLISH Claude Code documentation pages only
-        claude_code_pages = []
-
-        # Only accept English documentation patterns
-        # NOTE: URL structure changed from /en/docs/claude-code/ to /docs/en/
-        english_patterns = [
-            '/docs/en/',  # New structure (code.claude.com)
-            '/en/docs/claude-code/',  # Legacy structure (docs.anthropic.com)
-        ]
-        
-        for url in urls:
-            # Check if URL matches English pattern specifically
-            if any(pattern in url for pattern in english_patterns):
-                parsed = urlparse(url)
-                path = parsed.path
-                
-                # Remove any file extension
-                if path.endswith('.html'):
-                    path = path[:-5]
-                elif path.endswith('/'):
-                    path = path[:-1]
-                
-                # Skip certain types of pages
-                skip_patterns = [
-                    '/tool-use/',  # Tool-specific pages
-                    '/examples/',  # Example pages
-                    '/legacy/',    # Legacy documentation
-                    '/api/',       # API reference pages
-                    '/reference/', # Reference pages that aren't core docs
-                ]
-                
-                if not any(skip in path for skip in skip_patterns):
-                    claude_code_pages.append(path)
-        
-        # Remove duplicates and sort
-        claude_code_pages = sorted(list(set(claude_code_pages)))
-        
-        logger.info(f"Discovered {len(claude_code_pages)} Claude Code documentation pages")
-        
-        return claude_code_pages
-        
-    except Exception as e:
-        logger.error(f"Failed to discover pages from sitemap: {e}")
-        logger.warning("Falling back to essential pages...")
-
-        # More comprehensive fallback list (updated for new URL structure)
-        # NOTE: Changed from /en/docs/claude-code/ to /docs/en/
-        return [
-            "/docs/en/overview",
-            "/docs/en/setup",
-            "/docs/en/quickstart",
-            "/docs/en/memory",
-            "/docs/en/common-workflows",
-            "/docs/en/ide-integrations",
-            "/docs/en/mcp",
-            "/docs/en/github-actions",
-            "/docs/en/sdk",
-            "/docs/en/troubleshooting",
-            "/docs/en/security",
-            "/docs/en/settings",
-            "/docs/en/hooks",
-            "/docs/en/costs",
-            "/docs/en/monitoring-usage",
-        ]
-
-
-def validate_markdown_content(content: str, filename: str) -> None:
+    urls = [loc for loc, _ in sitemap_entries]
+    url_lastmods = {loc: lastmod for loc, lastmod in sitemap_entries if lastmod}
+    
+    logger.info(f"Found {len(urls)} total URLs in sitemap")
+    
+    # Filter for Claude Code documentation pages in the requested locales only
+    claude_code_pages = []
+    page_lastmods = {}
+
+    # NOTE: URL structure changed from /en/docs/claude-code/ to /docs/en/
+    locale_patterns = []
+    for locale in locales:
+        locale_patterns.append(f'/docs/{locale}/')  # New structure (code.claude.com)
+        locale_patterns.append(f'/{locale}/docs/claude-code/')  # Legacy structure (docs.anthropic.com)
+    
+    for url in urls:
+        # Check if URL matches a requested locale's pattern specifically
+        if any(pattern in url for pattern in locale_patterns):
+            parsed = urlparse(url)
+            path = parsed.path
+            
+            # Remove any file extension
+            if path.endswith('.html'):
+                path = path[:-5]
+            elif path.endswith('/'):
+                path = path[:-1]
+            
+            # Skip certain types of pages
+            skip_patterns = [
+                '/tool-use/',  # Tool-specific pages
+                '/examples/',  # Example pages
+                '/legacy/',    # Legacy documentation
+                '/api/',       # API reference pages
+                '/reference/', # Reference pages that aren't core docs
+            ]
+            
+            if not any(skip in path for skip in skip_patterns):
+                claude_code_pages.append(path)
+                if url in url_lastmods:
+                    page_lastmods[path] = url_lastmods[url]
+    
+    # Remove duplicates and sort
+    claude_code_pages = sorted(list(set(claude_code_pages)))
+    
+    logger.info(f"Discovered {len(claude_code_pages)} Claude Code documentation pages "
+                f"({len(page_lastmods)} with lastmod)")
+    locale_counts = {}
+    for path in claude_code_pages:
+        locale_counts[page_locale(path)] = locale_counts.get(page_locale(path), 0) + 1
+    if len(locale_counts) > 1:
+        logger.info("Pages per locale: " + ", ".join(f"{locale} {count}" for locale, count in sorted(locale_counts.items())))
+    
+    return claude_code_pages, page_lastmods
+
+
+def validate_markdown_content(content: bytes, filename: str) -> None:
     """
     Validate that content is proper markdown.
+    Only the first VALIDATION_HEAD_BYTES are decoded; the full body is never copied.
     Raises ValueError if validation fails.
     """
+    head = content[:VALIDATION_HEAD_BYTES].decode('utf-8', errors='ignore')
+    
     # Check for HTML content
-    if not content or content.startswith('<!DOCTYPE') or '<html' in content[:100]:
+    if not content or head.startswith('<!DOCTYPE') or '<html' in head[:100]:
         raise ValueError("Received HTML instead of markdown")
     
     # Check minimum length
-    if len(content.strip()) < 50:
+    if len(head.strip()) < 50:
         raise ValueError(f"Content too short ({len(content)} bytes)")
     
     # Check for common markdown elements
-    lines = content.split('\n')
+    lines = head.split('\n')
     markdown_indicators = [
         '# ',      # Headers
         '## ',
@@ -321,144 +551,285 @@ def validate_markdown_content(content: str, filename: str) -> None:
         raise ValueError(f"Content doesn't appear to be markdown (only {indicator_count} markdown indicators found)")
     
     # Check for common documentation patterns
-    doc_patterns = ['installation', 'usage', 'example', 'api', 'configuration', 'claude', 'code']
-    content_lower = content.lower()
-    pattern_found = any(pattern in content_lower for pattern in doc_patterns)
-    
-    if not pattern_found:
+    if not DOC_PATTERN.search(content):
         logger.warning(f"Content for {filename} doesn't contain expected documentation patterns")
 
 
-def fetch_markdown_content(path: str, session: requests.Session, base_url: str) -> Tuple[str, str]:
+def rate_limit_delay(response: requests.Response, url: str, limiter: Optional[HostRateLimiter]) -> int:
+    """
+    Read a 429's Retry-After (60s if missing or not in seconds) and pause the host.
+
+    Nothing sleeps here: the limiter keeps every worker off the host until the
+    pause is over, and the retry scheduler defers the page until then.
+    """
+    retry_after = response.headers.get('Retry-After', '')
+    wait_time = int(retry_after) if retry_after.isdigit() else 60
+    logger.warning(f"Rate limited by {urlparse(url).netloc}; deferring for {wait_time} seconds")
+    if limiter:
+        limiter.pause(url, wait_time)
+    return wait_time
+
+
+def start_request(telemetry: Optional[FetchTelemetry], kind: str, name: str, url: str) -> dict:
+    """Start a telemetry record (a detached one when telemetry is off)."""
+    if telemetry:
+        return telemetry.start(kind, name, url)
+    return new_request_record(kind, name, url)
+
+
+def finish_request(record: dict) -> None:
+    record["elapsed_seconds"] = time.monotonic() - record["_started"]
+
+
+def begin_attempt(record: dict, url: str, attempt: int, limiter: Optional[HostRateLimiter]) -> None:
+    """
+    Account for the time a retried request spent deferred, then take a rate limiter token.
+    Raises RetryLater without sending anything while the host is paused after a 429.
+    """
+    record["retries"] = attempt
+    if "_deferred_at" in record:
+        record["backoff_seconds"] += time.monotonic() - record.pop("_deferred_at")
+    if limiter:
+        paused = limiter.paused_for(url)
+        if paused:
+            record["_deferred_at"] = time.monotonic()
+            raise RetryLater(f"{urlparse(url).netloc} is paused after a 429", delay=paused, attempted=False)
+        record["throttle_seconds"] += limiter.acquire(url)
+
+
+def raise_for_retry(response: requests.Response, url: str, limiter: Optional[HostRateLimiter],
+                    record: dict) -> None:
+    """Raise RetryLater for a 429 (pausing the host) or a 5xx response."""
+    if response.status_code == 429:  # Rate limited
+        retry_after = rate_limit_delay(response, url, limiter)
+        record["retry_after_seconds"] += retry_after
+        raise RetryLater("rate limited", delay=retry_after, host_failure=False)
+    if response.status_code >= 500:
+        raise RetryLater(f"HTTP {response.status_code}")
+
+
+def read_body(response: requests.Response, record: dict, prefix: bytes = b'',
+              limit: int = MAX_PAGE_BYTES) -> Tuple[bytes, str]:
+    """
+    Stream a response body, hashing it and checking it is UTF-8 chunk by chunk.
+    
+    `prefix` is hashed and stored as if it were the start of the body.
+    Returns tuple of (content bytes, sha256 hex digest).
+    Raises ValueError when the body exceeds `limit` bytes or isn't valid UTF-8.
+    """
+    declared = response.headers.get('Content-Length', '')
+    if declared.isdigit() and int(declared) > limit:
+        raise ValueError(f"Content too large ({declared} bytes, limit {limit})")
+    
+    digest = hashlib.sha256(prefix)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = [prefix] if prefix else []
+    size = len(prefix)
+    try:
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            record["bytes"] += len(chunk)
+            size += len(chunk)
+            if size > limit:
+                raise ValueError(f"Content too large (over {limit} bytes)")
+            digest.update(chunk)
+            decoder.decode(chunk)
+            chunks.append(chunk)
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Content is not valid UTF-8: {e}")
+    return b''.join(chunks), digest.hexdigest()
+
+
+def conditional_headers(validators: Optional[dict]) -> dict:
+    """Build request headers, adding If-None-Match/If-Modified-Since from stored validators."""
+    headers = dict(HEADERS)
+    if validators:
+        if validators.get("etag"):
+            headers['If-None-Match'] = validators["etag"]
+        if validators.get("last_modified"):
+            headers['If-Modified-Since'] = validators["last_modified"]
+    return headers
+
+
+def response_validators(response: requests.Response, previous: Optional[dict] = None) -> dict:
+    """Extract ETag/Last-Modified from a response, falling back to the previous values."""
+    previous = previous or {}
+    validators = {}
+    etag = response.headers.get('ETag') or previous.get("etag")
+    last_modified = response.headers.get('Last-Modified') or previous.get("last_modified")
+    if etag:
+        validators["etag"] = etag
+    if last_modified:
+        validators["last_modified"] = last_modified
+    return validators
+
+
+def stored_validators(docs_dir: Path, filename: str, old_entry: dict) -> Optional[dict]:
+    """Return validators for a conditional GET, but only if we still have the file locally."""
+    if not (docs_dir / filename).exists():
+        return None
+    validators = {key: old_entry[key] for key in ("etag", "last_modified") if old_entry.get(key)}
+    return validators or None
+
+
+def fetch_markdown_content(path: str, session: requests.Session, base_url: str,
+                           limiter: Optional[HostRateLimiter] = None,
+                           validators: Optional[dict] = None,
+                           telemetry: Optional[FetchTelemetry] = None,
+                           attempt: int = 0) -> Tuple[str, Optional[bytes], Optional[str], dict]:
     """
     Fetch markdown content with better error handling and validation.
+    
+    The body is streamed and hashed as it arrives, and kept as bytes (never decoded
+    in full). When `validators` holds a stored ETag/Last-Modified the request is
+    conditional; a 304 response returns None as the content and hash.
+    Makes a single attempt: transient failures raise RetryLater for the retry
+    scheduler, other HTTP errors and invalid content raise as usual.
+    Returns tuple of (filename, content, content hash, validators).
     """
     markdown_url = f"{base_url}{path}.md"
     filename = url_to_safe_filename(path)
+    record = start_request(telemetry, "page", filename, markdown_url)
     
-    logger.info(f"Fetching: {markdown_url} -> {filename}")
+    logger.info(f"Fetching: {markdown_url} -> {filename}" + (f" (attempt {attempt + 1})" if attempt else ""))
     
-    for attempt in range(MAX_RETRIES):
-        try:
-            response = session.get(markdown_url, headers=HEADERS, timeout=30, allow_redirects=True)
+    try:
+        begin_attempt(record, markdown_url, attempt, limiter)
+        request_start = time.monotonic()
+        with session.get(markdown_url, headers=conditional_headers(validators), timeout=30,
+                         allow_redirects=True, stream=True) as response:
+            record["status"] = response.status_code
+            record["latency_seconds"] += time.monotonic() - request_start
+            raise_for_retry(response, markdown_url, limiter, record)
             
-            # Handle specific HTTP errors
-            if response.status_code == 429:  # Rate limited
-                wait_time = int(response.headers.get('Retry-After', 60))
-                logger.warning(f"Rate limited. Waiting {wait_time} seconds...")
-                time.sleep(wait_time)
-                continue
+            if response.status_code == 304:  # Not modified since last fetch
+                logger.info(f"Not modified: {filename}")
+                record["error"] = None
+                return filename, None, None, response_validators(response, validators)
             
             response.raise_for_status()
             
-            # Get content and validate
-            content = response.text
+            # Stream, hash and validate the content
+            body_start = time.monotonic()
+            content, content_hash = read_body(response, record)
+            record["latency_seconds"] += time.monotonic() - body_start
             validate_markdown_content(content, filename)
             
             logger.info(f"Successfully fetched and validated {filename} ({len(content)} bytes)")
-            return filename, content
-            
-        except requests.exceptions.RequestException as e:
+            record["error"] = None
+            return filename, content, content_hash, response_validators(response)
+    
+    except RetryLater as e:
+        if e.attempted:
             logger.warning(f"Attempt {attempt + 1}/{MAX_RETRIES} failed for {filename}: {e}")
-            if attempt < MAX_RETRIES - 1:
-                # Exponential backoff with jitter
-                delay = min(RETRY_DELAY * (2 ** attempt), MAX_RETRY_DELAY)
-                # Add jitter to prevent thundering herd
-                jittered_delay = delay * random.uniform(0.5, 1.0)
-                logger.info(f"Retrying in {jittered_delay:.1f} seconds...")
-                time.sleep(jittered_delay)
-            else:
-                raise Exception(f"Failed to fetch {filename} after {MAX_RETRIES} attempts: {e}")
-        
-        except ValueError as e:
-            logger.error(f"Content validation failed for {filename}: {e}")
-            raise
-
-
-def content_has_changed(content: str, old_hash: str) -> bool:
-    """Check if content has changed based on hash."""
-    new_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
-    return new_hash != old_hash
+            record["error"] = str(e)
+        record.setdefault("_deferred_at", time.monotonic())
+        raise
+    except requests.exceptions.HTTPError as e:
+        # 4xx other than 429: retrying won't help
+        record["error"] = str(e)
+        raise
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Attempt {attempt + 1}/{MAX_RETRIES} failed for {filename}: {e}")
+        record["error"] = str(e)
+        record["_deferred_at"] = time.monotonic()
+        raise RetryLater(str(e))
+    except ValueError as e:
+        logger.error(f"Content validation failed for {filename}: {e}")
+        record["error"] = str(e)
+        raise
+    finally:
+        finish_request(record)
 
 
-def fetch_changelog(session: requests.Session) -> Tuple[str, str]:
+def fetch_changelog(session: requests.Session, limiter: Optional[HostRateLimiter] = None,
+                    validators: Optional[dict] = None,
+                    telemetry: Optional[FetchTelemetry] = None,
+                    changelog_url: str = CHANGELOG_URL,
+                    attempt: int = 0) -> Tuple[str, Optional[bytes], Optional[str], dict]:
     """
     Fetch Claude Code changelog from GitHub repository.
-    Returns tuple of (filename, content).
+    A 304 for a conditional request returns None as the content and hash.
+    Makes a single attempt, raising RetryLater for transient failures.
+    Returns tuple of (filename, content, content hash, validators).
     """
-    changelog_url = "https://raw.githubusercontent.com/anthropics/claude-code/main/CHANGELOG.md"
-    filename = "changelog.md"
+    filename = CHANGELOG_FILE
+    record = start_request(telemetry, "changelog", filename, changelog_url)
     
-    logger.info(f"Fetching Claude Code changelog: {changelog_url}")
+    logger.info(f"Fetching Claude Code changelog: {changelog_url}" + (f" (attempt {attempt + 1})" if attempt else ""))
     
-    for attempt in range(MAX_RETRIES):
-        try:
-            response = session.get(changelog_url, headers=HEADERS, timeout=30, allow_redirects=True)
+    try:
+        begin_attempt(record, changelog_url, attempt, limiter)
+        request_start = time.monotonic()
+        with session.get(changelog_url, headers=conditional_headers(validators), timeout=30,
+                         allow_redirects=True, stream=True) as response:
+            record["status"] = response.status_code
+            record["latency_seconds"] += time.monotonic() - request_start
+            raise_for_retry(response, changelog_url, limiter, record)
             
-            if response.status_code == 429:  # Rate limited
-                wait_time = int(response.headers.get('Retry-After', 60))
-                logger.warning(f"Rate limited. Waiting {wait_time} seconds...")
-                time.sleep(wait_time)
-                continue
+            if response.status_code == 304:  # Not modified since last fetch
+                logger.info("Not modified: changelog")
+                record["error"] = None
+                return filename, None, None, response_validators(response, validators)
             
             response.raise_for_status()
             
-            content = response.text
-            
-            # Add header to indicate this is from Claude Code repo, not docs site
-            header = """# Claude Code Changelog
-
-> **Source**: https://github.com/anthropics/claude-code/blob/main/CHANGELOG.md
-> 
-> This is the official Claude Code release changelog, automatically fetched from the Claude Code repository. For documentation, see other topics via `/docs`.
-
----
-
-"""
-            content = header + content
+            body_start = time.monotonic()
+            # The header marks it as coming from the Claude Code repo, not the docs site
+            content, content_hash = read_body(response, record, prefix=CHANGELOG_HEADER)
+            record["latency_seconds"] += time.monotonic() - body_start
             
             # Basic validation
             if len(content.strip()) < 100:
                 raise ValueError(f"Changelog content too short ({len(content)} bytes)")
             
             logger.info(f"Successfully fetched changelog ({len(content)} bytes)")
-            return filename, content
-            
-        except requests.exceptions.RequestException as e:
+            record["error"] = None
+            return filename, content, content_hash, response_validators(response)
+    
+    except RetryLater as e:
+        if e.attempted:
             logger.warning(f"Attempt {attempt + 1}/{MAX_RETRIES} failed for changelog: {e}")
-            if attempt < MAX_RETRIES - 1:
-                delay = min(RETRY_DELAY * (2 ** attempt), MAX_RETRY_DELAY)
-                jittered_delay = delay * random.uniform(0.5, 1.0)
-                logger.info(f"Retrying in {jittered_delay:.1f} seconds...")
-                time.sleep(jittered_delay)
-            else:
-                raise Exception(f"Failed to fetch changelog after {MAX_RETRIES} attempts: {e}")
-        
-        except ValueError as e:
-            logger.error(f"Changelog validation failed: {e}")
-            raise
+            record["error"] = str(e)
+        record.setdefault("_deferred_at", time.monotonic())
+        raise
+    except requests.exceptions.HTTPError as e:
+        record["error"] = str(e)
+        raise
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Attempt {attempt + 1}/{MAX_RETRIES} failed for changelog: {e}")
+        record["error"] = str(e)
+        record["_deferred_at"] = time.monotonic()
+        raise RetryLater(str(e))
+    except ValueError as e:
+        logger.error(f"Changelog validation failed: {e}")
+        record["error"] = str(e)
+        raise
+    finally:
+        finish_request(record)
 
 
-def save_markdown_file(docs_dir: Path, filename: str, content: str) -> str:
-    """Save markdown content and return its hash."""
-    file_path = docs_dir / filename
-    
+def save_markdown_file(docs_dir: Path, filename: str, content: bytes) -> None:
+    """Save markdown content atomically, so an interrupted run never leaves a torn file."""
     try:
-        file_path.write_text(content, encoding='utf-8')
-        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        (docs_dir / filename).parent.mkdir(parents=True, exist_ok=True)
+        write_file_atomic(docs_dir / filename, content)
         logger.info(f"Saved: {filename}")
-        return content_hash
     except Exception as e:
         logger.error(f"Failed to save {filename}: {e}")
         raise
 
 
-def cleanup_old_files(docs_dir: Path, current_files: Set[str], manifest: dict) -> None:
+def cleanup_old_files(docs_dir: Path, current_files: Set[str], manifest: dict,
+                      locales: Iterable[str] = ()) -> None:
     """
     Remove only files that were previously fetched but no longer exist.
-    Preserves manually added files.
+    Preserves manually added files, and those of locales not in `locales`.
     """
     previous_files = set(manifest.get("files", {}).keys())
+    for locale in locales:
+        if locale != DEFAULT_LOCALE:
+            previous_files.update(manifest_files(manifest, locale))
     files_to_remove = previous_files - current_files
     
     for filename in files_to_remove:
@@ -471,147 +842,832 @@ def cleanup_old_files(docs_dir: Path, current_files: Set[str], manifest: dict) -
             file_path.unlink()
 
 
-def main():
+def link_duplicate_pages(docs_dir: Path, manifest: dict) -> Dict[str, int]:
+    """
+    Store pages that are identical across locales once on disk.
+    
+    A locale page whose hash matches a page seen before it (DEFAULT_LOCALE's
+    pages first) is replaced by a hard link to that page, and its entry names
+    the page in "same_as". Updates go through os.replace, which gives the
+    updated file a new inode, so they never change the pages linked to it.
+    Returns counts of linked pages and the bytes they no longer take up.
+    """
+    first_seen = {}
+    for filename, entry in sorted(manifest.get("files", {}).items()):
+        if entry.get("hash"):
+            first_seen.setdefault(entry["hash"], filename)
+    
+    linked = 0
+    bytes_saved = 0
+    for locale, namespace in sorted(manifest.get("locales", {}).items()):
+        for filename, entry in sorted(namespace.get("files", {}).items()):
+            entry.pop("same_as", None)
+            content_hash = entry.get("hash")
+            if not content_hash:
+                continue
+            target = first_seen.setdefault(content_hash, filename)
+            path = docs_dir / filename
+            target_path = docs_dir / target
+            if target == filename or not path.exists() or not target_path.exists():
+                continue
+            try:
+                if not os.path.samefile(path, target_path):
+                    tmp_path = path.with_name(f".{path.name}.tmp")
+                    tmp_path.unlink(missing_ok=True)
+                    os.link(target_path, tmp_path)
+                    os.replace(tmp_path, path)
+            except OSError as e:
+                # No hard links on this filesystem: keep the copy
+                logger.debug(f"Could not link {filename} to {target}: {e}")
+                continue
+            entry["same_as"] = target
+            linked += 1
+            bytes_saved += path.stat().st_size
+    
+    return {"linked": linked, "bytes_saved": bytes_saved}
+
+
+def store_content(docs_dir: Path, filename: str, content: Optional[bytes], raw_hash: Optional[str],
+                  old_entry: dict, volatile_patterns: Iterable[tuple] = VOLATILE_PATTERNS) -> Tuple[str, str, str]:
+    """
+    Normalize fetched content and save it if its normalized hash changed.
+    
+    `raw_hash` is the hash of the response as received (computed while
+    streaming). `content` is None when the server answered 304 Not Modified,
+    in which case nothing is written.
+    Returns tuple of (hash, last_updated, outcome) where outcome is one of
+    "updated", "unchanged", "suppressed" (the raw response changed but not its
+    normalized text) or "not_modified".
+    """
+    old_hash = old_entry.get("hash", "")
+    
+    if content is None:
+        # Keep the existing hash and timestamp untouched
+        return old_hash, old_entry.get("last_updated", datetime.now().isoformat()), "not_modified"
+    
+    normalized = normalize_content(content, volatile_patterns)
+    # Content that was clean already keeps the hash computed while streaming it
+    content_hash = raw_hash if normalized is content and raw_hash else hashlib.sha256(normalized).hexdigest()
+    content = normalized
+    if content_hash != old_hash:
+        save_markdown_file(docs_dir, filename, content)
+        logger.info(f"Updated: {filename}")
+        # Only update timestamp when content actually changes
+        return content_hash, datetime.now().isoformat(), "updated"
+    
+    # Entries from before normalization only have the raw hash, under "hash"
+    if raw_hash != old_entry.get("raw_hash", old_hash):
+        logger.info(f"Unchanged after normalization: {filename}")
+        return old_hash, old_entry.get("last_updated", datetime.now().isoformat()), "suppressed"
+    
+    logger.info(f"Unchanged: {filename}")
+    # Keep existing timestamp for unchanged files
+    return old_hash, old_entry.get("last_updated", datetime.now().isoformat()), "unchanged"
+
+
+def process_page(page_path: str, session: requests.Session, base_url: str, docs_dir: Path,
+                 manifest: dict, limiter: Optional[HostRateLimiter] = None,
+                 telemetry: Optional[FetchTelemetry] = None, attempt: int = 0,
+                 volatile_patterns: Iterable[tuple] = VOLATILE_PATTERNS) -> Tuple[str, dict, str]:
+    """
+    Fetch one documentation page, save it if it changed, and return its manifest entry.
+    Safe to call from several worker threads at once.
+    Returns tuple of (filename, manifest entry, outcome).
+    """
+    filename = url_to_safe_filename(page_path)
+    old_entry = manifest_files(manifest, page_locale(page_path)).get(filename, {})
+    
+    filename, content, raw_hash, validators = fetch_markdown_content(
+        page_path, session, base_url, limiter, stored_validators(docs_dir, filename, old_entry), telemetry, attempt)
+    content_hash, last_updated, outcome = store_content(docs_dir, filename, content, raw_hash, old_entry,
+                                                        volatile_patterns)
+    if telemetry:
+        telemetry.set_changed("page", filename, outcome == "updated")
+    
+    entry = {
+        "original_url": f"{base_url}{page_path}",
+        "original_md_url": f"{base_url}{page_path}.md",
+        "hash": content_hash,
+        "raw_hash": raw_hash or old_entry.get("raw_hash", content_hash),
+        "last_updated": last_updated
+    }
+    entry.update(validators)
+    return filename, entry, outcome
+
+
+def process_changelog(session: requests.Session, docs_dir: Path, manifest: dict,
+                      limiter: Optional[HostRateLimiter] = None,
+                      telemetry: Optional[FetchTelemetry] = None,
+                      changelog_url: str = CHANGELOG_URL,
+                      attempt: int = 0,
+                      volatile_patterns: Iterable[tuple] = VOLATILE_PATTERNS
+                      ) -> Tuple[str, dict, str, Optional[Dict[str, list]]]:
+    """
+    Fetch the Claude Code changelog, save it if it changed, and return its manifest entry.
+    
+    The changelog only counts as updated when a release section was added or
+    changed; edits outside the releases keep the previous last_updated.
+    Returns tuple of (filename, manifest entry, outcome, release changes).
+    """
+    filename = CHANGELOG_FILE
+    old_entry = manifest.get("files", {}).get(filename, {})
+    
+    filename, content, raw_hash, validators = fetch_changelog(
+        session, limiter, stored_validators(docs_dir, filename, old_entry), telemetry, changelog_url, attempt)
+    content_hash, last_updated, outcome = store_content(docs_dir, filename, content, raw_hash, old_entry,
+                                                        volatile_patterns)
+    
+    # Diff the per-release index (only re-split when the file changed)
+    release_changes = None
+    try:
+        release_changes = update_changelog_index(docs_dir, {filename: {"hash": content_hash}})
+    except Exception as e:
+        logger.error(f"Failed to update changelog index: {e}")
+    if outcome == "updated" and release_changes and not (release_changes["added"] or release_changes["changed"]):
+        logger.info("Changelog changed outside its release sections; not counted as an update")
+        outcome = "unchanged"
+        last_updated = old_entry.get("last_updated", last_updated)
+    
+    if telemetry:
+        telemetry.set_changed("changelog", filename, outcome == "updated")
+    
+    entry = {
+        "original_url": "https://github.com/anthropics/claude-code/blob/main/CHANGELOG.md",
+        "original_raw_url": changelog_url,
+        "hash": content_hash,
+        "raw_hash": raw_hash or old_entry.get("raw_hash", content_hash),
+        "last_updated": last_updated,
+        "source": "claude-code-repository"
+    }
+    entry.update(validators)
+    return filename, entry, outcome, release_changes
+
+
+def load_retry_queue(manifest: dict) -> Dict[str, dict]:
+    """
+    Return the previous run's retry queue: {page path or CHANGELOG_TASK: retry state}.
+    Manifests written before the retry queue existed only list failed_pages.
+    """
+    fetch_metadata = manifest.get("fetch_metadata", {})
+    retry_queue = fetch_metadata.get("retry_queue")
+    if isinstance(retry_queue, dict):
+        return retry_queue
+    return {page_path: {"runs": 1} for page_path in fetch_metadata.get("failed_pages", [])}
+
+
+def wall_clock_comparison(previous_metadata: dict, workers: int, seconds: float, documents: int,
+                          completed: str) -> Dict[str, object]:
+    """
+    Page-fetch wall-clock of the latest serial and concurrent runs, side by side.
+    
+    This run's measurement replaces the one for its own mode (serial is
+    --workers 1); the other mode's is carried over from the previous manifest.
+    Runs fetch different numbers of documents (incremental and scheduled runs
+    only fetch some), so each side is also given per document, and `speedup`
+    compares those once both modes have been measured.
+    """
+    comparison = dict(previous_metadata.get("wall_clock_by_mode") or {})
+    comparison.pop("speedup", None)
+    comparison["serial" if workers == 1 else "concurrent"] = {
+        "seconds": round(seconds, 3),
+        "documents": documents,
+        "seconds_per_document": round(seconds / documents, 4) if documents else None,
+        "workers": workers,
+        "completed": completed,
+    }
+    serial = (comparison.get("serial") or {}).get("seconds_per_document")
+    concurrent = (comparison.get("concurrent") or {}).get("seconds_per_document")
+    if serial and concurrent:
+        comparison["speedup"] = round(serial / concurrent, 2)
+    return dict(sorted(comparison.items()))
+
+
+def select_pages_to_refresh(pages: List[str], lastmods: Dict[str, str], manifest: dict,
+                            docs_dir: Path, now: Optional[datetime] = None) -> Tuple[List[str], Dict[str, dict]]:
+    """
+    Pick the pages an incremental or scheduled run has to fetch.
+    
+    A page is refetched when it is new, its sitemap lastmod is missing or differs
+    from the stored one, its local file is gone, or it is in the retry queue.
+    Scheduled runs (`now` given) go by the pages' poll times instead: a page is
+    refetched when it is due, or when the sitemap reports a new lastmod for it.
+    Returns tuple of (pages to fetch, {page path: carried-over manifest entry}).
+    """
+    previously_failed = set(load_retry_queue(manifest))
+    
+    to_fetch = []
+    carried_over = {}
+    for page_path in pages:
+        filename = url_to_safe_filename(page_path)
+        old_entry = manifest_files(manifest, page_locale(page_path)).get(filename)
+        lastmod = lastmods.get(page_path)
+        
+        if now is None:
+            fresh = bool(lastmod) and old_entry is not None and old_entry.get("sitemap_lastmod") == lastmod
+        else:
+            fresh = (old_entry is not None
+                     and not is_due(old_entry.get("poll"), now)
+                     and old_entry.get("sitemap_lastmod") in (None, lastmod))
+        if (fresh
+                and page_path not in previously_failed
+                and (docs_dir / filename).exists()):
+            carried_over[page_path] = old_entry
+        else:
+            to_fetch.append(page_path)
+    
+    return to_fetch, carried_over
+
+
+def fetch_documents(pages: List[str], session: requests.Session, base_url: str, docs_dir: Path,
+                    manifest: dict, limiter: HostRateLimiter, scheduler: RetryScheduler,
+                    telemetry: Optional[FetchTelemetry] = None, changelog_url: str = CHANGELOG_URL,
+                    retry_first: Iterable[str] = (),
+                    include_changelog: bool = True,
+                    volatile_patterns: Iterable[tuple] = VOLATILE_PATTERNS
+                    ) -> Dict[str, Tuple[Optional[tuple], Optional[Exception]]]:
+    """
+    Fetch the pages and the changelog through the retry scheduler.
+    
+    Anything in `retry_first` (the previous run's retry queue) is fetched first,
+    then the changelog, which lives on another host, then the remaining pages.
+    Scheduled runs pass include_changelog=False when the changelog isn't due.
+    A rate-limited or failing host only defers its own documents; the workers
+    keep going with the rest.
+    Returns {page path or CHANGELOG_TASK: (result, error)}; results are
+    assembled by the caller in discovery order, so completion order doesn't
+    affect the manifest.
+    """
+    total = len(pages)
+    positions = {page_path: i for i, page_path in enumerate(pages, 1)}
+    retry_first = set(retry_first)
+    
+    def attempt(key: str, attempt_number: int):
+        if key == CHANGELOG_TASK:
+            return process_changelog(session, docs_dir, manifest, limiter, telemetry, changelog_url, attempt_number,
+                                     volatile_patterns)
+        if not attempt_number:
+            logger.info(f"Processing {positions[key]}/{total}: {key}")
+        return process_page(key, session, base_url, docs_dir, manifest, limiter, telemetry, attempt_number,
+                            volatile_patterns)
+    
+    tasks = [(CHANGELOG_TASK, changelog_url)] if include_changelog else []
+    tasks += [(page_path, f"{base_url}{page_path}.md") for page_path in pages]
+    # sort() is stable, so pages keep their discovery order within each group
+    tasks.sort(key=lambda task: task[0] not in retry_first)
+    if retry_first:
+        logger.info(f"Retrying first: {len(retry_first & set(dict(tasks)))} document(s) that failed last run")
+    
+    results = scheduler.run(tasks, attempt)
+    for key, _ in tasks:
+        error = results[key][1]
+        if error is not None:
+            logger.error(f"Failed to process {key}: {error}")
+    return results
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """argparse type for --shard I/N (1 <= I <= N)."""
+    match = re.match(r'^(\d+)/(\d+)$', value)
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise argparse.ArgumentTypeError(f"expected I/N with 1 <= I <= N, got {value!r}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def shard_of(filename: str, count: int) -> int:
+    """The 1-based shard that fetches a file, from a hash of its filename that is the same on every runner."""
+    return zlib.crc32(filename.encode('utf-8')) % count + 1
+
+
+def shard_manifest_path(shard_dir: Path, index: int, count: int) -> Path:
+    return shard_dir / f"manifest.{index}-of-{count}.json"
+
+
+def load_shard_manifests(shard_dir: Path, count: int, manifest: dict) -> List[dict]:
+    """
+    Read the partial manifests of all `count` shards.
+    
+    Raises ValueError if one is missing, or if they weren't started from the
+    current manifest or disagree on what they discovered.
+    """
+    base = manifest.get("fetch_metadata", {}).get("last_fetch_completed")
+    shards = []
+    for index in range(1, count + 1):
+        path = shard_manifest_path(shard_dir, index, count)
+        if not path.exists():
+            raise ValueError(f"partial manifest {path} is missing")
+        shard = json.loads(path.read_text())
+        if shard["shard"] != [index, count]:
+            raise ValueError(f"{path} holds shard {shard['shard'][0]}/{shard['shard'][1]}")
+        if shard["manifest_base"] != base:
+            raise ValueError(f"shard {index}/{count} started from another docs_manifest.json")
+        shards.append(shard)
+    for shard in shards[1:]:
+        for key in ("locales", "incremental", "schedule", "workers", "base_url", "pages", "page_lastmods"):
+            if shard[key] != shards[0][key]:
+                raise ValueError(f"shard {shard['shard'][0]}/{count} disagrees with shard 1/{count} on {key}")
+    return shards
+
+
+def merge_shard_runs(shards: List[dict], telemetry: FetchTelemetry) -> dict:
+    """
+    Combine the shards' partial manifests into the state a single-process run
+    has once its fetches are done.
+    
+    Results are keyed by page and assembled in discovery order, so the merged
+    manifest doesn't depend on which shard finished first. Request records go
+    into `telemetry`; wall-clock phases take the slowest shard.
+    """
+    results = {}
+    carried_over = {}
+    fetched = set()
+    retry_stats: Dict[str, object] = {"open_circuits": [], "circuits_opened": {}}
+    for shard in shards:
+        for key, outcome in shard["results"].items():
+            result = tuple(outcome["result"]) if outcome["result"] is not None else None
+            results[key] = (result, Exception(outcome["error"]) if outcome["error"] is not None else None)
+        carried_over.update(shard["carried_over"])
+        fetched.update(shard["pages_to_fetch"])
+        telemetry.add_records(shard["telemetry"]["records"])
+        for phase, seconds in shard["telemetry"]["phases"].items():
+            telemetry.set_phase(phase, max(seconds, telemetry.phases.get(phase, 0.0)))
+        for key, value in shard["retries"].items():
+            if key == "open_circuits":
+                retry_stats[key] = sorted(set(retry_stats[key]) | set(value))
+            elif key == "circuits_opened":
+                for host, opened in value.items():
+                    retry_stats[key][host] = retry_stats[key].get(host, 0) + opened
+            elif key == "drain_seconds":
+                retry_stats[key] = max(value, retry_stats.get(key, 0.0))
+            else:
+                retry_stats[key] = retry_stats.get(key, 0) + value
+    
+    return {
+        "pages_to_fetch": [page_path for page_path in shards[0]["pages"] if page_path in fetched],
+        "carried_over": carried_over,
+        "results": results,
+        "changelog_due": any(shard["changelog_due"] for shard in shards),
+        "pages_wall_clock": max(shard["pages_wall_clock"] for shard in shards),
+        "retries": retry_stats,
+    }
+
+
+def verify_docs(docs_dir: Path, repair_broken: bool = False) -> int:
+    """
+    Check the docs against the manifest's hashes, optionally re-fetching broken pages.
+    Returns the exit status: 0 if every listed file is intact (after repair), 1 otherwise.
+    """
+    if not (docs_dir / MANIFEST_FILE).exists():
+        logger.error(f"Nothing to verify: no {MANIFEST_FILE} in {docs_dir}")
+        return 2
+    report = verify(docs_dir)
+    logger.info(f"Verified {report['checked']} files: {report['hashed']} hashed, {report['cached']} from cache")
+    broken = report["missing"] + report["corrupt"]
+    if repair_broken and broken:
+        result = repair(docs_dir, broken)
+        logger.info(f"Repaired {len(result['repaired'])} file(s)")
+        report = verify(docs_dir)
+    for key, label in (("missing", "Missing"), ("corrupt", "Corrupted"), ("extra", "Not in manifest")):
+        for filename in report[key]:
+            logger.warning(f"{label}: {filename}")
+    return 1 if report["missing"] or report["corrupt"] else 0
+
+
+def volatile_pattern(value: str) -> tuple:
+    """argparse type for --volatile-pattern: a regex whose matches are removed before hashing."""
+    try:
+        return re.compile(value.encode('utf-8'), re.MULTILINE), b'', None
+    except re.error as e:
+        raise argparse.ArgumentTypeError(f"invalid pattern {value!r}: {e}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Fetch Claude Code documentation into docs/")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"Number of concurrent page fetches, 1 for serial (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--rate', type=float, default=RATE_LIMIT_PER_SECOND,
+                        help=f"Maximum requests per second per host (default: {RATE_LIMIT_PER_SECOND})")
+    parser.add_argument('--docs-dir', type=Path, default=Path(__file__).parent.parent / 'docs',
+                        help="Output directory for the docs and manifest (default: docs/)")
+    parser.add_argument('--sitemap-url', action='append', dest='sitemap_urls', metavar='URL',
+                        help="Sitemap to read instead of the built-in list (repeat to give fallbacks)")
+    parser.add_argument('--changelog-url', default=CHANGELOG_URL,
+                        help="Raw changelog URL (default: the Claude Code repository's CHANGELOG.md)")
+    parser.add_argument('--bundle', type=Path, default=DEFAULT_BUNDLE_PATH,
+                        help="Where to write the packed docs bundle (default: dist/docs.bundle)")
+    parser.add_argument('--metrics-dir', type=Path, default=DEFAULT_METRICS_DIR,
+                        help="Where to write fetch_metrics.json and fetch_metrics.prom (default: dist/)")
+    parser.add_argument('--local-links', type=Path, metavar='DIR',
+                        help="Also write a copy of the docs to DIR with links rewritten to the local files")
+    parser.add_argument('--locales', default=DEFAULT_LOCALE,
+                        help=f"Comma-separated locales to mirror, e.g. en,ja,de; locales other than "
+                             f"{DEFAULT_LOCALE} go in docs/<locale>/ (default: {DEFAULT_LOCALE})")
+    parser.add_argument('--volatile-pattern', action='append', dest='volatile_patterns', type=volatile_pattern,
+                        default=[], metavar='REGEX',
+                        help="Remove matches of REGEX from pages before hashing, so they never count as "
+                             "changes (repeatable; added to the built-in patterns)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only refetch pages whose sitemap lastmod changed, plus new and previously failed pages")
+    parser.add_argument('--full-sweep-every', type=int, default=FULL_SWEEP_EVERY,
+                        help=f"In incremental mode, refetch everything every N runs (default: {FULL_SWEEP_EVERY})")
+    parser.add_argument('--schedule', action='store_true',
+                        help="Only fetch the pages (and changelog) whose adaptive poll time has come, plus new, "
+                             "failed and lastmod-changed pages; see fetch_schedule.py")
+    parser.add_argument('--shard', type=parse_shard, metavar='I/N',
+                        help="Fetch only shard I of N (pages split by a hash of their filename) and write a "
+                             "partial manifest to --shard-dir; --merge-shards N finishes the run")
+    parser.add_argument('--merge-shards', type=int, metavar='N',
+                        help="Merge the partial manifests of N shards, then clean up and build the indexes")
+    parser.add_argument('--shard-dir', type=Path, default=DEFAULT_SHARD_DIR,
+                        help="Where shards write their partial manifests (default: dist/shards/)")
+    parser.add_argument('--verify', action='store_true',
+                        help="Check the docs against the manifest's hashes and exit, without fetching")
+    parser.add_argument('--repair', action='store_true',
+                        help="With --verify, re-fetch missing and corrupted pages from their original URLs")
+    args = parser.parse_args(argv)
+    if args.repair and not args.verify:
+        parser.error("--repair needs --verify")
+    if args.shard and args.merge_shards:
+        parser.error("--shard and --merge-shards can't be combined")
+    if args.merge_shards is not None and args.merge_shards < 1:
+        parser.error("--merge-shards needs at least one shard")
+    
+    # The default locale is always mirrored: the indexes, bundle and /docs helper read it
+    locales = [DEFAULT_LOCALE]
+    for locale in args.locales.split(','):
+        locale = locale.strip()
+        if not locale or locale in locales:
+            continue
+        if not LOCALE_PATTERN.match(locale):
+            parser.error(f"invalid locale {locale!r} (expected e.g. ja, de or zh-CN)")
+        locales.append(locale)
+    args.locales = locales
+    return args
+
+
+def main(argv: Optional[List[str]] = None):
     """Main function with improved robustness."""
+    args = parse_args(argv)
+    workers = max(1, args.workers)
     start_time = datetime.now()
     logger.info("Starting Claude Code documentation fetch (improved version)")
     
     # Log configuration
     github_repo = os.environ.get('GITHUB_REPOSITORY', 'ericbuess/claude-code-docs')
     logger.info(f"GitHub repository: {github_repo}")
+    logger.info(f"Workers: {workers}, rate limit: {args.rate} requests/second per host")
     
-    # Create docs directory at repository root
-    docs_dir = Path(__file__).parent.parent / 'docs'
-    docs_dir.mkdir(exist_ok=True)
+    # Create docs directory (at repository root unless --docs-dir says otherwise)
+    docs_dir = args.docs_dir
+    docs_dir.mkdir(parents=True, exist_ok=True)
     logger.info(f"Output directory: {docs_dir}")
     
+    if args.verify:
+        sys.exit(verify_docs(docs_dir, args.repair))
+    
     # Load manifest
     manifest = load_manifest(docs_dir)
     
+    # A merge finishes the shards' run, in the mode and with the locales they ran with
+    shards = None
+    if args.merge_shards:
+        try:
+            shards = load_shard_manifests(args.shard_dir, args.merge_shards, manifest)
+        except (ValueError, KeyError) as e:
+            logger.error(f"Cannot merge shards: {e}")
+            sys.exit(1)
+        args.locales, args.incremental, args.schedule = (shards[0]["locales"], shards[0]["incremental"],
+                                                         shards[0]["schedule"])
+        workers = shards[0]["workers"]
+        start_time = min(datetime.fromisoformat(shard["started"]) for shard in shards)
+        logger.info(f"Merging {len(shards)} shard(s) from {args.shard_dir}")
+    
+    # Incremental runs still do a full sweep every N runs as a safety net
+    runs_since_full_sweep = manifest.get("fetch_metadata", {}).get("runs_since_full_sweep", 0) + 1
+    # Scheduled runs need no sweep: every page comes due within MAX_POLL_INTERVAL
+    full_sweep = not args.schedule and (not args.incremental or runs_since_full_sweep >= args.full_sweep_every)
+    if full_sweep:
+        runs_since_full_sweep = 0
+    schedule_now = datetime.fromisoformat(shards[0]["schedule_now"]) if shards else datetime.now(timezone.utc)
+    if args.schedule:
+        logger.info("Schedule mode: fetching pages whose poll time has come")
+    elif args.incremental:
+        logger.info("Incremental mode: " + ("forced full sweep" if full_sweep else
+                    f"run {runs_since_full_sweep}/{args.full_sweep_every} since last full sweep"))
+    
     # Statistics
     successful = 0
-    failed = 0
     failed_pages = []
     fetched_files = set()
+    not_modified = 0
+    downloaded = 0
+    suppressed = []  # refetched pages whose raw response changed but not their normalized text
     new_manifest = {"files": {}}
+    # Requested locales start from an empty namespace; any others are carried over untouched
+    locale_namespaces = {locale: {"files": {}} for locale in args.locales if locale != DEFAULT_LOCALE}
+    for locale, namespace in manifest.get("locales", {}).items():
+        locale_namespaces.setdefault(locale, namespace)
+    if locale_namespaces:
+        new_manifest["locales"] = dict(sorted(locale_namespaces.items()))
+    # The burst doesn't grow with --workers: extra workers wait on the bucket instead of hitting the host
+    limiter = HostRateLimiter(rate=args.rate)
+    breaker = HostCircuitBreaker()
+    scheduler = RetryScheduler(workers, breaker, MAX_RETRIES, RETRY_DELAY, MAX_RETRY_DELAY, MAX_RETRY_WAIT)
+    previous_retry_queue = load_retry_queue(manifest)
+    retry_queue = {}
+    telemetry = FetchTelemetry()
     
     # Create a session for connection pooling
     sitemap_url = None
-    with requests.Session() as session:
-        # Discover sitemap and base URL
-        try:
-            sitemap_url, base_url = discover_sitemap_and_base_url(session)
-        except Exception as e:
-            logger.error(f"Failed to discover sitemap: {e}")
-            logger.info("Using fallback configuration...")
-            base_url = "https://docs.anthropic.com"
-            sitemap_url = None
-        
-        # Discover documentation pages dynamically
-        if sitemap_url:
-            documentation_pages = discover_claude_code_pages(session, sitemap_url)
-        else:
-            # Use fallback pages if sitemap discovery failed (updated for new URL structure)
-            # NOTE: Changed from /en/docs/claude-code/ to /docs/en/
-            documentation_pages = [
-                "/docs/en/overview",
-                "/docs/en/setup",
-                "/docs/en/quickstart",
-                "/docs/en/memory",
-                "/docs/en/common-workflows",
-                "/docs/en/ide-integrations",
-                "/docs/en/mcp",
-                "/docs/en/github-actions",
-                "/docs/en/sdk",
-                "/docs/en/troubleshooting",
-                "/docs/en/security",
-                "/docs/en/settings",
-                "/docs/en/hooks",
-                "/docs/en/costs",
-                "/docs/en/monitoring-usage",
-            ]
-        
-        if not documentation_pages:
-            logger.error("No documentation pages discovered!")
-            sys.exit(1)
-        
-        # Fetch each discovered page
-        for i, page_path in enumerate(documentation_pages, 1):
-            logger.info(f"Processing {i}/{len(documentation_pages)}: {page_path}")
+    if args.merge_shards:
+        merged = merge_shard_runs(shards, telemetry)
+        sitemap_url, base_url = shards[0]["sitemap_url"], shards[0]["base_url"]
+        documentation_pages, page_lastmods = shards[0]["pages"], shards[0]["page_lastmods"]
+        pages_to_fetch, carried_over = merged["pages_to_fetch"], merged["carried_over"]
+        fetch_changelog_now, results = merged["changelog_due"], merged["results"]
+        pages_wall_clock, retry_stats = merged["pages_wall_clock"], merged["retries"]
+    else:
+        with requests.Session() as session:
+            # Size the connection pool so workers don't wait on each other for sockets
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max(10, workers))
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
             
+            # Discover sitemap and base URL, reading the sitemap (and any child sitemaps) once
+            discovery_start = time.monotonic()
             try:
-                filename, content = fetch_markdown_content(page_path, session, base_url)
-                
-                # Check if content has changed
-                old_hash = manifest.get("files", {}).get(filename, {}).get("hash", "")
-                old_entry = manifest.get("files", {}).get(filename, {})
-                
-                if content_has_changed(content, old_hash):
-                    content_hash = save_markdown_file(docs_dir, filename, content)
-                    logger.info(f"Updated: {filename}")
-                    # Only update timestamp when content actually changes
-                    last_updated = datetime.now().isoformat()
-                else:
-                    content_hash = old_hash
-                    logger.info(f"Unchanged: {filename}")
-                    # Keep existing timestamp for unchanged files
-                    last_updated = old_entry.get("last_updated", datetime.now().isoformat())
-                
-                new_manifest["files"][filename] = {
-                    "original_url": f"{base_url}{page_path}",
-                    "original_md_url": f"{base_url}{page_path}.md",
-                    "hash": content_hash,
-                    "last_updated": last_updated
-                }
-                
-                fetched_files.add(filename)
-                successful += 1
-                
-                # Rate limiting
-                if i < len(documentation_pages):
-                    time.sleep(RATE_LIMIT_DELAY)
-                    
+                sitemap_url, base_url, sitemap_entries = discover_sitemap_and_base_url(
+                    session, limiter, workers, telemetry, args.sitemap_urls)
             except Exception as e:
-                logger.error(f"Failed to process {page_path}: {e}")
-                failed += 1
-                failed_pages.append(page_path)
+                logger.error(f"Failed to discover sitemap: {e}")
+                logger.info("Using fallback configuration...")
+                base_url = "https://docs.anthropic.com"
+                sitemap_url = None
+            telemetry.set_phase("sitemap_discovery", time.monotonic() - discovery_start)
+            
+            # Discover documentation pages dynamically
+            page_lastmods = {}
+            if sitemap_url:
+                documentation_pages, page_lastmods = discover_claude_code_pages(sitemap_entries, args.locales)
+            else:
+                # Use fallback pages if sitemap discovery failed (updated for new URL structure)
+                # NOTE: Changed from /en/docs/claude-code/ to /docs/en/
+                documentation_pages = [
+                    "/docs/en/overview",
+                    "/docs/en/setup",
+                    "/docs/en/quickstart",
+                    "/docs/en/memory",
+                    "/docs/en/common-workflows",
+                    "/docs/en/ide-integrations",
+                    "/docs/en/mcp",
+                    "/docs/en/github-actions",
+                    "/docs/en/sdk",
+                    "/docs/en/troubleshooting",
+                    "/docs/en/security",
+                    "/docs/en/settings",
+                    "/docs/en/hooks",
+                    "/docs/en/costs",
+                    "/docs/en/monitoring-usage",
+                ]
+            
+            # The changelog comes from the Claude Code repository (process_changelog); the docs
+            # site's generated copy maps to the same file and would overwrite it
+            documentation_pages = [page_path for page_path in documentation_pages
+                                   if url_to_safe_filename(page_path) != CHANGELOG_FILE]
+            
+            if not documentation_pages:
+                logger.error("No documentation pages discovered!")
+                sys.exit(1)
+            
+            # Skip pages the sitemap reports as unchanged (or, when scheduled, that aren't due),
+            # unless this is a full sweep
+            pages_to_fetch = documentation_pages
+            carried_over = {}
+            fetch_changelog_now = True
+            if args.schedule:
+                pages_to_fetch, carried_over = select_pages_to_refresh(
+                    documentation_pages, page_lastmods, manifest, docs_dir, schedule_now)
+                old_changelog = manifest.get("files", {}).get(CHANGELOG_FILE)
+                fetch_changelog_now = (not old_changelog
+                                       or is_due(old_changelog.get("poll"), schedule_now)
+                                       or CHANGELOG_TASK in previous_retry_queue
+                                       or not (docs_dir / CHANGELOG_FILE).exists())
+                logger.info(f"Scheduled refresh: {len(pages_to_fetch)} due, {len(carried_over)} not due yet; "
+                            f"changelog {'due' if fetch_changelog_now else 'not due'}")
+            elif not full_sweep:
+                pages_to_fetch, carried_over = select_pages_to_refresh(
+                    documentation_pages, page_lastmods, manifest, docs_dir)
+                logger.info(f"Incremental refresh: {len(pages_to_fetch)} to fetch, "
+                            f"{len(carried_over)} unchanged according to sitemap lastmod")
+            
+            # A shard fetches only its own pages, and the changelog if its filename hashes to the shard
+            if args.shard:
+                shard_index, shard_count = args.shard
+                pages_to_fetch = [page_path for page_path in pages_to_fetch
+                                  if shard_of(url_to_safe_filename(page_path), shard_count) == shard_index]
+                carried_over = {page_path: entry for page_path, entry in carried_over.items()
+                                if shard_of(url_to_safe_filename(page_path), shard_count) == shard_index}
+                fetch_changelog_now = fetch_changelog_now and shard_of(CHANGELOG_FILE, shard_count) == shard_index
+                logger.info(f"Shard {shard_index}/{shard_count}: {len(pages_to_fetch)} page(s) to fetch"
+                            + (" and the changelog" if fetch_changelog_now else ""))
+            
+            # Fetch the selected pages and the changelog (concurrently unless --workers 1);
+            # transient failures are deferred and retried after the first pass
+            pages_start = time.monotonic()
+            results = fetch_documents(pages_to_fetch, session, base_url, docs_dir, manifest, limiter, scheduler,
+                                      telemetry, args.changelog_url, retry_first=previous_retry_queue,
+                                      include_changelog=fetch_changelog_now,
+                                      volatile_patterns=VOLATILE_PATTERNS + args.volatile_patterns)
+            pages_wall_clock = time.monotonic() - pages_start
+            telemetry.set_phase("pages", pages_wall_clock)
+            telemetry.set_phase("retry_drain", scheduler.stats["drain_seconds"])
+        retry_stats = dict(scheduler.stats, open_circuits=breaker.open_hosts(), circuits_opened=breaker.opened)
+    
+    # Shards stop here: the merge assembles the manifest, cleans up and builds the indexes once
+    if args.shard:
+        shard_path = shard_manifest_path(args.shard_dir, *args.shard)
+        args.shard_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = shard_path.with_name(f".{shard_path.name}.tmp")
+        tmp_path.write_text(json.dumps({
+            "shard": list(args.shard),
+            "manifest_base": manifest.get("fetch_metadata", {}).get("last_fetch_completed"),
+            "started": start_time.isoformat(),
+            "locales": args.locales,
+            "incremental": args.incremental,
+            "schedule": args.schedule,
+            "workers": workers,
+            "schedule_now": schedule_now.isoformat(),
+            "sitemap_url": sitemap_url,
+            "base_url": base_url,
+            "pages": documentation_pages,
+            "page_lastmods": page_lastmods,
+            "pages_to_fetch": pages_to_fetch,
+            "carried_over": carried_over,
+            "changelog_due": fetch_changelog_now,
+            "results": {key: {"result": result, "error": None if error is None else str(error)}
+                        for key, (result, error) in results.items()},
+            "pages_wall_clock": round(pages_wall_clock, 3),
+            "retries": retry_stats,
+            "telemetry": {"records": telemetry.records(), "phases": telemetry.phases},
+        }, indent=2))
+        os.replace(tmp_path, shard_path)
+        failed = sum(1 for _, error in results.values() if error is not None)
+        logger.info(f"Shard {args.shard[0]}/{args.shard[1]} done in {datetime.now() - start_time}: "
+                    f"{len(results) - failed} fetched, {failed} failed; partial manifest {shard_path}")
+        return
+    
+    def record_failure(key: str, error: Exception, filename: str) -> None:
+        failed_pages.append(key)
+        previous = previous_retry_queue.get(key, {})
+        retry_queue[key] = {
+            "runs": previous.get("runs", 0) + 1,
+            "since": previous.get("since", start_time.isoformat()),
+            "error": str(error)[:200],
+        }
+        # Keep the last good copy until a retry succeeds, rather than deleting it
+        old_entry = manifest_files(manifest, page_locale(key)).get(filename)
+        if old_entry and (docs_dir / filename).exists():
+            manifest_files(new_manifest, page_locale(key))[filename] = old_entry
+            fetched_files.add(filename)
     
-    # Fetch Claude Code changelog
-    logger.info("Fetching Claude Code changelog...")
+    # Every successful check moves the document's poll time; documents without a poll
+    # record yet start from their history in the change journal
     try:
-        filename, content = fetch_changelog(session)
-        
-        # Check if content has changed
-        old_hash = manifest.get("files", {}).get(filename, {}).get("hash", "")
-        old_entry = manifest.get("files", {}).get(filename, {})
+        change_history = journal_history(read_journal(docs_dir))
+    except Exception as e:
+        logger.warning(f"Failed to read change journal for poll history: {e}")
+        change_history = {}
+    
+    def schedule_next_poll(entry: dict, old_entry: Optional[dict], filename: str,
+                           max_interval: int = MAX_POLL_INTERVAL) -> None:
+        history = change_history.get(filename) or ([old_entry["last_updated"]]
+                                                   if old_entry and old_entry.get("last_updated") else [])
+        changed = not old_entry or old_entry.get("hash") != entry.get("hash")
+        entry["poll"] = next_poll(old_entry and old_entry.get("poll"), changed, schedule_now, history, max_interval)
+    
+    # Assemble entries in discovery order so the manifest stays deterministic
+    for page_path in documentation_pages:
+        filename = url_to_safe_filename(page_path)
+        files = manifest_files(new_manifest, page_locale(page_path))
+        if page_path in carried_over:
+            files[filename] = carried_over[page_path]
+            fetched_files.add(filename)
+            successful += 1
+            continue
         
-        if content_has_changed(content, old_hash):
-            content_hash = save_markdown_file(docs_dir, filename, content)
-            logger.info(f"Updated: {filename}")
-            last_updated = datetime.now().isoformat()
+        result, error = results[page_path]
+        if error is not None:
+            record_failure(page_path, error, filename)
+            continue
+        filename, entry, outcome = result
+        if page_path in page_lastmods:
+            entry["sitemap_lastmod"] = page_lastmods[page_path]
+        schedule_next_poll(entry, manifest_files(manifest, page_locale(page_path)).get(filename), filename)
+        files[filename] = entry
+        fetched_files.add(filename)
+        successful += 1
+        if outcome == "not_modified":
+            not_modified += 1
         else:
-            content_hash = old_hash
-            logger.info(f"Unchanged: {filename}")
-            last_updated = old_entry.get("last_updated", datetime.now().isoformat())
-        
-        new_manifest["files"][filename] = {
-            "original_url": "https://github.com/anthropics/claude-code/blob/main/CHANGELOG.md",
-            "original_raw_url": "https://raw.githubusercontent.com/anthropics/claude-code/main/CHANGELOG.md",
-            "hash": content_hash,
-            "last_updated": last_updated,
-            "source": "claude-code-repository"
-        }
-        
+            downloaded += 1
+        if outcome == "suppressed":
+            suppressed.append(filename)
+    
+    # Claude Code changelog
+    release_changes = None
+    result, error = results.get(CHANGELOG_TASK, (None, None))
+    if result is None and error is None:
+        # Not due this run: keep the previous entry and its poll time
+        new_manifest["files"][CHANGELOG_FILE] = manifest["files"][CHANGELOG_FILE]
+        fetched_files.add(CHANGELOG_FILE)
+        successful += 1
+    elif error is not None:
+        logger.error(f"Failed to fetch changelog: {error}")
+        record_failure(CHANGELOG_TASK, error, CHANGELOG_FILE)
+    else:
+        filename, entry, outcome, release_changes = result
+        schedule_next_poll(entry, manifest.get("files", {}).get(filename), filename, CHANGELOG_MAX_POLL_INTERVAL)
+        new_manifest["files"][filename] = entry
         fetched_files.add(filename)
         successful += 1
-        
-    except Exception as e:
-        logger.error(f"Failed to fetch changelog: {e}")
-        failed += 1
-        failed_pages.append("changelog")
+        if outcome == "not_modified":
+            not_modified += 1
+        else:
+            downloaded += 1
+        if outcome == "suppressed":
+            suppressed.append(filename)
     
     # Clean up old files (only those we previously fetched)
-    cleanup_old_files(docs_dir, fetched_files, manifest)
+    cleanup_old_files(docs_dir, fetched_files, manifest, args.locales)
+    post_process_start = time.monotonic()
+    
+    # Pages that are identical across locales share one file on disk
+    dedupe_stats = None
+    if len(args.locales) > 1:
+        try:
+            dedupe_stats = link_duplicate_pages(docs_dir, new_manifest)
+            logger.info(f"Locales: {dedupe_stats['linked']} pages identical to another locale's, "
+                        f"{dedupe_stats['bytes_saved']} bytes saved")
+        except Exception as e:
+            logger.error(f"Failed to link duplicate pages: {e}")
+    
+    # Refresh the local search index (only changed files are re-tokenized)
+    search_index_stats = None
+    try:
+        search_index_stats = update_search_index(docs_dir, new_manifest["files"])
+        logger.info(f"Search index: {search_index_stats['reindexed']} reindexed, "
+                    f"{search_index_stats['reused']} reused, {search_index_stats['removed']} removed")
+    except Exception as e:
+        logger.error(f"Failed to update search index: {e}")
+    
+    # Record heading offsets so the helper can print single sections
+    old_sections = load_sections_index(docs_dir)
+    sections_index_stats = None
+    try:
+        sections_index_stats = update_sections_index(docs_dir, new_manifest["files"], old_sections)
+        logger.info(f"Sections index: {sections_index_stats['reindexed']} reindexed, "
+                    f"{sections_index_stats['reused']} reused, {sections_index_stats['removed']} removed")
+    except Exception as e:
+        logger.error(f"Failed to update sections index: {e}")
+    # The journal only compares the headings of changed pages: keep just those, so
+    # two full copies of the index aren't held at once
+    old_hashes = {name: entry.get("hash") for name, entry in manifest.get("files", {}).items()}
+    old_sections = {name: entry for name, entry in old_sections.items()
+                    if name in new_manifest["files"] and old_hashes.get(name) != new_manifest["files"][name].get("hash")}
+    
+    # The topics, links and similarity indexes are built by their own CLIs after the fetch
+    # (see update-docs.yml), so this process neither loads them nor NumPy
+    local_links_stats = None
+    if args.local_links:
+        try:
+            local_links_stats = export_local_copy(docs_dir, new_manifest["files"], args.local_links, base_url)
+            logger.info(f"Local-link copy: {args.local_links} ({local_links_stats['written']} written, "
+                        f"{local_links_stats['links']} links rewritten)")
+        except Exception as e:
+            logger.error(f"Failed to write local-link copy: {e}")
+    
+    # Append this run's changes (files and headings) to the journal behind "what's new"
+    journal_entry = None
+    try:
+        journal_entry = build_entry(manifest.get("files", {}), new_manifest["files"],
+                                    old_sections, load_sections_index(docs_dir), release_changes)
+        if journal_entry:
+            append_journal(docs_dir, journal_entry)
+            logger.info(f"Change journal: {len(journal_entry['added'])} added, "
+                        f"{len(journal_entry['changed'])} changed, {len(journal_entry['removed'])} removed")
+    except Exception as e:
+        logger.error(f"Failed to update change journal: {e}")
+    
+    # Pack every page into a single bundle (unchanged pages reuse their compressed blobs)
+    bundle_stats = None
+    try:
+        bundle_stats = write_bundle(docs_dir, new_manifest["files"], args.bundle)
+        logger.info(f"Bundle: {args.bundle} ({bundle_stats['bytes']} bytes, "
+                    f"{bundle_stats['compressed']} compressed, {bundle_stats['reused']} reused)")
+    except Exception as e:
+        logger.error(f"Failed to write docs bundle: {e}")
+    
+    telemetry.set_phase("indexes_and_bundle", time.monotonic() - post_process_start)
     
     # Add metadata to manifest
     new_manifest["fetch_metadata"] = {
@@ -619,29 +1675,110 @@ def main():
         "fetch_duration_seconds": (datetime.now() - start_time).total_seconds(),
         "total_pages_discovered": len(documentation_pages),
         "pages_fetched_successfully": successful,
-        "pages_failed": failed,
+        "pages_failed": len(failed_pages),
+        "not_modified_304": not_modified,
+        "full_downloads": downloaded,
+        "suppressed_updates": {
+            "count": len(suppressed),
+            # Capped like the release lists; the count covers all of them
+            "files": suppressed[:MAX_LISTED_SUPPRESSED],
+        },
+        "incremental": args.incremental,
+        "full_sweep": full_sweep,
+        "runs_since_full_sweep": runs_since_full_sweep,
+        "pages_skipped_by_lastmod": 0 if args.schedule else len(carried_over),
+        "schedule": {
+            "pages_due": len(pages_to_fetch),
+            "pages_not_due": len(carried_over),
+            "changelog_due": fetch_changelog_now,
+            "next_due": next_due(list(new_manifest["files"].values()) +
+                                 [entry for locale in args.locales if locale != DEFAULT_LOCALE
+                                  for entry in manifest_files(new_manifest, locale).values()]),
+        } if args.schedule else None,
+        "search_index": search_index_stats,
+        "sections_index": sections_index_stats,
+        "local_links": local_links_stats,
+        "bundle": bundle_stats,
+        "locales": {locale: {"pages": len(manifest_files(new_manifest, locale)),
+                             "same_as_other_locale": sum(1 for entry in manifest_files(new_manifest, locale).values()
+                                                         if entry.get("same_as"))}
+                    for locale in args.locales},
+        "locale_dedupe": dedupe_stats,
+        "journal": journal_entry and {key: len(journal_entry[key]) for key in ("added", "changed", "removed")},
+        "changelog_releases": release_changes and {
+            "total": release_changes["releases"],
+            # Capped so a first run doesn't list every release ever made
+            "added": release_changes["added"][:MAX_LISTED_RELEASES],
+            "changed": release_changes["changed"][:MAX_LISTED_RELEASES],
+            "removed": release_changes["removed"][:MAX_LISTED_RELEASES],
+        },
         "failed_pages": failed_pages,
+        "retry_queue": retry_queue,
+        "retries": retry_stats,
         "sitemap_url": sitemap_url,
         "base_url": base_url,
         "total_files": len(fetched_files),
+        "fetch_mode": "serial" if workers == 1 else "concurrent",
+        "workers": workers,
+        "pages_wall_clock_seconds": round(pages_wall_clock, 3),
+        # Shards fetch side by side, so their wall clock is neither mode's: a merge keeps the last ones
+        "wall_clock_by_mode": (manifest.get("fetch_metadata", {}).get("wall_clock_by_mode") if shards else
+                               wall_clock_comparison(manifest.get("fetch_metadata", {}), workers, pages_wall_clock,
+                                                     len(results), start_time.isoformat())),
+        "telemetry": telemetry.summary(),
         "fetch_tool_version": "3.0"
     }
     
     # Save new manifest
     save_manifest(docs_dir, new_manifest)
+    if shards:
+        # Merged partial manifests describe this run only; don't let a later merge pick them up
+        for index in range(1, args.merge_shards + 1):
+            shard_manifest_path(args.shard_dir, index, args.merge_shards).unlink(missing_ok=True)
+    
+    # Full per-request report for dashboards and run-to-run comparison
+    try:
+        fetch_metadata = new_manifest["fetch_metadata"]
+        reports = telemetry.write_reports(args.metrics_dir, {
+            "completed": fetch_metadata["last_fetch_completed"],
+            "completed_timestamp": int(time.time()),
+            "duration_seconds": round(fetch_metadata["fetch_duration_seconds"], 3),
+            "incremental": args.incremental,
+            "schedule": args.schedule,
+            "full_sweep": full_sweep,
+            "suppressed_updates": len(suppressed),
+            "workers": workers,
+        })
+        logger.info(f"Fetch metrics: {reports['json']}, {reports['prometheus']}")
+    except Exception as e:
+        logger.error(f"Failed to write fetch metrics: {e}")
     
     # Summary
     duration = datetime.now() - start_time
     logger.info("\n" + "="*50)
     logger.info(f"Fetch completed in {duration}")
+    logger.info(f"Page fetch wall-clock ({'serial' if workers == 1 else f'{workers} workers'}): {pages_wall_clock:.1f}s")
     logger.info(f"Discovered pages: {len(documentation_pages)}")
     logger.info(f"Successful: {successful}/{len(documentation_pages)}")
-    logger.info(f"Failed: {failed}")
+    logger.info(f"Failed: {len(failed_pages)}")
+    logger.info(f"Not modified (304): {not_modified}, full downloads: {downloaded}, "
+                f"suppressed by normalization: {len(suppressed)}")
+    if args.schedule:
+        logger.info(f"Not due yet: {len(carried_over)} page(s); next poll due "
+                    f"{new_manifest['fetch_metadata']['schedule']['next_due']}")
+    elif args.incremental:
+        logger.info(f"Skipped by sitemap lastmod: {len(carried_over)}")
+    page_stats = new_manifest["fetch_metadata"]["telemetry"]["requests"].get("page")
+    if page_stats:
+        latency = page_stats["latency_seconds"]
+        logger.info(f"Page latency p50/p95/max: {latency['p50']:.2f}s/{latency['p95']:.2f}s/{latency['max']:.2f}s, "
+                    f"retries: {page_stats['retries']}, waits: {page_stats['throttle_seconds']:.1f}s throttle, "
+                    f"{page_stats['retry_after_seconds']:.1f}s Retry-After, {page_stats['backoff_seconds']:.1f}s backoff")
     
     if failed_pages:
-        logger.warning("\nFailed pages (will retry next run):")
+        logger.warning("\nFailed pages (queued to be retried first next run):")
         for page in failed_pages:
-            logger.warning(f"  - {page}")
+            logger.warning(f"  - {page} ({retry_queue[page]['runs']} run(s) in a row)")
         # Don't exit with error - partial success is OK
         if successful == 0:
             logger.error("No pages were fetched successfully!")
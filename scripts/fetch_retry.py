@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Retry scheduling for the documentation fetcher.
+
+A fetch attempt that fails transiently (connection error, timeout, 5xx, 429)
+raises RetryLater instead of sleeping in its worker. The page goes into a
+deferred queue with a backoff deadline and the workers move on to other
+pages; the queue is drained once the first pass is done. A per-host circuit
+breaker stops sending requests to a host after repeated consecutive failures
+and lets a single probe through once its cool-down has passed.
+"""
+
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+BREAKER_THRESHOLD = 5  # consecutive failures that open a host's circuit
+BREAKER_COOLDOWN = 30.0  # seconds an open circuit waits before letting a probe through
+BREAKER_PROBE_WAIT = 1.0  # how long other requests wait while a probe is in flight
+
+
+class RetryLater(Exception):
+    """
+    Raised by a fetch attempt that should be retried after a delay.
+
+    `delay` overrides the scheduler's backoff (e.g. a Retry-After). `attempted`
+    is False when no request was sent, so the deferral doesn't use up an
+    attempt; `host_failure` marks errors that count against the host's circuit.
+    """
+
+    def __init__(self, message: str, delay: Optional[float] = None,
+                 attempted: bool = True, host_failure: bool = True):
+        super().__init__(message)
+        self.delay = delay
+        self.attempted = attempted
+        self.host_failure = host_failure
+
+
+class HostCircuitBreaker:
+    """
+    Per-host circuit breaker shared by all workers.
+
+    After `threshold` consecutive failures the host's circuit opens and no
+    requests are sent to it for `cooldown` seconds. Then one probe is let
+    through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, dict] = {}
+        self.opened: Dict[str, int] = {}  # host -> times its circuit opened this run
+
+    def _host(self, url: str) -> dict:
+        host = urlparse(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = {"host": host, "failures": 0, "opened_at": None, "probing": False}
+        return self._hosts[host]
+
+    def blocked_for(self, url: str) -> float:
+        """Seconds until a request to the URL's host may be sent (0 means send it now)."""
+        with self._lock:
+            state = self._host(url)
+            if state["opened_at"] is None:
+                return 0.0
+            remaining = state["opened_at"] + self.cooldown - time.monotonic()
+            if remaining > 0:
+                return remaining
+            if state["probing"]:
+                return BREAKER_PROBE_WAIT
+            state["probing"] = True
+            logger.info(f"Circuit for {state['host']} half-open: sending a probe")
+            return 0.0
+
+    def record_success(self, url: str) -> None:
+        with self._lock:
+            state = self._host(url)
+            if state["opened_at"] is not None:
+                logger.info(f"Circuit for {state['host']} closed")
+            state.update(failures=0, opened_at=None, probing=False)
+
+    def release_probe(self, url: str) -> None:
+        """Let another request probe the host when the probe was deferred without being sent."""
+        with self._lock:
+            self._host(url)["probing"] = False
+
+    def record_failure(self, url: str) -> None:
+        with self._lock:
+            state = self._host(url)
+            state["failures"] += 1
+            if state["probing"] or (state["opened_at"] is None and state["failures"] >= self.threshold):
+                state["opened_at"] = time.monotonic()
+                state["probing"] = False
+                self.opened[state["host"]] = self.opened.get(state["host"], 0) + 1
+                logger.warning(f"Circuit for {state['host']} open after {state['failures']} consecutive "
+                               f"failures; pausing it for {self.cooldown:.0f}s")
+
+    def open_hosts(self) -> List[str]:
+        with self._lock:
+            return sorted(state["host"] for state in self._hosts.values() if state["opened_at"] is not None)
+
+
+class RetryScheduler:
+    """
+    Run fetch tasks on a worker pool, deferring transient failures.
+
+    Tasks are (key, url) pairs; `attempt(key, attempt_number)` does the work
+    and raises RetryLater for failures worth retrying. Deferred tasks are
+    retried once the first pass is over, each when its deadline comes up.
+    Deadlines further out than `max_wait` after the first pass are given up on
+    and left for the next run.
+    """
+
+    def __init__(self, workers: int, breaker: Optional[HostCircuitBreaker] = None,
+                 max_attempts: int = 3, base_delay: float = 2.0, max_delay: float = 30.0,
+                 max_wait: float = 300.0):
+        self.workers = max(1, workers)
+        self.breaker = breaker
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_wait = max_wait
+        self.stats = {"deferred": 0, "retried": 0, "recovered": 0, "gave_up": 0, "drain_seconds": 0.0}
+
+    def backoff(self, attempts: int) -> float:
+        """Exponential backoff with jitter, so deferred pages don't come back all at once."""
+        delay = min(self.base_delay * (2 ** (attempts - 1)), self.max_delay)
+        return delay * random.uniform(0.5, 1.0)
+
+    def run(self, tasks: List[Tuple[str, str]],
+            attempt: Callable[[str, int], Any]) -> Dict[str, Tuple[Any, Optional[Exception]]]:
+        """Run every task to success or final failure. Returns {key: (result, error)}."""
+        urls = dict(tasks)
+        attempts = {key: 0 for key in urls}
+        results: Dict[str, Tuple[Any, Optional[Exception]]] = {}
+        last_error: Dict[str, Exception] = {}
+        deferred: List[Tuple[float, int, str]] = []  # heap of (deadline, sequence, key)
+        sequence = itertools.count()
+
+        def try_once(key: str) -> Tuple[str, Any, Optional[Exception]]:
+            url = urls[key]
+            blocked = self.breaker.blocked_for(url) if self.breaker else 0.0
+            if blocked:
+                return key, None, RetryLater(f"circuit open for {urlparse(url).netloc}",
+                                             delay=blocked, attempted=False)
+            try:
+                result = attempt(key, attempts[key])
+            except RetryLater as e:
+                if self.breaker and not e.attempted:
+                    self.breaker.release_probe(url)
+                elif self.breaker and e.host_failure:
+                    self.breaker.record_failure(url)
+                elif self.breaker:
+                    self.breaker.record_success(url)
+                return key, None, e
+            except Exception as e:
+                # The host answered; the failure is about this document
+                if self.breaker:
+                    self.breaker.record_success(url)
+                return key, None, e
+            if self.breaker:
+                self.breaker.record_success(url)
+            return key, result, None
+
+        def settle(outcomes: List[Tuple[str, Any, Optional[Exception]]]) -> None:
+            for key, result, error in outcomes:
+                if not isinstance(error, RetryLater):
+                    if error is None and attempts[key]:
+                        self.stats["recovered"] += 1
+                    results[key] = (result, error)
+                    continue
+                if error.attempted:
+                    attempts[key] += 1
+                if error.attempted or key not in last_error:
+                    last_error[key] = error
+                if attempts[key] >= self.max_attempts:
+                    self.stats["gave_up"] += 1
+                    results[key] = (None, Exception(f"Failed after {attempts[key]} attempts: {error}"))
+                    continue
+                delay = error.delay if error.delay is not None else self.backoff(attempts[key])
+                heapq.heappush(deferred, (time.monotonic() + delay, next(sequence), key))
+                self.stats["deferred"] += 1
+                logger.info(f"Deferring {key} for {delay:.1f}s: {error}")
+
+        def run_batch(keys: List[str]) -> None:
+            if self.workers == 1 or len(keys) == 1:
+                settle([try_once(key) for key in keys])
+            else:
+                # map() yields results in submission order, so logs and stats stay deterministic
+                settle(list(executor.map(try_once, keys)))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            run_batch([key for key, _ in tasks])
+
+            drain_start = time.monotonic()
+            give_up_at = drain_start + self.max_wait
+            while deferred:
+                if deferred[0][0] > give_up_at:
+                    # Everything left is due after the budget: leave it for the next run
+                    for _, _, key in deferred:
+                        self.stats["gave_up"] += 1
+                        results[key] = (None, Exception(f"Gave up for this run: {last_error[key]}"))
+                    break
+                wait = deferred[0][0] - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                ready = []
+                while deferred and deferred[0][0] <= time.monotonic():
+                    ready.append(heapq.heappop(deferred)[2])
+                self.stats["retried"] += len(ready)
+                run_batch(ready)
+            self.stats["drain_seconds"] = round(time.monotonic() - drain_start, 3)
+
+        return results
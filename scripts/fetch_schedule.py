@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Adaptive poll scheduling for the documentation fetcher.
+
+Every manifest entry carries a small `poll` record: how long to wait before
+checking the document again, when that is, and the times its content was
+last seen to change. A check that finds a change halves the interval (and
+keeps it under the typical gap between the document's recent changes); a
+check that finds nothing doubles it, up to a cap. Volatile pages are polled
+about hourly while pages that haven't changed in weeks back off to every few
+days. In --schedule mode each run only fetches the documents that are due.
+
+Documents without a poll record yet start from their change history in
+docs/changes.jsonl, or from their manifest last_updated.
+"""
+
+from datetime import datetime, timedelta, timezone
+from statistics import median
+from typing import Dict, Iterable, List, Optional
+
+MIN_POLL_INTERVAL = 3600  # seconds; the scheduled workflow runs hourly
+MAX_POLL_INTERVAL = 3 * 86400  # stable pages are still checked every few days
+CHANGELOG_MAX_POLL_INTERVAL = 6 * 3600  # releases land often; never back the changelog off further
+DEFAULT_POLL_INTERVAL = 3 * 3600  # documents with no history (the old fixed cadence)
+POLL_BACKOFF = 2  # interval multiplier after an unchanged check (divisor after a change)
+POLL_HISTORY = 8  # change times kept per document
+DUE_SLACK = 10 * 60  # documents due this soon are fetched now; scheduled runs start late
+
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def format_time(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime(TIME_FORMAT)
+
+
+def parse_time(value: str) -> Optional[datetime]:
+    """Parse a poll or journal time, or a manifest last_updated (local time without offset, read as UTC)."""
+    try:
+        moment = datetime.strptime(value, TIME_FORMAT) if value.endswith('Z') else datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def clamp_interval(seconds: float, max_interval: int = MAX_POLL_INTERVAL) -> int:
+    return int(min(max(seconds, MIN_POLL_INTERVAL), max_interval))
+
+
+def typical_gap(changes: List[str]) -> Optional[float]:
+    """Median number of seconds between the recorded changes, or None with fewer than two."""
+    times = sorted(filter(None, (parse_time(change) for change in changes)))
+    gaps = [(later - earlier).total_seconds() for earlier, later in zip(times, times[1:])]
+    gaps = [gap for gap in gaps if gap > 0]
+    return median(gaps) if gaps else None
+
+
+def journal_history(entries: Iterable[dict]) -> Dict[str, List[str]]:
+    """Collect {filename: [change times]} from change journal entries, oldest first."""
+    history: Dict[str, List[str]] = {}
+    for entry in entries:
+        for filename in list(entry.get("added", [])) + list(entry.get("changed", {})):
+            history.setdefault(filename, []).append(entry["time"])
+    return {filename: sorted(times)[-POLL_HISTORY:] for filename, times in history.items()}
+
+
+def initial_poll(changes: List[str], now: datetime, max_interval: int = MAX_POLL_INTERVAL) -> dict:
+    """
+    Poll record for a document checked for the first time under the scheduler.
+
+    With two or more known changes the interval is their typical gap; with one,
+    half the time since it (a page untouched for a month can wait a while);
+    with none, DEFAULT_POLL_INTERVAL.
+    """
+    gap = typical_gap(changes)
+    last_change = parse_time(changes[-1]) if changes else None
+    if gap is not None:
+        interval = gap
+    elif last_change is not None:
+        interval = (now - last_change).total_seconds() / 2
+    else:
+        interval = DEFAULT_POLL_INTERVAL
+    return {"interval": clamp_interval(interval, max_interval), "changes": list(changes)[-POLL_HISTORY:]}
+
+
+def next_poll(previous: Optional[dict], changed: bool, now: datetime, history: List[str] = (),
+              max_interval: int = MAX_POLL_INTERVAL) -> dict:
+    """
+    Update a document's poll record after a successful check.
+
+    `previous` is its current record (None the first time, when `history`
+    seeds it); `changed` says whether the content changed since the last check.
+    Returns the new record: {"interval": seconds, "next": time, "changes": [times]}.
+    """
+    if not previous or "interval" not in previous:
+        previous = initial_poll(list(history), now, max_interval)
+    changes = list(previous.get("changes", []))
+    interval = previous["interval"]
+    if changed:
+        changes = (changes + [format_time(now)])[-POLL_HISTORY:]
+        interval /= POLL_BACKOFF
+        gap = typical_gap(changes)
+        if gap is not None:
+            interval = min(interval, gap)
+    else:
+        interval *= POLL_BACKOFF
+    interval = clamp_interval(interval, max_interval)
+    return {
+        "interval": interval,
+        "next": format_time(now + timedelta(seconds=interval)),
+        "changes": changes,
+    }
+
+
+def is_due(poll: Optional[dict], now: datetime) -> bool:
+    """Whether a document with this poll record should be fetched now (always, without one)."""
+    next_time = parse_time(poll.get("next", "")) if poll else None
+    return next_time is None or next_time <= now + timedelta(seconds=DUE_SLACK)
+
+
+def next_due(entries: Iterable[dict]) -> Optional[str]:
+    """Earliest poll time among the manifest entries, or None if none has one."""
+    times = [entry["poll"]["next"] for entry in entries if entry.get("poll", {}).get("next")]
+    return min(times) if times else None
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Per-request telemetry for the documentation fetcher.
+
+Every sitemap, page and changelog request gets one record holding its HTTP
+status, bytes, network latency, retries and the time spent waiting (rate
+limiter, 429 Retry-After, time deferred for a retry); a retried request
+keeps its record. The run summary goes into the manifest's fetch_metadata;
+the full report is written as JSON and as a Prometheus textfile so slow runs
+can be compared across runs.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+METRICS_JSON_FILE = "fetch_metrics.json"
+METRICS_PROM_FILE = "fetch_metrics.prom"
+METRIC_PREFIX = "claude_docs_fetch"
+SLOWEST_REQUESTS = 5  # slowest requests listed in the summary
+
+
+def new_request_record(kind: str, name: str, url: str) -> dict:
+    return {
+        "kind": kind,
+        "name": name,
+        "url": url,
+        "status": None,
+        "error": None,
+        "bytes": 0,
+        "latency_seconds": 0.0,
+        "elapsed_seconds": 0.0,
+        "retries": 0,
+        "backoff_seconds": 0.0,
+        "retry_after_seconds": 0.0,
+        "throttle_seconds": 0.0,
+        "changed": None,
+        "_started": time.monotonic(),
+    }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of the values (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def distribution(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "max": round(max(values), 4) if values else 0.0,
+        "sum": round(sum(values), 4),
+    }
+
+
+class FetchTelemetry:
+    """
+    Thread-safe collection of request records for one fetcher run.
+
+    Each record is only mutated by the worker that started it; the lock guards
+    the shared record list and lookups.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records: List[dict] = []
+        self._by_name: Dict[tuple, dict] = {}
+        self.phases: Dict[str, float] = {}
+
+    def start(self, kind: str, name: str, url: str) -> dict:
+        """Start a record, or return the existing one when a deferred request is retried."""
+        with self._lock:
+            record = self._by_name.get((kind, name))
+            if record is None:
+                record = new_request_record(kind, name, url)
+                self._records.append(record)
+                self._by_name[(kind, name)] = record
+        return record
+
+    def add_records(self, records: List[dict]) -> None:
+        """Take in the records of another process, e.g. the shards of a sharded run."""
+        with self._lock:
+            for record in records:
+                record = dict(record)
+                self._records.append(record)
+                self._by_name[(record["kind"], record["name"])] = record
+
+    def set_changed(self, kind: str, name: str, changed: bool) -> None:
+        with self._lock:
+            record = self._by_name.get((kind, name))
+        if record is not None:
+            record["changed"] = changed
+
+    def set_phase(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = round(seconds, 3)
+
+    def records(self) -> List[dict]:
+        with self._lock:
+            return [{k: v for k, v in record.items() if not k.startswith('_')} for record in self._records]
+
+    def summary(self) -> dict:
+        """Per-kind totals and latency distributions, small enough for the manifest."""
+        records = self.records()
+        kinds = {}
+        for kind in sorted({record["kind"] for record in records}):
+            group = [record for record in records if record["kind"] == kind]
+            statuses: Dict[str, int] = {}
+            for record in group:
+                status = str(record["status"]) if record["status"] is not None else "error"
+                statuses[status] = statuses.get(status, 0) + 1
+            kinds[kind] = {
+                "requests": len(group),
+                "statuses": dict(sorted(statuses.items())),
+                "bytes": sum(record["bytes"] for record in group),
+                "retries": sum(record["retries"] for record in group),
+                "changed": sum(1 for record in group if record["changed"]),
+                "latency_seconds": distribution([record["latency_seconds"] for record in group]),
+                "elapsed_seconds": distribution([record["elapsed_seconds"] for record in group]),
+                "backoff_seconds": round(sum(record["backoff_seconds"] for record in group), 3),
+                "retry_after_seconds": round(sum(record["retry_after_seconds"] for record in group), 3),
+                "throttle_seconds": round(sum(record["throttle_seconds"] for record in group), 3),
+            }
+
+        slowest = sorted(records, key=lambda record: -record["elapsed_seconds"])[:SLOWEST_REQUESTS]
+        return {
+            "phases_seconds": dict(self.phases),
+            "requests": kinds,
+            "slowest": [[record["kind"], record["name"], round(record["elapsed_seconds"], 3)]
+                        for record in slowest],
+        }
+
+    def write_reports(self, metrics_dir: Path, run_info: Optional[dict] = None) -> Dict[str, str]:
+        """Write the JSON report (summary plus every record) and the Prometheus textfile."""
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        summary = self.summary()
+        report = dict(run_info or {})
+        report["summary"] = summary
+        report["records"] = self.records()
+
+        json_path = metrics_dir / METRICS_JSON_FILE
+        write_atomic(json_path, json.dumps(report, indent=2))
+        prom_path = metrics_dir / METRICS_PROM_FILE
+        write_atomic(prom_path, prometheus_text(summary, run_info or {}))
+        return {"json": str(json_path), "prometheus": str(prom_path)}
+
+
+def write_atomic(path: Path, text: str) -> None:
+    # node_exporter's textfile collector may read at any moment
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_text(text, encoding='utf-8')
+    os.replace(tmp_path, path)
+
+
+def prometheus_text(summary: dict, run_info: dict) -> str:
+    """Render the summary in the Prometheus text exposition format."""
+    lines = []
+
+    def metric(name: str, metric_type: str, help_text: str, samples: List[tuple]) -> None:
+        full_name = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} {metric_type}")
+        for suffix, labels, value in samples:
+            label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+            lines.append(f"{full_name}{suffix}{{{label_text}}} {value}" if label_text
+                         else f"{full_name}{suffix} {value}")
+
+    kinds = summary["requests"]
+    metric("requests", "gauge", "Requests made in the last run, by kind and HTTP status.",
+           [("", {"kind": kind, "status": status}, count)
+            for kind, stats in kinds.items() for status, count in stats["statuses"].items()])
+    metric("bytes", "gauge", "Response bytes received in the last run.",
+           [("", {"kind": kind}, stats["bytes"]) for kind, stats in kinds.items()])
+    metric("retries", "gauge", "Retried attempts in the last run.",
+           [("", {"kind": kind}, stats["retries"]) for kind, stats in kinds.items()])
+    metric("changed", "gauge", "Documents whose content changed in the last run.",
+           [("", {"kind": kind}, stats["changed"]) for kind, stats in kinds.items()])
+    for wait in ("backoff", "retry_after", "throttle"):
+        metric(f"{wait}_seconds", "gauge", f"Seconds spent waiting on {wait.replace('_', '-')} in the last run.",
+               [("", {"kind": kind}, stats[f"{wait}_seconds"]) for kind, stats in kinds.items()])
+    for measure in ("latency", "elapsed"):
+        samples = []
+        for kind, stats in kinds.items():
+            dist = stats[f"{measure}_seconds"]
+            samples.append(("", {"kind": kind, "quantile": "0.5"}, dist["p50"]))
+            samples.append(("", {"kind": kind, "quantile": "0.95"}, dist["p95"]))
+            samples.append(("", {"kind": kind, "quantile": "1"}, dist["max"]))
+            samples.append(("_sum", {"kind": kind}, dist["sum"]))
+            samples.append(("_count", {"kind": kind}, stats["requests"]))
+        help_text = ("Network time per request." if measure == "latency"
+                     else "Wall time per request, including retries and waits.")
+        metric(f"{measure}_seconds", "summary", help_text, samples)
+    metric("phase_seconds", "gauge", "Wall time of each phase of the last run.",
+           [("", {"phase": phase}, seconds) for phase, seconds in summary["phases_seconds"].items()])
+    if "duration_seconds" in run_info:
+        metric("run_duration_seconds", "gauge", "Wall time of the last run.",
+               [("", {}, run_info["duration_seconds"])])
+    if "suppressed_updates" in run_info:
+        metric("suppressed_updates", "gauge", "Pages whose raw response changed but not their normalized text.",
+               [("", {}, run_info["suppressed_updates"])])
+    if "completed_timestamp" in run_info:
+        metric("last_run_timestamp_seconds", "gauge", "Unix time the last run completed.",
+               [("", {}, run_info["completed_timestamp"])])
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The scripts import each other by module name, as they do when run from scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
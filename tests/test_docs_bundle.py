@@ -0,0 +1,42 @@
+import hashlib
+
+import pytest
+
+from docs_bundle import DocsBundle, write_bundle
+
+
+def write_pages(docs_dir, pages):
+    for name, data in pages.items():
+        (docs_dir / name).write_bytes(data)
+    return {name: {"hash": hashlib.sha256(data).hexdigest()} for name, data in pages.items()}
+
+
+def test_round_trip_and_reuse(tmp_path):
+    bundle_path = tmp_path / "docs.bundle"
+    files = write_pages(tmp_path, {"hooks.md": b"# Hooks\n" * 50, "mcp.md": b"# MCP\n"})
+    assert write_bundle(tmp_path, files, bundle_path)["compressed"] == 2
+
+    files.update(write_pages(tmp_path, {"mcp.md": b"# MCP servers\n"}))
+    stats = write_bundle(tmp_path, files, bundle_path)
+    assert (stats["compressed"], stats["reused"]) == (1, 1)
+    with DocsBundle(bundle_path) as bundle:
+        assert bundle.names() == ["hooks.md", "mcp.md"]
+        assert bundle.read("hooks.md") == b"# Hooks\n" * 50
+        assert bundle.read("mcp.md") == b"# MCP servers\n"
+
+
+def test_hash_mismatch_fails_the_integrity_check(tmp_path):
+    bundle_path = tmp_path / "docs.bundle"
+    files = write_pages(tmp_path, {"hooks.md": b"# Hooks\n"})
+    write_bundle(tmp_path, files, bundle_path)
+    with DocsBundle(bundle_path) as bundle:
+        bundle.entries["hooks.md"][2] = "0" * 64
+        with pytest.raises(ValueError):
+            bundle.read("hooks.md")
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.bundle"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        DocsBundle(path)
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / 'scripts'
+
+pytestmark = pytest.mark.skipif(shutil.which('bash') is None, reason="needs bash")
+
+
+@pytest.fixture
+def install(tmp_path):
+    """A helper installed under a scratch $HOME, with one corrupted page and a mirror holding the original."""
+    docs_path = tmp_path / '.claude-code-docs'
+    (docs_path / 'docs').mkdir(parents=True)
+    (docs_path / 'scripts').symlink_to(SCRIPTS_DIR)
+    shutil.copy(SCRIPTS_DIR / 'claude-docs-helper.sh.template', docs_path / 'claude-docs-helper.sh')
+
+    mirror = tmp_path / 'mirror'
+    mirror.mkdir()
+    (mirror / 'hooks.md').write_bytes(b"# Hooks\n")
+    (docs_path / 'docs' / 'hooks.md').write_bytes(b"# Tampered\n")
+    (docs_path / 'docs' / 'docs_manifest.json').write_text(json.dumps({
+        "base_url": mirror.as_uri() + '/',
+        "files": {"hooks.md": {"hash": hashlib.sha256(b"# Hooks\n").hexdigest()}},
+    }))
+    return docs_path
+
+
+def run_helper(docs_path, *args):
+    env = dict(os.environ, HOME=str(docs_path.parent))
+    result = subprocess.run(['bash', str(docs_path / 'claude-docs-helper.sh'), *args],
+                            capture_output=True, text=True, env=env, timeout=60)
+    return result.stdout
+
+
+def test_verify_without_repair_reports_and_suggests_it(install):
+    output = run_helper(install, '--verify')
+    assert "Corrupted: hooks.md" in output
+    assert "/docs --verify --repair" in output
+    assert (install / 'docs' / 'hooks.md').read_bytes() == b"# Tampered\n"
+
+
+@pytest.mark.parametrize("args", [('--verify --repair',), ('--verify', '--repair')])
+def test_verify_repair_as_one_or_two_arguments(install, args):
+    # /docs passes its arguments as one quoted string
+    output = run_helper(install, *args)
+    assert "Repaired: hooks.md" in output
+    assert "Searching for" not in output
+    assert (install / 'docs' / 'hooks.md').read_bytes() == b"# Hooks\n"
+
+
+@pytest.mark.skipif(shutil.which('jq') is None, reason="needs jq")
+def test_whats_new_links_pages_to_their_original_url(install):
+    docs = install / 'docs'
+    manifest = json.loads((docs / 'docs_manifest.json').read_text())
+    manifest["files"].update({
+        "agent-sdk__overview.md": {"original_url": "https://code.claude.com/docs/en/agent-sdk/overview"},
+        "memory.md": {"original_url": "https://code.claude.com/docs/en/memory"},
+    })
+    (docs / 'docs_manifest.json').write_text(json.dumps(manifest))
+    (docs / 'changes.jsonl').write_text(json.dumps({
+        "time": "2026-01-01T00:00:00Z", "added": ["agent-sdk__overview.md", "gone.md"],
+        "changed": {"memory.md": {"added": ["Imports"]}}, "removed": [],
+    }) + '\n')
+    # A fresh sync state, so the helper doesn't try to update first
+    (install / '.sync_state').write_text(f"last_sync={int(time.time())}\n")
+
+    output = run_helper(install, "what's new")
+    assert "agent-sdk__overview: https://code.claude.com/docs/en/agent-sdk/overview" in output
+    assert "memory: https://code.claude.com/docs/en/memory" in output
+    assert "      + Imports" in output
+    # Pages the manifest no longer lists get no link rather than a made-up one
+    assert "➕ gone\n" in output
@@ -0,0 +1,52 @@
+import json
+
+from docs_index import code_block_spans, extract_headings, extract_sections, write_index
+
+
+def test_write_index_replaces_the_file_without_leaving_a_temp_file(tmp_path):
+    index_path = tmp_path / 'search_index.json'
+    index_path.write_text('{"version": 0}')
+    write_index(index_path, {"version": 1, "files": {"hooks.md": "é"}})
+    assert json.loads(index_path.read_text(encoding='utf-8')) == {"version": 1, "files": {"hooks.md": "é"}}
+    assert [path.name for path in tmp_path.iterdir()] == ['search_index.json']
+
+
+def test_write_index_writes_the_same_bytes_as_json_dumps(tmp_path):
+    index_path = tmp_path / 'sections_index.json'
+    for index in ({}, {"files": {}}, {"version": 2, "files": {"a.md": {"hash": "1", "sections": [[1, "Ü\"", "u"]]},
+                                                                "b.md": {}}, "total": None}):
+        write_index(index_path, index)
+        assert index_path.read_text(encoding='utf-8') == json.dumps(index, separators=(',', ':'), ensure_ascii=False)
+
+
+def test_headings_inside_either_fence_are_skipped():
+    text = "# Title\n\n```bash\n# comment\n```\n\n~~~\n# not a heading\n~~~\n\n## Usage\n"
+    assert extract_headings(text) == ["Title", "Usage"]
+    sections = extract_sections(text.encode('utf-8'))
+    assert [(level, title, slug) for level, title, slug, *_ in sections] == [(1, "Title", "title"),
+                                                                              (2, "Usage", "usage")]
+
+
+def test_sections_span_their_subsections():
+    data = "# A\nintro\n## B\nbody\n# C\n".encode('utf-8')
+    spans = [data[start:start + length] for _, _, _, start, length, _ in extract_sections(data)]
+    assert spans == [b"# A\nintro\n## B\nbody\n", b"## B\nbody\n", b"# C\n"]
+
+
+def test_section_hash_covers_only_its_own_text():
+    before = extract_sections(b"# A\nintro\n## B\nold\n")
+    after = extract_sections(b"# A\nintro\n## B\nnew\n")
+    assert before[0][5] == after[0][5]
+    assert before[1][5] != after[1][5]
+
+
+def test_section_offsets_are_byte_offsets():
+    data = "# Café\n\nprix: 5 €\n\xff\n## Ünits\n".encode('utf-8', errors='surrogateescape')
+    sections = extract_sections(data)
+    assert [title for _, title, *_ in sections] == ["Café", "Ünits"]
+    assert data[sections[1][3]:].startswith("## Ünits".encode('utf-8'))
+
+
+def test_a_fence_line_with_two_markers_opens_one_block():
+    assert code_block_spans("``````\n# in\n```\n# out\n") == [(0, 16)]
+    assert extract_headings("```js ```\n# in\n```\n# out\n") == ["out"]
@@ -0,0 +1,51 @@
+import json
+
+from docs_journal import JOURNAL_FILE, build_entry, compact_journal, heading_changes, merge_entries, read_journal
+
+
+def section(title, slug, text_hash):
+    return [2, title, slug, 0, 10, text_hash]
+
+
+def test_heading_changes_match_repeated_slugs_in_order():
+    old = [section("Setup", "setup", "a"), section("Example", "example", "b"), section("Example", "example", "c")]
+    new = [section("Setup", "setup", "a"), section("Example", "example", "b"), section("Example", "example", "x"),
+           section("Limits", "limits", "d")]
+    assert heading_changes(old, new) == {"added": ["Limits"], "changed": ["Example"], "removed": []}
+
+
+def test_build_entry():
+    old_files = {"hooks.md": {"hash": "1"}, "old.md": {"hash": "2"}, "same.md": {"hash": "3"}}
+    new_files = {"hooks.md": {"hash": "9"}, "new.md": {"hash": "4"}, "same.md": {"hash": "3"}}
+    old_sections = {"hooks.md": {"sections": [section("Events", "events", "a")]}}
+    new_sections = {"hooks.md": {"sections": [section("Events", "events", "b")]}}
+    entry = build_entry(old_files, new_files, old_sections, new_sections)
+    assert entry["added"] == ["new.md"] and entry["removed"] == ["old.md"]
+    assert entry["changed"] == {"hooks.md": {"changed": ["Events"]}}
+    assert build_entry(new_files, new_files, new_sections, new_sections) is None
+
+
+def test_merge_entries_unions_files_and_headings():
+    entries = [
+        {"time": "t1", "added": ["a.md"], "changed": {"b.md": {"added": ["X"]}}, "removed": []},
+        {"time": "t2", "runs": 2, "added": ["a.md", "c.md"], "changed": {"b.md": {"added": ["X", "Y"]}},
+         "removed": ["d.md"]},
+    ]
+    assert merge_entries(entries, "day") == {
+        "time": "day", "runs": 3, "added": ["a.md", "c.md"], "changed": {"b.md": {"added": ["X", "Y"]}},
+        "removed": ["d.md"],
+    }
+
+
+def test_compaction_merges_older_runs_by_day(tmp_path):
+    entries = [{"time": f"2026-01-0{day}T0{hour}:00:00Z", "added": [f"{day}-{hour}.md"], "changed": {}, "removed": []}
+               for day in (1, 2) for hour in (1, 2)]
+    (tmp_path / JOURNAL_FILE).write_text(''.join(json.dumps(entry) + '\n' for entry in entries))
+
+    assert not compact_journal(tmp_path, max_bytes=10 ** 6)
+    assert compact_journal(tmp_path, max_bytes=300, keep_runs=1)
+    assert [(entry["time"], entry.get("runs"), entry["added"]) for entry in read_journal(tmp_path)] == [
+        ("2026-01-01T00:00:00Z", 2, ["1-1.md", "1-2.md"]),
+        ("2026-01-02T00:00:00Z", 1, ["2-1.md"]),
+        ("2026-01-02T02:00:00Z", None, ["2-2.md"]),
+    ]
@@ -0,0 +1,60 @@
+from docs_links import extract_links, iter_links, link_key, may_link_to_page, page_keys, rewrite_links
+
+PAGE_URL = "https://code.claude.com/docs/en/hooks.md"
+
+
+def test_link_key_collapses_hosts_suffixes_and_legacy_paths():
+    expected = "docs:/docs/en/settings"
+    assert link_key("https://code.claude.com/docs/en/settings") == expected
+    assert link_key("https://docs.claude.com/docs/en/settings.md") == expected
+    assert link_key("https://docs.anthropic.com/en/docs/claude-code/settings/") == expected
+    assert link_key("https://github.com/anthropics/claude-code") == "github.com:/anthropics/claude-code"
+    assert link_key("mailto:someone@example.com") is None
+
+
+def test_may_link_to_page_skips_links_that_cannot_resolve_to_a_page():
+    assert not may_link_to_page("#matchers", "code.claude.com")
+    assert not may_link_to_page("mailto:someone@example.com", "code.claude.com")
+    assert not may_link_to_page("https://github.com/anthropics/claude-code", "code.claude.com")
+    assert may_link_to_page("https://docs.anthropic.com/en/docs/claude-code/hooks", "code.claude.com")
+    assert may_link_to_page("//code.claude.com/docs/en/hooks", "code.claude.com")
+    assert may_link_to_page("http://127.0.0.1:8080/docs/en/hooks", "127.0.0.1:8080")
+    assert may_link_to_page("/docs/en/settings", "code.claude.com")
+    assert may_link_to_page("settings", "code.claude.com")
+
+
+def test_extract_links_resolves_relative_targets_and_skips_code_blocks():
+    text = ("See [settings](/docs/en/settings#hooks) and [again](settings.md \"Settings\").\n"
+            "[ref]: https://docs.anthropic.com/en/docs/claude-code/mcp\n"
+            "<a href=\"/docs/en/memory\">memory</a> [top](#top) [mail](mailto:a@b.c)\n"
+            "```md\n[in code](/docs/en/costs)\n```\n"
+            "~~~\n[also code](/docs/en/costs)\n~~~\n"
+            "    [not a definition]: /docs/en/costs\n"
+            "[external](https://github.com/anthropics/claude-code)\n")
+    assert extract_links(text, PAGE_URL) == {
+        "docs:/docs/en/settings": 2,
+        "docs:/docs/en/mcp": 1,
+        "docs:/docs/en/memory": 1,
+    }
+
+
+def test_iter_links_yields_targets_in_page_order():
+    text = '<a href="/b">b</a> [a](/a)\n[c]: /c\n'
+    assert [target for _, _, target in iter_links(text)] == ["/b", "/a", "/c"]
+    for start, end, target in iter_links(text):
+        assert text[start:end] == target
+
+
+def test_unclosed_code_block_runs_to_the_end():
+    assert extract_links("[a](/docs/en/a)\n```\n[b](/docs/en/b)\n", PAGE_URL) == {"docs:/docs/en/a": 1}
+
+
+def test_rewrite_links_points_mirrored_pages_at_local_files():
+    files = {
+        "settings.md": {"original_url": "https://code.claude.com/docs/en/settings.md"},
+        "hooks.md": {"original_url": PAGE_URL},
+    }
+    text = "[s](/docs/en/settings#env) [top](#top) [gh](https://github.com/anthropics/claude-code)"
+    rewritten, count = rewrite_links(text, PAGE_URL, page_keys(files))
+    assert rewritten == "[s](settings.md#env) [top](#top) [gh](https://github.com/anthropics/claude-code)"
+    assert count == 1
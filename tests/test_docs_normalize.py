@@ -0,0 +1,52 @@
+import pytest
+
+from docs_normalize import TRAILING_WHITESPACE_PATTERN, normalize_content
+
+
+def test_line_endings_and_trailing_whitespace():
+    assert normalize_content(b"# Title\r\n\r\ntext \t\r\nmore\rlast") == b"# Title\n\ntext\nmore\nlast\n"
+
+
+def test_hard_line_breaks_keep_two_spaces():
+    assert normalize_content(b"first    \nsecond\n") == b"first  \nsecond\n"
+    # Blank lines and tabs aren't hard breaks
+    assert normalize_content(b"a\n   \nb\t \n") == b"a\n\nb\n"
+
+
+def test_volatile_patterns_are_removed():
+    content = b"<!-- generated 2025-01-01T00:00:00Z -->\n# Page\n\n![logo](/logo.svg?v=3f2a1c)\n"
+    assert normalize_content(content) == b"# Page\n\n![logo](/logo.svg)\n"
+
+
+def test_single_final_newline():
+    assert normalize_content(b"text") == b"text\n"
+    assert normalize_content(b"text\n\n\n") == b"text\n"
+    assert normalize_content(b"") == b""
+
+
+def test_clean_content_is_unchanged():
+    content = b"# Page\n\nSome text with a [link](/docs/en/hooks?tab=a).\n"
+    assert normalize_content(content) == content
+
+
+def test_normalizing_is_idempotent():
+    content = b"<!-- build 42 -->\r\n# Page  \r\ntext   \r\n\r\n\r\n"
+    once = normalize_content(content)
+    assert normalize_content(once) == once
+
+
+def full_pass(content):
+    """The trailing whitespace step run over the whole text, without shortcuts."""
+    def trailing(match):
+        hard_break = (match.group().startswith(b'  ') and b'\t' not in match.group()
+                      and match.start() > 0 and match.string[match.start() - 1:match.start()] != b'\n')
+        return b'  ' if hard_break else b''
+    return TRAILING_WHITESPACE_PATTERN.sub(trailing, content)
+
+
+@pytest.mark.parametrize("content", [
+    b"a \nb", b"a\t\n", b"a\nb ", b"a\nb   ", b"a\n \n", b"a\n   ", b"   ", b"a\nb\n", b"a  b\n",
+    b"\t\tindented\n", b"a\nb\t", b"a\tb \n",
+])
+def test_trailing_whitespace_shortcuts_match_a_full_pass(content):
+    assert normalize_content(content) == normalize_content(full_pass(content))
@@ -0,0 +1,42 @@
+import sys
+
+import pytest
+
+from docs_index import update_search_index
+from docs_similar import load_similar_index, query, similar_pages, update_similar_index
+
+PAGES = {
+    "hooks.md": "# Hooks\n\nHooks run shell commands on tool events. Configure hooks in settings.\n",
+    "settings.md": "# Settings\n\nSettings files configure permissions, hooks and environment variables.\n",
+    "mcp.md": "# MCP\n\nConnect MCP servers to add tools. Servers speak the model context protocol.\n",
+}
+
+
+def write_pages(docs_dir, pages):
+    for name, text in pages.items():
+        (docs_dir / name).write_text(text)
+    files = {name: {"hash": str(hash(text))} for name, text in pages.items()}
+    update_search_index(docs_dir, files)
+
+
+def test_query_and_similar_pages(tmp_path):
+    pytest.importorskip("numpy")
+    write_pages(tmp_path, PAGES)
+    assert update_similar_index(tmp_path)["recomputed"] == 3
+
+    index = load_similar_index(tmp_path)
+    assert similar_pages(index, "hooks.md")[0][0] == "settings.md"
+    assert query(index, "MCP servers")[0][0] == "mcp.md"
+    assert query(index, "nothing matches this") == []
+
+
+def test_unchanged_pages_are_reused_without_numpy(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    write_pages(tmp_path, PAGES)
+    update_similar_index(tmp_path)
+
+    monkeypatch.setitem(sys.modules, "numpy", None)  # any import of it now fails
+    assert update_similar_index(tmp_path) == {"recomputed": 0, "reused": 3, "removed": 0, "full": False}
+    # A changed page needs NumPy, so the index is left as it is
+    write_pages(tmp_path, dict(PAGES, **{"mcp.md": "# MCP\n\nServers and tools.\n"}))
+    assert update_similar_index(tmp_path) is None
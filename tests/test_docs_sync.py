@@ -0,0 +1,112 @@
+import hashlib
+import json
+
+import docs_sync
+from docs_bundle import write_bundle
+from docs_sync import plan_sync, sync
+
+
+def entry(data: bytes) -> dict:
+    return {"hash": hashlib.sha256(data).hexdigest()}
+
+
+def test_plan_sync_downloads_changed_and_missing_files(tmp_path):
+    (tmp_path / 'same.md').write_bytes(b'same')
+    (tmp_path / 'changed.md').write_bytes(b'old')
+    local = {"same.md": entry(b'same'), "changed.md": entry(b'old'), "gone.md": entry(b'gone'),
+             "deleted-locally.md": entry(b'x')}
+    remote = {"same.md": entry(b'same'), "changed.md": entry(b'new'), "new.md": entry(b'new'),
+              "deleted-locally.md": entry(b'x')}
+    download, remove, accepted = plan_sync(tmp_path, local, remote)
+    assert download == ["changed.md", "deleted-locally.md", "new.md"]
+    assert remove == ["gone.md"]
+    assert accepted == ["changed.md", "deleted-locally.md", "new.md", "same.md"]
+
+
+def test_plan_sync_refuses_unsafe_names(tmp_path):
+    remote = {"../escape.md": entry(b'x'), ".hidden.md": entry(b'x'), "notes.txt": entry(b'x'),
+              "ok.md": entry(b'x')}
+    download, remove, accepted = plan_sync(tmp_path, {}, remote)
+    assert download == accepted == ["ok.md"]
+    assert remove == []
+
+
+def test_sync_lists_only_files_it_accepted(tmp_path, monkeypatch):
+    base_url = "https://example.invalid/docs/"
+    published = {"ok.md": b"# OK\n", "broken.md": b"# Broken\n"}
+    remote_manifest = {
+        "files": {"ok.md": entry(published["ok.md"]), "broken.md": entry(b"something else"),
+                  "../escape.md": entry(b"x"), "notes.txt": entry(b"x")},
+    }
+
+    def http_get(url):
+        name = url[len(base_url):]
+        if name == docs_sync.MANIFEST_FILE:
+            return json.dumps(remote_manifest).encode('utf-8')
+        if name in published:
+            return published[name]
+        raise OSError(f"not found: {name}")
+
+    monkeypatch.setattr(docs_sync, 'http_get', http_get)
+    result = sync(tmp_path, base_url)
+
+    assert result["updated"] == ["ok.md"]
+    assert result["failed"] == ["broken.md"]
+    manifest = json.loads((tmp_path / docs_sync.MANIFEST_FILE).read_text())
+    assert list(manifest["files"]) == ["ok.md"]
+    assert (tmp_path / 'ok.md').read_bytes() == published["ok.md"]
+    assert not (tmp_path / 'broken.md').exists()
+
+
+def test_many_changed_files_come_from_the_bundle(tmp_path, monkeypatch):
+    base_url = "https://example.invalid/docs/"
+    bundle_url = "https://example.invalid/docs.bundle"
+    published = {f"page{n}.md": f"# Page {n}\n".encode() for n in range(4)}
+    # The bundle is a run behind for page3, so that one is downloaded on its own
+    packed = tmp_path / 'packed'
+    packed.mkdir()
+    for name, data in dict(published, **{"page3.md": b"# Older\n"}).items():
+        (packed / name).write_bytes(data)
+    write_bundle(packed, {name: {} for name in published}, packed / 'docs.bundle')
+    remote_manifest = {"files": {name: entry(data) for name, data in published.items()}}
+
+    requested = []
+
+    def http_get(url):
+        requested.append(url)
+        if url == bundle_url:
+            return (packed / 'docs.bundle').read_bytes()
+        name = url[len(base_url):]
+        if name == docs_sync.MANIFEST_FILE:
+            return json.dumps(remote_manifest).encode('utf-8')
+        if name in published:
+            return published[name]
+        raise OSError(f"not found: {name}")
+
+    monkeypatch.setattr(docs_sync, 'http_get', http_get)
+    monkeypatch.setattr(docs_sync, 'BUNDLE_MIN_FILES', 3)
+    docs_dir = tmp_path / 'docs'
+    result = sync(docs_dir, base_url, bundle_url=bundle_url)
+
+    assert result["updated"] == sorted(published)
+    assert result["bundled"] == ["page0.md", "page1.md", "page2.md"]
+    assert [url for url in requested if url.endswith('.md')] == [base_url + "page3.md"]
+    for name, data in published.items():
+        assert (docs_dir / name).read_bytes() == data
+    assert not list(docs_dir.glob('.*' + docs_sync.TMP_SUFFIX))
+
+
+def test_few_changed_files_skip_the_bundle(tmp_path, monkeypatch):
+    base_url = "https://example.invalid/docs/"
+    remote_manifest = {"files": {"one.md": entry(b"# One\n")}}
+
+    def http_get(url):
+        if url.endswith(docs_sync.MANIFEST_FILE):
+            return json.dumps(remote_manifest).encode('utf-8')
+        if url == base_url + "one.md":
+            return b"# One\n"
+        raise OSError(f"unexpected request: {url}")
+
+    monkeypatch.setattr(docs_sync, 'http_get', http_get)
+    result = sync(tmp_path, base_url, bundle_url="https://example.invalid/docs.bundle")
+    assert result["updated"] == ["one.md"] and result["bundled"] == []
@@ -0,0 +1,72 @@
+import hashlib
+import json
+
+import docs_verify
+from docs_normalize import CHANGELOG_HEADER, normalize_content
+from docs_verify import repair, verify
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_manifest(docs_dir, files):
+    (docs_dir / docs_verify.MANIFEST_FILE).write_text(json.dumps({"files": files}))
+
+
+def test_verify_reports_missing_corrupt_and_extra_files(tmp_path):
+    (tmp_path / 'good.md').write_bytes(b"good\n")
+    (tmp_path / 'corrupt.md').write_bytes(b"tampered\n")
+    (tmp_path / 'extra.md').write_bytes(b"extra\n")
+    write_manifest(tmp_path, {
+        "good.md": {"hash": sha256(b"good\n")},
+        "corrupt.md": {"hash": sha256(b"original\n")},
+        "missing.md": {"hash": sha256(b"missing\n")},
+    })
+    cache = tmp_path.parent / 'verify-cache.json'
+    report = verify(tmp_path, cache)
+    assert report["missing"] == ["missing.md"]
+    assert report["corrupt"] == ["corrupt.md"]
+    assert report["extra"] == ["extra.md"]
+
+    # A second check reuses the cached hashes of unchanged files
+    report = verify(tmp_path, cache)
+    assert report["hashed"] == 0 and report["cached"] == 2
+
+
+def test_repair_normalizes_upstream_copies_before_comparing(tmp_path, monkeypatch):
+    page = b"# Hooks\r\n\r\nRun a command  \r\nbefore a tool call. \r\n"
+    changelog = b"## 1.0.0\n\n- First release\n"
+    write_manifest(tmp_path, {
+        "hooks.md": {"hash": sha256(normalize_content(page)), "raw_hash": sha256(page),
+                     "original_md_url": "https://upstream.invalid/docs/en/hooks.md"},
+        "changelog.md": {"hash": sha256(normalize_content(CHANGELOG_HEADER + changelog)),
+                         "original_raw_url": "https://upstream.invalid/CHANGELOG.md"},
+    })
+    upstream = {"https://upstream.invalid/docs/en/hooks.md": page,
+                "https://upstream.invalid/CHANGELOG.md": changelog}
+
+    def http_get(url):
+        if url not in upstream:
+            raise OSError(f"unexpected request: {url}")
+        return upstream[url]
+
+    monkeypatch.setattr(docs_verify, 'http_get', http_get)
+    result = repair(tmp_path, ["hooks.md", "changelog.md"])
+    assert sorted(result["repaired"]) == ["changelog.md", "hooks.md"]
+    assert result["failed"] == []
+    assert (tmp_path / 'hooks.md').read_bytes() == normalize_content(page)
+    assert (tmp_path / 'changelog.md').read_bytes().startswith(b"# Claude Code Changelog\n")
+
+
+def test_repair_falls_back_to_the_mirror_when_upstream_moved_on(tmp_path, monkeypatch):
+    saved = b"# Hooks\n\nold text\n"
+    write_manifest(tmp_path, {
+        "hooks.md": {"hash": sha256(saved), "original_md_url": "https://upstream.invalid/hooks.md"},
+    })
+    responses = {"https://upstream.invalid/hooks.md": b"# Hooks\n\nnew text\n",
+                 "https://mirror.invalid/docs/hooks.md": saved}
+    monkeypatch.setattr(docs_verify, 'http_get', lambda url: responses[url])
+    result = repair(tmp_path, ["hooks.md"], mirror_url="https://mirror.invalid/docs")
+    assert result["repaired"] == ["hooks.md"]
+    assert (tmp_path / 'hooks.md').read_bytes() == saved
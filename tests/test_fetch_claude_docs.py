@@ -0,0 +1,135 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from fetch_claude_docs import (RATE_LIMIT_BURST, HostRateLimiter, main, merge_shard_runs, parse_shard, shard_of,
+                               wall_clock_comparison)
+from fetch_telemetry import FetchTelemetry
+
+# The benchmark's stand-in docs server, for runs of the whole fetcher
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+from fetcher_bench import StandInDocsServer  # noqa: E402
+
+# Set on every run: when it happened and how long it took
+RUN_TIMES = {"last_updated", "last_fetch_completed", "fetch_duration_seconds", "pages_wall_clock_seconds",
+             "telemetry", "poll"}
+
+
+@pytest.fixture
+def docs_server():
+    server = StandInDocsServer({"pages": 12, "page_size": 2048, "latency": 0})
+    server.start()
+    yield server
+    server.stop()
+
+
+def run_fetcher(server, work_dir, *args):
+    main(["--docs-dir", str(work_dir / 'docs'), "--bundle", str(work_dir / 'docs.bundle'),
+          "--metrics-dir", str(work_dir), "--sitemap-url", f"{server.url}/docs/sitemap.xml",
+          "--changelog-url", f"{server.url}/CHANGELOG.md", "--rate", "200", *args])
+    manifest_path = work_dir / 'docs' / 'docs_manifest.json'
+    # Shards leave only their partial manifests
+    return json.loads(manifest_path.read_text()) if manifest_path.exists() else None
+
+
+def without_run_times(value):
+    if isinstance(value, dict):
+        return {key: without_run_times(item) for key, item in value.items() if key not in RUN_TIMES}
+    return value
+
+
+def test_wall_clock_comparison_keeps_the_other_mode():
+    serial = wall_clock_comparison({}, 1, 40.0, 200, "2026-01-01T00:00:00")
+    assert serial["serial"]["seconds_per_document"] == 0.2
+    assert "concurrent" not in serial and "speedup" not in serial
+
+    both = wall_clock_comparison({"wall_clock_by_mode": serial}, 8, 5.0, 100, "2026-01-02T00:00:00")
+    assert both["serial"] == serial["serial"]
+    assert both["concurrent"]["workers"] == 8
+    assert both["speedup"] == 4.0
+
+
+def test_wall_clock_comparison_replaces_its_own_mode():
+    first = wall_clock_comparison({}, 8, 10.0, 100, "2026-01-01T00:00:00")
+    second = wall_clock_comparison({"wall_clock_by_mode": first}, 4, 6.0, 100, "2026-01-02T00:00:00")
+    assert second["concurrent"]["seconds"] == 6.0
+    assert second["concurrent"]["workers"] == 4
+
+
+def test_wall_clock_comparison_without_documents():
+    result = wall_clock_comparison({}, 8, 0.1, 0, "2026-01-01T00:00:00")
+    assert result["concurrent"]["seconds_per_document"] is None
+
+
+def test_rate_limiter_lets_only_the_burst_through_back_to_back():
+    limiter = HostRateLimiter(rate=50)
+    waits = [limiter.acquire("https://code.claude.com/docs/en/page") for _ in range(RATE_LIMIT_BURST + 2)]
+    assert waits[:RATE_LIMIT_BURST] == [0.0] * RATE_LIMIT_BURST
+    assert all(wait > 0 for wait in waits[RATE_LIMIT_BURST:])
+    # Other hosts have buckets of their own
+    assert limiter.acquire("https://github.com/anthropics/claude-code") == 0.0
+
+
+def shard(index, count, results, retries, pages_wall_clock, phases=None):
+    return {
+        "shard": [index, count],
+        "pages": ["/docs/en/a", "/docs/en/b", "/docs/en/c"],
+        "pages_to_fetch": list(results),
+        "carried_over": {},
+        "results": {page: {"result": [page, "hash"], "error": None} for page in results},
+        "changelog_due": index == 1,
+        "pages_wall_clock": pages_wall_clock,
+        "telemetry": {"records": [{"kind": "page", "name": page} for page in results], "phases": phases or {}},
+        "retries": retries,
+    }
+
+
+def test_parse_shard():
+    assert parse_shard("2/3") == (2, 3)
+    for value in ("0/3", "4/3", "1", "a/b"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_shard(value)
+
+
+def test_every_file_has_one_shard():
+    shards = {shard_of(f"page-{n}.md", 4) for n in range(100)}
+    assert shards == {1, 2, 3, 4}
+    assert shard_of("hooks.md", 4) == shard_of("hooks.md", 4)
+
+
+def test_merge_shard_runs_matches_a_single_run_whatever_the_order(docs_server, tmp_path):
+    first = shard(1, 2, ["/docs/en/c"], {"retried": 1, "open_circuits": ["a.com"],
+                                         "circuits_opened": {"a.com": 1}, "drain_seconds": 2.0}, 3.0,
+                  {"pages": 3.0})
+    second = shard(2, 2, ["/docs/en/a", "/docs/en/b"], {"retried": 2, "open_circuits": ["b.com"],
+                                                        "circuits_opened": {"a.com": 2}, "drain_seconds": 1.0}, 5.0,
+                   {"pages": 5.0})
+    merged = merge_shard_runs([second, first], FetchTelemetry())
+    assert merged == merge_shard_runs([first, second], FetchTelemetry())
+    assert merged["pages_to_fetch"] == ["/docs/en/a", "/docs/en/b", "/docs/en/c"]
+    assert merged["results"]["/docs/en/c"] == (("/docs/en/c", "hash"), None)
+    assert merged["changelog_due"] and merged["pages_wall_clock"] == 5.0
+    assert merged["retries"] == {"retried": 3, "open_circuits": ["a.com", "b.com"],
+                                 "circuits_opened": {"a.com": 3}, "drain_seconds": 2.0}
+
+    telemetry = FetchTelemetry()
+    merge_shard_runs([first, second], telemetry)
+    assert telemetry.phases == {"pages": 5.0}
+    assert len(telemetry.records()) == 3
+
+    # End to end: shards finishing in either order merge into the manifest one process writes
+    single = run_fetcher(docs_server, tmp_path / 'single', "--workers", "4")
+    for index in (2, 1):
+        run_fetcher(docs_server, tmp_path / 'sharded', "--workers", "4", "--shard", f"{index}/2",
+                    "--shard-dir", str(tmp_path / 'parts'))
+    merged = run_fetcher(docs_server, tmp_path / 'sharded', "--workers", "1", "--merge-shards", "2",
+                         "--shard-dir", str(tmp_path / 'parts'))
+    # The shards' settings, not the merging process's; their wall clock is neither serial nor concurrent
+    assert merged["fetch_metadata"]["workers"] == 4
+    assert merged["fetch_metadata"]["wall_clock_by_mode"] is None
+    single["fetch_metadata"].pop("wall_clock_by_mode")
+    merged["fetch_metadata"].pop("wall_clock_by_mode")
+    assert without_run_times(merged) == without_run_times(single)
@@ -0,0 +1,51 @@
+from fetch_retry import HostCircuitBreaker, RetryLater, RetryScheduler
+
+
+def test_deferred_task_recovers_after_the_first_pass():
+    order = []
+
+    def attempt(key, attempt_number):
+        order.append((key, attempt_number))
+        if key == "flaky" and attempt_number == 0:
+            raise RetryLater("503", delay=0)
+        return key.upper()
+
+    scheduler = RetryScheduler(workers=1)
+    results = scheduler.run([("flaky", "https://a.com/1"), ("ok", "https://a.com/2")], attempt)
+    assert results == {"flaky": ("FLAKY", None), "ok": ("OK", None)}
+    # The retry waits for the rest of the first pass
+    assert order == [("flaky", 0), ("ok", 0), ("flaky", 1)]
+    assert scheduler.stats["deferred"] == 1 and scheduler.stats["recovered"] == 1
+
+
+def test_gives_up_after_max_attempts():
+    def attempt(key, attempt_number):
+        raise RetryLater("timeout", delay=0)
+
+    scheduler = RetryScheduler(workers=2, max_attempts=2)
+    result, error = scheduler.run([("page", "https://a.com/1")], attempt)["page"]
+    assert result is None and "after 2 attempts" in str(error)
+    assert scheduler.stats["gave_up"] == 1
+
+
+def test_deadlines_past_max_wait_are_left_for_the_next_run():
+    def attempt(key, attempt_number):
+        raise RetryLater("429", delay=600)
+
+    scheduler = RetryScheduler(workers=1, max_wait=1)
+    result, error = scheduler.run([("page", "https://a.com/1")], attempt)["page"]
+    assert "Gave up for this run" in str(error)
+
+
+def test_circuit_opens_after_consecutive_failures_and_probes_after_cooldown():
+    breaker = HostCircuitBreaker(threshold=2, cooldown=0)
+    url = "https://a.com/page"
+    breaker.record_failure(url)
+    assert breaker.open_hosts() == []
+    breaker.record_failure(url)
+    assert breaker.open_hosts() == ["a.com"] and breaker.opened == {"a.com": 1}
+
+    assert breaker.blocked_for(url) == 0.0  # cool-down over: this request is the probe
+    assert breaker.blocked_for(url) > 0  # the others wait for it
+    breaker.record_success(url)
+    assert breaker.open_hosts() == [] and breaker.blocked_for(url) == 0.0
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta, timezone
+
+from fetch_schedule import (CHANGELOG_MAX_POLL_INTERVAL, DEFAULT_POLL_INTERVAL, MAX_POLL_INTERVAL,
+                            MIN_POLL_INTERVAL, format_time, is_due, journal_history, next_due, next_poll)
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_first_poll_without_history_uses_the_default_interval():
+    poll = next_poll(None, False, NOW)
+    assert poll["interval"] == DEFAULT_POLL_INTERVAL * 2
+    assert poll["next"] == format_time(NOW + timedelta(seconds=poll["interval"]))
+    assert poll["changes"] == []
+
+
+def test_unchanged_checks_back_off_up_to_the_cap():
+    poll = {"interval": MAX_POLL_INTERVAL // 2 + 1, "changes": []}
+    poll = next_poll(poll, False, NOW)
+    assert poll["interval"] == MAX_POLL_INTERVAL
+    assert next_poll(poll, False, NOW)["interval"] == MAX_POLL_INTERVAL
+    assert next_poll(poll, False, NOW, max_interval=CHANGELOG_MAX_POLL_INTERVAL)["interval"] == \
+        CHANGELOG_MAX_POLL_INTERVAL
+
+
+def test_a_change_halves_the_interval_and_is_recorded():
+    poll = next_poll({"interval": 8 * 3600, "changes": []}, True, NOW)
+    assert poll["interval"] == 4 * 3600
+    assert poll["changes"] == [format_time(NOW)]
+
+
+def test_a_change_keeps_the_interval_under_the_typical_gap():
+    changes = [format_time(NOW - timedelta(hours=hours)) for hours in (6, 4, 2)]
+    poll = next_poll({"interval": 2 * 86400, "changes": changes}, True, NOW)
+    assert poll["interval"] == 2 * 3600
+
+
+def test_interval_never_drops_below_the_minimum():
+    poll = next_poll({"interval": MIN_POLL_INTERVAL, "changes": []}, True, NOW)
+    assert poll["interval"] == MIN_POLL_INTERVAL
+
+
+def test_history_seeds_the_first_record():
+    history = [format_time(NOW - timedelta(days=30))]
+    poll = next_poll(None, False, NOW, history)
+    # Half the time since the only change, then doubled for this unchanged check (capped)
+    assert poll["interval"] == MAX_POLL_INTERVAL
+    assert poll["changes"] == history
+
+
+def test_is_due_allows_slack_and_treats_missing_records_as_due():
+    assert is_due(None, NOW)
+    assert is_due({"next": format_time(NOW + timedelta(minutes=5))}, NOW)
+    assert not is_due({"next": format_time(NOW + timedelta(hours=1))}, NOW)
+
+
+def test_next_due_and_journal_history():
+    entries = [{"poll": {"next": "2026-03-02T00:00:00Z"}}, {"poll": {"next": "2026-03-01T13:00:00Z"}}, {}]
+    assert next_due(entries) == "2026-03-01T13:00:00Z"
+    journal = [
+        {"time": "2026-02-01T00:00:00Z", "added": ["hooks.md"], "changed": {}},
+        {"time": "2026-02-03T00:00:00Z", "added": [], "changed": {"hooks.md": {}, "mcp.md": {}}},
+    ]
+    assert journal_history(journal) == {
+        "hooks.md": ["2026-02-01T00:00:00Z", "2026-02-03T00:00:00Z"],
+        "mcp.md": ["2026-02-03T00:00:00Z"],
+    }